@@ -1,5 +1,6 @@
+import axios from "axios"
 import { axiosInstance } from "@/lib/axios"
-import type { ClienteFinancialData } from "@/types/financial"
+import type { BalanceGeneral, ClienteFinancialData, EstadoResultadosPeriodo, EstadoResultadosYTD } from "@/types/financial"
 
 export type { ClienteFinancialData } from "@/types/financial"
 
@@ -10,11 +11,37 @@ export interface FinancialDataResponse {
   data: ClienteFinancialData[]
 }
 
+// Servicio local de extracción (scripts/extraction_service.py); sin él, el backend de siempre
+const extractionApi = process.env.NEXT_PUBLIC_EXTRACTION_API_URL
+  ? axios.create({ baseURL: process.env.NEXT_PUBLIC_EXTRACTION_API_URL })
+  : axiosInstance
+
+// Listas de un mes recién extraído (las que traían PDF)
+export interface ExtractedMonth {
+  mes: string
+  estadoResultadosPeriodo?: EstadoResultadosPeriodo
+  estadoResultadosYTD?: EstadoResultadosYTD
+  balanceGeneral?: BalanceGeneral
+}
+
 export interface UploadFinancialDataResponse {
   message: string
   success: boolean
   clientId: string
   filesProcessed: number
+  // Solo con el servicio local de extracción
+  files?: { archivo: string; tipo: string; mes: string; ruta: string; reemplazo: boolean }[]
+  rejected?: { archivo: string; motivo: string }[]
+  months?: ExtractedMonth[]
+  seconds?: number
+}
+
+export interface ExtractFinancialDataResponse {
+  message: string
+  success: boolean
+  clientId: string
+  months: ExtractedMonth[]
+  seconds: number
 }
 
 /**
@@ -31,7 +58,7 @@ export async function uploadFinancialData(
     formData.append("files", file)
   })
 
-  const response = await axiosInstance.post<UploadFinancialDataResponse>(
+  const response = await extractionApi.post<UploadFinancialDataResponse>(
     "/financial-data/upload",
     formData,
     {
@@ -44,6 +71,22 @@ export async function uploadFinancialData(
   return response.data
 }
 
+/**
+ * Vuelve a extraer los PDFs de un cliente (todo, un año o un mes) con el
+ * servicio local de extracción y regenera su JSON
+ */
+export async function extractFinancialData(
+  clientId: string,
+  options: { year?: string; month?: string; statement?: "er" | "bg"; rebuild?: boolean } = {}
+): Promise<ExtractFinancialDataResponse> {
+  const response = await extractionApi.post<ExtractFinancialDataResponse>(
+    "/financial-data/extract",
+    { clientId, ...options }
+  )
+
+  return response.data
+}
+
 /**
  * Obtiene datos financieros de un cliente
  */
@@ -44,7 +44,8 @@ export default function ClientDashboard() {
   const loadFinancialData = async (company: string) => {
     setIsLoading(true)
     try {
-      const data = await loadClientFinancialData(company)
+      // Solo el año más reciente; los demás años se listan desde el manifest
+      const data = await loadClientFinancialData(company, { latestYears: 1 })
       if (data) {
         setClientData(data)
         const years = getAvailableYears(data)
@@ -170,7 +170,9 @@ export function ReportContentDynamic({ clientId, month, year, onClose }: ReportC
       normalizedBg.capital = normalizedBg.utilidadEj
     }
 
-    const kpis = calcularKPIsFinancieros(erPeriodo, normalizedBg)
+    // Los KPIs vienen precalculados en el JSON; calcularlos solo si faltan
+    const kpis =
+      yearData.kpis?.find((k) => k.mes === fullMonthKey) ?? calcularKPIsFinancieros(erPeriodo, normalizedBg)
     const recomendaciones = generarRecomendaciones(kpis, erPeriodo)
 
     const previousYearData = clientData.years[(year - 1).toString()]
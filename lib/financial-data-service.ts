@@ -1,4 +1,4 @@
-import type { ClienteFinancialData } from "@/types/financial"
+import type { ClienteColumnarData, ClienteFinancialData, ClientDataManifest } from "@/types/financial"
 
 const CLIENTS_MAP: Record<string, string> = {
   luenser: "Luenser",
@@ -48,21 +48,77 @@ function getClientSlugFromName(clientName: string): string | null {
   return null
 }
 
+function resolveClientSlug(clientId: string): string {
+  // Intentar normalizar el clientId (podría ser nombre o slug)
+  const slug = clientId.toLowerCase().trim()
+
+  // Si no existe en CLIENTS_MAP, intentar convertir de nombre a slug
+  if (!CLIENTS_MAP[slug]) {
+    const foundSlug = getClientSlugFromName(clientId)
+    if (foundSlug) {
+      return foundSlug
+    }
+  }
+  return slug
+}
+
+export async function loadClientManifest(clientId: string): Promise<ClientDataManifest | null> {
+  const slug = resolveClientSlug(clientId)
+  try {
+    // El manifest es pequeño y cambia con cada extracción: siempre revalidar
+    const response = await fetch(`/data/clients/${slug}/manifest.json`, { cache: "no-cache" })
+    if (!response.ok) return null
+    return (await response.json()) as ClientDataManifest
+  } catch {
+    return null
+  }
+}
+
+interface LoadOptions {
+  // Años a cargar; por default todos
+  years?: number[]
+  // Cargar solo los N años más recientes
+  latestYears?: number
+}
+
 export async function loadClientFinancialData(
-  clientId: string
+  clientId: string,
+  options: LoadOptions = {}
 ): Promise<ClienteFinancialData | null> {
   try {
-    // Intentar normalizar el clientId (podría ser nombre o slug)
-    let slug = clientId.toLowerCase().trim()
-    
-    // Si no existe en CLIENTS_MAP, intentar convertir de nombre a slug
-    if (!CLIENTS_MAP[slug]) {
-      const foundSlug = getClientSlugFromName(clientId)
-      if (foundSlug) {
-        slug = foundSlug
+    const slug = resolveClientSlug(clientId)
+
+    // Datos por año: descargar solo los años pedidos
+    const manifest = await loadClientManifest(slug)
+    if (manifest) {
+      let years = Object.keys(manifest.years).sort((a, b) => parseInt(b) - parseInt(a))
+      if (options.years) {
+        const wanted = options.years.map((y) => y.toString())
+        years = years.filter((y) => wanted.includes(y))
+      } else if (options.latestYears !== undefined) {
+        years = years.slice(0, options.latestYears)
+      }
+
+      const shards = await Promise.all(
+        years.map(async (year) => {
+          const shard = manifest.years[year]
+          // El hash en la URL permite que el navegador guarde el fragmento en caché
+          const response = await fetch(`/data/clients/${slug}/${shard.file}?v=${shard.sha256.slice(0, 12)}`)
+          if (!response.ok) throw new Error(`Failed to load ${year} for client: ${clientId}`)
+          return [year, await response.json()] as const
+        })
+      )
+
+      return {
+        clienteId: manifest.clienteId,
+        clienteNombre: manifest.clienteNombre,
+        razonSocial: manifest.razonSocial,
+        years: Object.fromEntries(shards.sort(([a], [b]) => a.localeCompare(b))),
+        manifest,
       }
     }
-    
+
+    // JSON completo (datos generados antes de los fragmentos por año)
     const response = await fetch(`/data/clients/${slug}.json`)
     if (!response.ok) {
       console.error(`Failed to load data for client: ${clientId} (using slug: ${slug})`)
@@ -76,6 +132,27 @@ export async function loadClientFinancialData(
   }
 }
 
+export async function loadClientColumnarData(clientId: string): Promise<ClienteColumnarData | null> {
+  const slug = resolveClientSlug(clientId)
+  try {
+    const response = await fetch(`/data/clients/${slug}.columnar.json`)
+    if (!response.ok) return null
+    return (await response.json()) as ClienteColumnarData
+  } catch (error) {
+    console.error(`Error loading columnar data for ${clientId}:`, error)
+    return null
+  }
+}
+
+// Posición de "YYYY-MM" en el eje de meses del formato columnar (-1 si queda fuera)
+export function getColumnarMonthIndex(data: ClienteColumnarData, mes: string): number {
+  if (!data.inicio) return -1
+  const index =
+    (parseInt(mes.slice(0, 4)) - parseInt(data.inicio.slice(0, 4))) * 12 +
+    (parseInt(mes.slice(5, 7)) - parseInt(data.inicio.slice(5, 7)))
+  return index >= 0 && index < data.meses.length ? index : -1
+}
+
 export function getClientName(clientId: string): string {
   return CLIENTS_MAP[clientId.toLowerCase()] || clientId
 }
@@ -85,7 +162,8 @@ export function getAllClientIds(): string[] {
 }
 
 export function getAvailableYears(data: ClienteFinancialData): number[] {
-  return Object.keys(data.years)
+  // Con manifest se listan también los años que no se descargaron
+  return Object.keys(data.manifest?.years ?? data.years)
     .map((y) => parseInt(y))
     .sort((a, b) => b - a)
 }
@@ -94,6 +172,8 @@ export function getAvailableMonths(
   data: ClienteFinancialData,
   year: number
 ): string[] {
+  const manifestYear = data.manifest?.years[year.toString()]
+  if (manifestYear) return [...manifestYear.months]
   const yearData = data.years[year.toString()]
   if (!yearData) return []
   return yearData.estadoResultadosPeriodo.map((er) => er.mes).sort()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Extractor de "Anexos del Catálogo" y almacén columnar de saldos por cuenta.
+
+Cada renglón del anexo es:
+
+    1102-01-0001 BANAMEX 4572   23,188.88   13,813,662.60   13,806,344.69   30,506.79
+    cuenta       nombre         saldo ini.  cargos          abonos          saldo final
+
+Los saldos inicial y final pueden estar en la columna Deudor o Acreedor. El lado
+se deduce de la identidad contable (inicial + cargos - abonos = final, con los
+saldos acreedores en negativo); cuando no alcanza (p. ej. cargos = abonos) se
+usa la posición horizontal del número aprendida de los demás renglones del
+mismo documento, y al final la naturaleza de la cuenta.
+
+Los renglones se guardan en `AccountStore`, un almacén columnar con `array`:
+8 bytes por importe y 4 bytes por índice (cliente, mes, cuenta, nombre), 48
+bytes por renglón; cada cadena se guarda una sola vez. Se persiste en .cache/anexos_store.bin para
+consultar cualquier subcuenta de todos los meses y clientes sin releer PDFs.
+
+Uso:
+    python anexos.py build [--rebuild] [--low-memory]
+    python anexos.py query 1102-01-0001 [--client mrm]
+    python anexos.py rollup 1102-00-0000 --client mrm --month 2024-01
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from corpus_index import PDF_BASE_DIR, load_corpus_index
+from pdf_text import add_memory_arguments, iter_pages, memory_from_args, open_pdf, peak_rss_mb
+from warehouse import add_warehouse_arguments, warehouse_from_args
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_STORE_PATH = BASE_DIR / ".cache" / "anexos_store.bin"
+
+STORE_FORMAT = 2
+
+ACCOUNT_RE = re.compile(r"\d{3,4}-\d{2,3}-\d{3,4}")
+AMOUNT_RE = re.compile(r"-?[\d,]+\.\d{2}")
+
+# Naturaleza por primer dígito de la cuenta (CONTPAQ): 1 activo, 2 pasivo,
+# 3 capital, 4 ingresos, 5-7 costos/gastos. +1 deudora, -1 acreedora.
+ACCOUNT_NATURE = {"1": 1, "2": -1, "3": -1, "4": -1, "5": 1, "6": 1, "7": 1}
+
+# Columnas numéricas del almacén, en el orden en que se guardan
+AMOUNT_COLUMNS = ("opening", "debits", "credits", "closing")
+INDEX_COLUMNS = ("client", "month", "account", "name")
+
+
+def parse_amount(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def parent_account(code: str) -> Optional[str]:
+    """
+    Cuenta padre: pone en ceros el último segmento distinto de cero.
+    1102-01-0001 -> 1102-01-0000 -> 1102-00-0000 -> None
+    """
+    segments = code.split("-")
+    for i in range(len(segments) - 1, 0, -1):
+        if int(segments[i]):
+            segments[i] = "0" * len(segments[i])
+            return "-".join(segments)
+    return None
+
+
+def ancestors(code: str) -> List[str]:
+    """Cadena de cuentas padre, de la más cercana a la de mayor nivel."""
+    chain = []
+    parent = parent_account(code)
+    while parent:
+        chain.append(parent)
+        parent = parent_account(parent)
+    return chain
+
+
+def month_key(mes: str) -> int:
+    """'2024-01' -> 202401"""
+    year, month = mes.split("-")
+    return int(year) * 100 + int(month)
+
+
+def month_label(key: int) -> str:
+    return f"{key // 100}-{key % 100:02d}"
+
+
+def _sides(opening: float, debits: float, credits: float, closing: float) -> Optional[Tuple[int, int]]:
+    """Lados (inicial, final) que cumplen la identidad contable, si son únicos."""
+    candidates = [
+        (s_open, s_close)
+        for s_open in (1, -1)
+        for s_close in (1, -1)
+        if abs(s_open * opening + debits - credits - s_close * closing) < 0.015
+    ]
+    # Con saldo cero el lado no importa: quedarse con la primera opción
+    unique = {(s_o if opening else 0, s_c if closing else 0) for s_o, s_c in candidates}
+    if len(unique) == 1:
+        return candidates[0]
+    return None
+
+
+def iter_anexos_rows(pdf_path: Path) -> Iterator[Tuple[str, str, float, float, float, float]]:
+    """
+    Genera (cuenta, nombre, saldo_inicial, cargos, abonos, saldo_final) página por
+    página; los saldos acreedores salen en negativo. No guarda el texto del PDF.
+    """
+    # Posición (x1 redondeada) de los números -> votos por lado, aprendidos en el documento
+    column_votes: Dict[Tuple[str, int], int] = {}
+
+    def learned_side(column: str, x1: float) -> int:
+        return column_votes.get((column, round(x1)), 0)
+
+    with open_pdf(pdf_path) as pdf:
+        # iter_pages libera el layout de cada página en cuanto se pide la siguiente
+        for page in iter_pages(pdf):
+            rows: Dict[int, List[Dict]] = {}
+            for word in page.extract_words():
+                rows.setdefault(round(word["top"]), []).append(word)
+
+            pending = []
+            for top in sorted(rows):
+                words = sorted(rows[top], key=lambda w: w["x0"])
+                if len(words) < 6 or not ACCOUNT_RE.fullmatch(words[0]["text"]):
+                    continue
+                amounts = words[-4:]
+                if not all(AMOUNT_RE.fullmatch(w["text"]) for w in amounts):
+                    continue
+                code = words[0]["text"]
+                name = " ".join(w["text"] for w in words[1:-4])
+                values = [parse_amount(w["text"]) for w in amounts]
+                sides = _sides(*values)
+                if sides:
+                    for column, word, value, side in (("opening", amounts[0], values[0], sides[0]),
+                                                      ("closing", amounts[3], values[3], sides[1])):
+                        if not value:
+                            continue  # un saldo en cero no dice nada de su columna
+                        key = (column, round(word["x1"]))
+                        column_votes[key] = column_votes.get(key, 0) + side
+                pending.append((code, name, values, sides, amounts[0]["x1"], amounts[3]["x1"]))
+
+            for code, name, (opening, debits, credits, closing), sides, open_x1, close_x1 in pending:
+                if sides is None:
+                    nature = ACCOUNT_NATURE.get(code[0], 1)
+                    open_vote = learned_side("opening", open_x1)
+                    close_vote = learned_side("closing", close_x1)
+                    sides = (
+                        (1 if open_vote > 0 else -1) if open_vote else nature,
+                        (1 if close_vote > 0 else -1) if close_vote else nature,
+                    )
+                yield code, name, sides[0] * opening, debits, credits, sides[1] * closing
+
+
+class AccountStore:
+    """
+    Almacén columnar de saldos de anexos: un renglón por (cliente, mes, cuenta).
+
+    Las columnas son `array` ('d' para importes, 'I' para índices); clientes,
+    cuentas y nombres se guardan como índices a tablas de cadenas (el mismo
+    código de cuenta tiene nombres distintos en cada cliente).
+    """
+
+    def __init__(self):
+        self.clients: List[str] = []
+        self.accounts: List[str] = []
+        self.names: List[str] = []
+        self._client_ids: Dict[str, int] = {}
+        self._account_ids: Dict[str, int] = {}
+        self._name_ids: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {name: array("d") for name in AMOUNT_COLUMNS}
+        self.columns.update({name: array("I") for name in INDEX_COLUMNS})
+        # (cliente, mes) -> metadatos del PDF de origen
+        self.sources: Dict[str, Dict] = {}
+        self._by_account: Optional[Dict[int, array]] = None
+
+    def __len__(self) -> int:
+        return len(self.columns["closing"])
+
+    @staticmethod
+    def _intern(value: str, table: List[str], ids: Dict[str, int]) -> int:
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(table)
+            table.append(value)
+        return index
+
+    def append(self, client: str, mes: str, code: str, name: str,
+               opening: float, debits: float, credits: float, closing: float):
+        client_id = self._intern(client, self.clients, self._client_ids)
+        account_id = self._intern(code, self.accounts, self._account_ids)
+        name_id = self._intern(name, self.names, self._name_ids)
+        self.columns["client"].append(client_id)
+        self.columns["month"].append(month_key(mes))
+        self.columns["account"].append(account_id)
+        self.columns["name"].append(name_id)
+        self.columns["opening"].append(opening)
+        self.columns["debits"].append(debits)
+        self.columns["credits"].append(credits)
+        self.columns["closing"].append(closing)
+        self._by_account = None
+
+    def load_pdf(self, client: str, mes: str, pdf_path: Path) -> int:
+        """Agrega los renglones de un PDF de anexos. Regresa cuántos se agregaron."""
+        count = 0
+        for row in iter_anexos_rows(pdf_path):
+            self.append(client, mes, *row)
+            count += 1
+        st = os.stat(pdf_path)
+        self.sources[f"{client}|{mes}"] = {
+            "path": str(pdf_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "rows": count,
+        }
+        return count
+
+    def is_current(self, client: str, mes: str, pdf_path: Path) -> bool:
+        """True si el PDF ya está cargado y no cambió."""
+        source = self.sources.get(f"{client}|{mes}")
+        if not source or source["path"] != str(pdf_path):
+            return False
+        st = os.stat(pdf_path)
+        return source["size"] == st.st_size and source["mtime_ns"] == st.st_mtime_ns
+
+    def drop(self, keys: List[Tuple[str, str]]):
+        """Elimina los renglones de varios (cliente, mes) en una sola pasada."""
+        drop_set = {
+            (self._client_ids[client], month_key(mes))
+            for client, mes in keys if client in self._client_ids
+        }
+        for client, mes in keys:
+            self.sources.pop(f"{client}|{mes}", None)
+        if not drop_set:
+            return
+        client_col, month_col = self.columns["client"], self.columns["month"]
+        keep = [i for i in range(len(self)) if (client_col[i], month_col[i]) not in drop_set]
+        for name, column in self.columns.items():
+            self.columns[name] = array(column.typecode, (column[i] for i in keep))
+        self._by_account = None
+
+    def _account_index(self) -> Dict[int, array]:
+        """Índice cuenta -> renglones (se arma al primer uso)."""
+        if self._by_account is None:
+            index: Dict[int, array] = {}
+            for row, account_id in enumerate(self.columns["account"]):
+                rows = index.get(account_id)
+                if rows is None:
+                    rows = index[account_id] = array("I")
+                rows.append(row)
+            self._by_account = index
+        return self._by_account
+
+    def rows(self, code: str, client: Optional[str] = None) -> List[Dict]:
+        """Todos los meses (y clientes) de una cuenta, ordenados por cliente y mes."""
+        account_id = self._account_ids.get(code)
+        if account_id is None:
+            return []
+        client_id = self._client_ids.get(client) if client else None
+        if client and client_id is None:
+            return []
+        result = []
+        for row in self._account_index().get(account_id, ()):
+            if client_id is not None and self.columns["client"][row] != client_id:
+                continue
+            result.append({
+                "cliente": self.clients[self.columns["client"][row]],
+                "mes": month_label(self.columns["month"][row]),
+                "cuenta": code,
+                "nombre": self.names[self.columns["name"][row]],
+                **{name: self.columns[name][row] for name in AMOUNT_COLUMNS},
+            })
+        result.sort(key=lambda r: (r["cliente"], r["mes"]))
+        return result
+
+    def children(self, code: str) -> List[str]:
+        """Subcuentas directas de una cuenta."""
+        return sorted(c for c in self.accounts if parent_account(c) == code)
+
+    def month_balances(self, client: str, mes: str, column: str = "closing") -> Dict[str, float]:
+        """{cuenta: importe} de un cliente y mes."""
+        client_id = self._client_ids.get(client)
+        if client_id is None:
+            return {}
+        key = month_key(mes)
+        client_col, month_col = self.columns["client"], self.columns["month"]
+        values, accounts = self.columns[column], self.columns["account"]
+        return {
+            self.accounts[accounts[i]]: values[i]
+            for i in range(len(self)) if client_col[i] == client_id and month_col[i] == key
+        }
+
+    def rollup(self, code: str, client: str, mes: str, column: str = "closing") -> float:
+        """
+        Suma de las subcuentas hoja de `code` para un cliente y mes. Sirve para
+        validar el saldo que el propio anexo reporta para la cuenta padre.
+
+        El anexo omite cuentas intermedias sin movimiento (puede venir
+        6104-08-0001 sin 6104-08-0000), así que se suman las hojas presentes en
+        el mes y no solo las subcuentas directas.
+        """
+        balances = self.month_balances(client, mes, column)
+        descendants = {a: ancestors(a) for a in balances if code in ancestors(a)}
+        if not descendants:
+            return balances.get(code, 0.0)
+        inner = {parent for chain in descendants.values() for parent in chain}
+        return sum(balances[a] for a in descendants if a not in inner)
+
+    def save(self, path: Path = DEFAULT_STORE_PATH):
+        """
+        Formato: 4 bytes con el largo del encabezado JSON, el encabezado y las
+        columnas en binario en el orden de `columns`.
+        """
+        header = {
+            "format": STORE_FORMAT,
+            "rows": len(self),
+            "clients": self.clients,
+            "accounts": self.accounts,
+            "names": self.names,
+            "sources": self.sources,
+            "columns": [[name, column.typecode] for name, column in self.columns.items()],
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            for column in self.columns.values():
+                f.write(column.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_STORE_PATH) -> "AccountStore":
+        store = cls()
+        path = Path(path)
+        if not path.exists():
+            return store
+        with open(path, "rb") as f:
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            if header.get("format") != STORE_FORMAT:
+                return store
+            rows = header["rows"]
+            for name, typecode in header["columns"]:
+                column = array(typecode)
+                column.frombytes(f.read(rows * column.itemsize))
+                store.columns[name] = column
+        store.clients = header["clients"]
+        store.accounts = header["accounts"]
+        store.names = header["names"]
+        store.sources = header["sources"]
+        store._client_ids = {c: i for i, c in enumerate(store.clients)}
+        store._account_ids = {a: i for i, a in enumerate(store.accounts)}
+        store._name_ids = {n: i for i, n in enumerate(store.names)}
+        return store
+
+
+def client_ids_by_folder() -> Dict[str, str]:
+    """Carpeta de cliente -> id (el mismo mapeo que extract_all_clients)."""
+    from extract_all_clients import CLIENT_MAPPING
+    return {folder: info["id"] for folder, info in CLIENT_MAPPING.items()}
+
+
+def build_store(store: AccountStore, pdf_root: Path = PDF_BASE_DIR) -> Tuple[int, int]:
+    """
+    Carga en el almacén los anexos nuevos o modificados del árbol de PDFs.
+    Regresa (PDFs leídos, PDFs sin cambios).
+    """
+    client_ids = client_ids_by_folder()
+    index = load_corpus_index(pdf_root)
+    todo = []
+    unchanged = 0
+    live = set()
+    for (folder, year, month, kind), pdf_path in index.entries():
+        if kind != "anexos" or folder not in client_ids:
+            continue
+        client, mes = client_ids[folder], f"{year}-{month}"
+        live.add(f"{client}|{mes}")
+        if store.is_current(client, mes, pdf_path):
+            unchanged += 1
+        else:
+            todo.append((client, mes, pdf_path))
+
+    # Quitar en una sola pasada lo que cambió o ya no existe
+    stale = [tuple(key.split("|")) for key in store.sources if key not in live]
+    store.drop(stale + [(client, mes) for client, mes, _ in todo])
+
+    for client, mes, pdf_path in todo:
+        try:
+            count = store.load_pdf(client, mes, pdf_path)
+            print(f"  ├─ {client} {mes}: {count} cuentas")
+        except Exception as e:
+            print(f"  ⚠️  Error leyendo {pdf_path.name}: {e}")
+    return len(todo), unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anexos del Catálogo: extracción y consulta por cuenta")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Extraer anexos nuevos o modificados al almacén")
+    build.add_argument("--rebuild", action="store_true", help="Volver a extraer todos los anexos")
+    add_memory_arguments(build)
+    add_warehouse_arguments(build)
+    query = sub.add_parser("query", help="Saldos de una cuenta en todos los meses")
+    query.add_argument("account")
+    query.add_argument("--client")
+    rollup = sub.add_parser("rollup", help="Comparar una cuenta contra la suma de sus subcuentas")
+    rollup.add_argument("account")
+    rollup.add_argument("--client", required=True)
+    rollup.add_argument("--month", required=True, help="YYYY-MM")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        memory = memory_from_args(args)
+        store = AccountStore() if args.rebuild else AccountStore.load()
+        print("📚 Extrayendo Anexos del Catálogo...")
+        read, unchanged = build_store(store)
+        store.save()
+        print(f"✅ {read} PDFs leídos, {unchanged} sin cambios, {len(store)} renglones, "
+              f"{len(store.accounts)} cuentas")
+        if memory["low_memory"]:
+            print(f"📄 Pico de memoria: {peak_rss_mb():.0f} MB")
+        warehouse = warehouse_from_args(args)
+        if warehouse.enabled:
+            warehouse.replace_anexos(store)
+            print(f"🗄️  Anexos copiados al almacén: {warehouse.path}")
+            warehouse.close()
+        return
+
+    store = AccountStore.load()
+    if args.command == "query":
+        rows = store.rows(args.account, args.client)
+        if not rows:
+            print(f"⚠️  Sin datos para la cuenta {args.account}")
+            return
+        print(f"📊 {args.account}")
+        for r in rows:
+            print(f"  {r['cliente']:<12} {r['mes']}  {r['nombre']:<26} inicial {r['opening']:>16,.2f}  "
+                  f"cargos {r['debits']:>16,.2f}  abonos {r['credits']:>16,.2f}  final {r['closing']:>16,.2f}")
+    else:
+        own = [r for r in store.rows(args.account, args.client) if r["mes"] == args.month]
+        total = store.rollup(args.account, args.client, args.month)
+        reported = own[0]["closing"] if own else 0.0
+        status = "✅" if abs(total - reported) < 0.015 else "⚠️ "
+        print(f"{status} {args.account}: reportado {reported:,.2f}, suma de subcuentas {total:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la extracción sobre el árbol de PDFs del repositorio.
+
+Mide cada etapa por separado y guarda los resultados en JSON para comparar dos
+corridas:
+
+    discovery    recorrer el árbol y armar el índice (sin índice guardado)
+    open         pdfplumber.open + lista de páginas
+    text         extract_text() de cada página
+    regex        patrones de extract_all_clients y extract_financial_data
+    json_write   escritura atómica de los JSON de clientes (a una carpeta temporal)
+
+Además se lee el texto completo de los mismos PDFs con cada backend de
+pdf_text.TEXT_BACKENDS (pdfminer = camino rápido, pdfplumber = respaldo) y se
+reportan páginas por segundo de cada uno (sección "backends").
+
+Por etapa se reportan total, media y percentiles (p50/p90/p99/max); además el
+tiempo total, la latencia por PDF (open + text + regex), páginas por segundo y el
+pico de memoria (RSS) del proceso.
+
+Uso:
+    python benchmark.py run                                   # todo el árbol
+    python benchmark.py run --client MRM --limit 20           # subconjunto
+    python benchmark.py run --baseline base.json              # falla si hay regresión
+    python benchmark.py compare base.json nuevo.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pdfplumber
+
+import extract_all_clients as eac
+import extract_financial_data as efd
+from corpus_index import PDF_BASE_DIR, CorpusIndex
+from json_store import client_json_paths, write_json_atomic
+from pdf_text import TEXT_BACKENDS
+
+BASE_DIR = Path(__file__).parent.parent
+JSON_DIR = BASE_DIR / "public" / "data" / "clients"
+DEFAULT_RESULTS_DIR = BASE_DIR / ".cache" / "benchmarks"
+
+BENCHMARK_FORMAT = 1
+STAGES = ("discovery", "open", "text", "regex", "json_write")
+
+# Scanners por tipo de estado: los de ambos extractores
+SCANNERS = {
+    "estado_resultados": (eac.ER_SCANNER, efd.ER_SCANNER),
+    "balance_general": (eac.BG_SCANNER, efd.BG_SCANNER),
+}
+
+# Etapas con menos de este tiempo total no se comparan (ruido)
+MIN_COMPARABLE_SECONDS = 0.05
+DEFAULT_THRESHOLD = 0.10
+
+
+def peak_rss_kb() -> int:
+    """Pico de RSS del proceso en KB (ru_maxrss está en bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentil por rango más cercano (q entre 0 y 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float]) -> Dict:
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "total": round(total, 6),
+        "mean": round(total / len(samples), 6) if samples else 0.0,
+        "p50": round(percentile(samples, 50), 6),
+        "p90": round(percentile(samples, 90), 6),
+        "p99": round(percentile(samples, 99), 6),
+        "max": round(max(samples), 6) if samples else 0.0,
+    }
+
+
+def select_pdfs(index: CorpusIndex, client: Optional[str], limit: int) -> List[Tuple[str, Path]]:
+    """(tipo, ruta) de los estados de resultados y balances a medir."""
+    pdfs = [
+        (kind, path)
+        for (folder, _, _, kind), path in index.entries()
+        if kind in SCANNERS and (client is None or folder == client)
+    ]
+    return pdfs[:limit] if limit else pdfs
+
+
+def bench_discovery(pdf_root: Path, repeat: int) -> Tuple[List[float], CorpusIndex]:
+    samples = []
+    index = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        index = CorpusIndex(pdf_root, index_path=None).refresh()
+        samples.append(time.perf_counter() - start)
+    return samples, index
+
+
+def bench_pdf(kind: str, pdf_path: Path) -> Tuple[float, float, float, int]:
+    """Regresa (open, text, regex, páginas) para un PDF."""
+    start = time.perf_counter()
+    with pdfplumber.open(pdf_path) as pdf:
+        pages = pdf.pages
+        opened = time.perf_counter()
+        text = "".join(page.extract_text() or "" for page in pages)
+        extracted = time.perf_counter()
+        for scanner in SCANNERS[kind]:
+            scanner.scan(text)
+        matched = time.perf_counter()
+        return opened - start, extracted - opened, matched - extracted, len(pages)
+
+
+def bench_backend(backend: str, pdfs: List[Tuple[str, Path]]) -> Dict:
+    """Texto completo de cada PDF con un backend: segundos, páginas y páginas/s."""
+    samples = []
+    pages = 0
+    for _, pdf_path in pdfs:
+        start = time.perf_counter()
+        with TEXT_BACKENDS[backend](pdf_path) as (_, texts):
+            pages += sum(1 for _ in texts)
+        samples.append(time.perf_counter() - start)
+    seconds = sum(samples)
+    return {
+        "seconds": round(seconds, 6),
+        "pages": pages,
+        "pages_per_second": round(pages / seconds, 3) if seconds else 0.0,
+        "per_pdf": summarize(samples),
+    }
+
+
+def bench_json_write(client_ids: Optional[List[str]] = None) -> List[float]:
+    """Escribe los JSON de clientes a una carpeta temporal (no toca public/)."""
+    samples = []
+    paths = client_json_paths(JSON_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            if client_ids is not None and path.stem not in client_ids:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            start = time.perf_counter()
+            write_json_atomic(Path(tmp) / path.name, data)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "pdfplumber": pdfplumber.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def run_benchmark(pdf_root: Path = PDF_BASE_DIR, client: Optional[str] = None,
+                  limit: int = 0, repeat: int = 3, slowest: int = 10) -> Dict:
+    wall_start = time.perf_counter()
+    stages: Dict[str, List[float]] = {}
+    rss: Dict[str, int] = {}
+
+    print("📁 Descubriendo PDFs...")
+    stages["discovery"], index = bench_discovery(pdf_root, repeat)
+    rss["discovery"] = peak_rss_kb()
+
+    pdfs = select_pdfs(index, client, limit)
+    print(f"📄 Midiendo {len(pdfs)} PDFs...")
+    stages["open"], stages["text"], stages["regex"] = [], [], []
+    latencies: List[Tuple[float, str]] = []
+    pages = 0
+    for i, (kind, pdf_path) in enumerate(pdfs, 1):
+        opened, extracted, matched, page_count = bench_pdf(kind, pdf_path)
+        stages["open"].append(opened)
+        stages["text"].append(extracted)
+        stages["regex"].append(matched)
+        latencies.append((opened + extracted + matched, str(pdf_path.relative_to(pdf_root))))
+        pages += page_count
+        if i % 50 == 0:
+            print(f"  ├─ {i}/{len(pdfs)}")
+    rss["pdfs"] = peak_rss_kb()
+
+    backends = {}
+    for backend in TEXT_BACKENDS:
+        print(f"📄 Backend de texto {backend}...")
+        backends[backend] = bench_backend(backend, pdfs)
+    rss["backends"] = peak_rss_kb()
+
+    print("💾 Midiendo escritura de JSON...")
+    client_ids = None
+    if client:
+        info = eac.CLIENT_MAPPING.get(client)
+        client_ids = [info["id"]] if info else []
+    stages["json_write"] = bench_json_write(client_ids)
+    rss["json_write"] = peak_rss_kb()
+
+    pdf_seconds = sum(latency for latency, _ in latencies)
+    latencies.sort(reverse=True)
+    return {
+        "format": BENCHMARK_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": {"client": client, "limit": limit, "repeat": repeat},
+        "corpus": {"pdfs": len(pdfs), "pages": pages},
+        "wall_seconds": round(time.perf_counter() - wall_start, 6),
+        "pages_per_second": round(pages / pdf_seconds, 3) if pdf_seconds else 0.0,
+        "peak_rss_kb": peak_rss_kb(),
+        "rss_after_kb": rss,
+        "stages": {name: summarize(stages[name]) for name in STAGES},
+        "per_pdf": summarize([latency for latency, _ in latencies]),
+        "backends": backends,
+        "slowest": [[path, round(latency, 6)] for latency, path in latencies[:slowest]],
+    }
+
+
+def print_report(result: Dict):
+    print(f"\n{'etapa':<12} {'n':>5} {'total':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for name in STAGES:
+        s = result["stages"][name]
+        print(f"{name:<12} {s['count']:>5} {s['total']:>8.3f}s {s['p50'] * 1000:>7.1f}ms "
+              f"{s['p90'] * 1000:>7.1f}ms {s['p99'] * 1000:>7.1f}ms {s['max'] * 1000:>7.1f}ms")
+    p = result["per_pdf"]
+    print(f"{'por PDF':<12} {p['count']:>5} {p['total']:>8.3f}s {p['p50'] * 1000:>7.1f}ms "
+          f"{p['p90'] * 1000:>7.1f}ms {p['p99'] * 1000:>7.1f}ms {p['max'] * 1000:>7.1f}ms")
+    backends = result.get("backends", {})
+    if backends:
+        print(f"\n{'backend':<12} {'total':>9} {'p50':>9} {'páginas/s':>10}")
+        for name, b in backends.items():
+            print(f"{name:<12} {b['seconds']:>8.3f}s {b['per_pdf']['p50'] * 1000:>7.1f}ms "
+                  f"{b['pages_per_second']:>10.1f}")
+        fast, fallback = backends.get("pdfminer"), backends.get("pdfplumber")
+        if fast and fallback and fast["seconds"]:
+            print(f"⚡ pdfminer {fallback['seconds'] / fast['seconds']:.1f}x más rápido que pdfplumber")
+    print(f"\n⏱️  {result['wall_seconds']:.2f}s en total, {result['pages_per_second']:.1f} páginas/s, "
+          f"pico RSS {result['peak_rss_kb'] / 1024:.1f} MB")
+    if result["slowest"]:
+        print("🐢 PDFs más lentos:")
+        for path, latency in result["slowest"][:5]:
+            print(f"  {latency * 1000:>8.1f}ms  {path}")
+
+
+def comparable_metrics(result: Dict) -> Dict[str, Tuple[float, bool]]:
+    """{métrica: (valor, mayor_es_mejor)} de una corrida."""
+    metrics = {
+        "wall_seconds": (result["wall_seconds"], False),
+        "pages_per_second": (result["pages_per_second"], True),
+        "peak_rss_kb": (float(result["peak_rss_kb"]), False),
+        "per_pdf.p50": (result["per_pdf"]["p50"], False),
+        "per_pdf.p90": (result["per_pdf"]["p90"], False),
+    }
+    for name in STAGES:
+        stage = result["stages"][name]
+        if stage["total"] >= MIN_COMPARABLE_SECONDS:
+            metrics[f"{name}.total"] = (stage["total"], False)
+            metrics[f"{name}.p50"] = (stage["p50"], False)
+    for name, backend in result.get("backends", {}).items():
+        if backend["seconds"] >= MIN_COMPARABLE_SECONDS:
+            metrics[f"{name}.pages_per_second"] = (backend["pages_per_second"], True)
+    return metrics
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compara dos corridas e imprime la tabla. Regresa las métricas que empeoraron
+    más que `threshold` (0.10 = 10%).
+    """
+    if baseline.get("params") != current.get("params"):
+        print(f"⚠️  Parámetros distintos: {baseline.get('params')} vs {current.get('params')}")
+
+    base_metrics = comparable_metrics(baseline)
+    regressions = []
+    print(f"\n{'métrica':<22} {'base':>12} {'actual':>12} {'cambio':>9}")
+    for name, (value, higher_is_better) in comparable_metrics(current).items():
+        if name not in base_metrics or not base_metrics[name][0]:
+            continue
+        base_value = base_metrics[name][0]
+        change = value / base_value - 1
+        worse = -change if higher_is_better else change
+        status = "❌" if worse > threshold else "✅"
+        if worse > threshold:
+            regressions.append(name)
+        print(f"{name:<22} {base_value:>12.4f} {value:>12.4f} {change:>+8.1%} {status}")
+    return regressions
+
+
+def load_result(path: Path) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la extracción de PDFs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Medir la extracción sobre el árbol de PDFs")
+    run.add_argument("--client", help="Solo la carpeta de este cliente (p. ej. MRM)")
+    run.add_argument("--limit", type=int, default=0, help="Máximo de PDFs a medir (0 = todos)")
+    run.add_argument("--repeat", type=int, default=3, help="Repeticiones del descubrimiento")
+    run.add_argument("--output", type=Path, help="Archivo JSON de resultados")
+    run.add_argument("--baseline", type=Path, help="Resultados contra los cuales comparar")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help="Regresión máxima permitida (default: 0.10 = 10%%)")
+
+    cmp_parser = sub.add_parser("compare", help="Comparar dos archivos de resultados")
+    cmp_parser.add_argument("baseline", type=Path)
+    cmp_parser.add_argument("current", type=Path)
+    cmp_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        baseline, current = load_result(args.baseline), load_result(args.current)
+    else:
+        current = run_benchmark(client=args.client, limit=args.limit, repeat=args.repeat)
+        print_report(current)
+        output = args.output or DEFAULT_RESULTS_DIR / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+        write_json_atomic(output, current)
+        print(f"💾 Resultados: {output}")
+        if not args.baseline:
+            return
+        baseline = load_result(args.baseline)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n❌ Regresión mayor a {args.threshold:.0%} en: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n✅ Sin regresiones mayores a {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
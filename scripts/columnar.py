@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Formato columnar (struct-of-arrays) de los datos de un cliente.
+
+En vez de una lista de objetos por mes, cada lista del JSON se guarda como un
+arreglo por campo, todos alineados a un eje de meses continuo y ordenado:
+
+    {
+      "format": "columnar", "version": 1,
+      "clienteId": "mrm", ...,
+      "inicio": "2024-01",
+      "meses": ["2024-01", "2024-02", ..., "2025-11"],
+      "estadoResultadosPeriodo": {"ingresos": [...], "compras": [...], ...},
+      "estadoResultadosYTD": {...},
+      "balanceGeneral": {"ac": [...], "pc": [...], ...},
+      "kpis": {...}
+    }
+
+El eje no tiene huecos (un mes sin datos vale null en todos los arreglos), así
+que el índice de un mes se calcula directamente:
+
+    i = (año - año_inicio) * 12 + (mes - mes_inicio)
+
+Se escribe en `public/data/clients/<id>.columnar.json` con --columnar, y una vez
+que existe se mantiene actualizado en cada escritura del cliente.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+COLUMNAR_VERSION = 1
+
+# Listas por año que se pasan a columnas (en este orden)
+COLUMNAR_LISTS = ("estadoResultadosPeriodo", "estadoResultadosYTD", "balanceGeneral", "kpis")
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_OUTPUT_DIR = BASE_DIR / "public" / "data" / "clients"
+
+COLUMNAR_SUFFIX = ".columnar.json"
+
+
+def columnar_path(json_path: Path) -> Path:
+    """public/data/clients/mrm.json -> public/data/clients/mrm.columnar.json"""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + COLUMNAR_SUFFIX)
+
+
+def month_axis(first: str, last: str) -> List[str]:
+    """Meses "YYYY-MM" de `first` a `last`, sin huecos."""
+    year, month = int(first[:4]), int(first[5:7])
+    end = (int(last[:4]), int(last[5:7]))
+    axis = []
+    while (year, month) <= end:
+        axis.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return axis
+
+
+def to_columnar(data: Dict) -> Dict:
+    """Convierte los datos de <id>.json (years -> listas por mes) a columnas."""
+    rows: Dict[str, List[Dict]] = {list_key: [] for list_key in COLUMNAR_LISTS}
+    for year_data in data.get("years", {}).values():
+        for list_key in COLUMNAR_LISTS:
+            rows[list_key].extend(year_data.get(list_key, []))
+
+    months = sorted({item["mes"] for items in rows.values() for item in items})
+    axis = month_axis(months[0], months[-1]) if months else []
+    position = {mes: i for i, mes in enumerate(axis)}
+
+    result = {
+        "format": "columnar",
+        "version": COLUMNAR_VERSION,
+        "clienteId": data.get("clienteId"),
+        "clienteNombre": data.get("clienteNombre"),
+        "razonSocial": data.get("razonSocial"),
+        "inicio": axis[0] if axis else None,
+        "meses": axis,
+    }
+    for list_key, items in rows.items():
+        # Campos en el orden en que aparecen (los opcionales como anc/plc al final)
+        fields = list(dict.fromkeys(key for item in items for key in item if key != "mes"))
+        columns: Dict[str, List[Optional[float]]] = {field: [None] * len(axis) for field in fields}
+        for item in items:
+            i = position[item["mes"]]
+            for field in fields:
+                columns[field][i] = item.get(field)
+        result[list_key] = columns
+    return result
+
+
+def from_columnar(columnar: Dict) -> Dict:
+    """Inverso de to_columnar: regresa la estructura years -> listas por mes."""
+    years: Dict[str, Dict[str, List[Dict]]] = {}
+    for list_key in COLUMNAR_LISTS:
+        columns = columnar.get(list_key, {})
+        for i, mes in enumerate(columnar["meses"]):
+            values = {field: column[i] for field, column in columns.items() if column[i] is not None}
+            if not values:
+                continue
+            year_data = years.setdefault(mes[:4], {key: [] for key in COLUMNAR_LISTS})
+            year_data[list_key].append({"mes": mes, **values})
+
+    return {
+        "clienteId": columnar.get("clienteId"),
+        "clienteNombre": columnar.get("clienteNombre"),
+        "razonSocial": columnar.get("razonSocial"),
+        "years": dict(sorted(years.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera <id>.columnar.json a partir de los JSON de clientes")
+    parser.add_argument("--client", help="Solo este cliente (id del JSON, p. ej. mrm)")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="Carpeta con los <id>.json (default: public/data/clients)")
+    args = parser.parse_args()
+
+    # Importado aquí: json_store usa este módulo al guardar
+    from json_store import client_json_paths, write_json_atomic
+
+    paths = [args.output_dir / f"{args.client}.json"] if args.client else client_json_paths(args.output_dir)
+    for path in paths:
+        if not path.exists():
+            print(f"❌ No existe {path}")
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        output = columnar_path(path)
+        write_json_atomic(output, to_columnar(data), indent=None)
+        print(f"✅ {output.name}: {output.stat().st_size:,} bytes (JSON: {path.stat().st_size:,})")
+
+
+if __name__ == "__main__":
+    main()
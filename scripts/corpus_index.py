@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Índice del árbol de PDFs: (carpeta cliente, año, mes, tipo de estado) -> ruta.
+
+El árbol se recorre una sola vez y se reconocen todos los estilos de nombres que
+usan los despachos:
+
+    MRM/2024/Estado de Resultados 01 Ene 2024.pdf          (archivos directos)
+    FIDUZ/2024/12 2024 balance general.pdf                 (mes + año)
+    FIDUZ/2025/04/042025 Anexos del Catalogo.pdf           (carpeta de mes "04")
+    SINMSA/2024/02.-Febrero/02.-Estado de Resultados.pdf   (carpeta "02.-Febrero")
+    Luenser/2024/1.ENERO 2024/1.BALANCE GENERAL ...pdf     (carpeta "1.ENERO 2024")
+    Vilego/2024/03 MARZO/Posicion financiera balance general.pdf
+
+El listado de cada carpeta se guarda en .cache/corpus_index.json junto con su
+mtime. En la siguiente corrida solo se vuelven a listar las carpetas cuyo mtime
+cambió (agregar, borrar o renombrar un archivo cambia el mtime de su carpeta);
+las demás solo cuestan un `stat`.
+
+Cada PDF clasificado se identifica además por su sha256 (guardado con tamaño y
+mtime, así que solo se vuelve a leer un archivo que cambió). Dos archivos con el
+mismo contenido son copias: si caen en el mismo (cliente, año, mes, tipo) no es un
+conflicto, y los extractores leen una sola vez cada contenido y reparten el
+resultado a todos los meses que lo usan (`content_hash`). Solo son conflicto dos
+archivos *distintos* para el mismo mes.
+
+Uso:
+    python corpus_index.py          # muestra el índice
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from extraction_cache import file_sha256
+from instrumentation import METRICS
+from json_store import write_json_atomic
+
+BASE_DIR = Path(__file__).parent.parent
+PDF_BASE_DIR = BASE_DIR / "Ejercicio Analisis MRM Vilego Luenser y otros"
+DEFAULT_INDEX_PATH = BASE_DIR / ".cache" / "corpus_index.json"
+
+INDEX_FORMAT = 2
+
+STATEMENT_KINDS = ("estado_resultados", "balance_general", "anexos")
+
+# Nombres completos primero: "MAYO" no debe quedarse en la abreviatura "May"
+MONTH_WORDS = [
+    ("01", ["enero", "ene"]),
+    ("02", ["febrero", "feb"]),
+    ("03", ["marzo", "mar"]),
+    ("04", ["abril", "abr"]),
+    ("05", ["mayo", "may"]),
+    ("06", ["junio", "jun"]),
+    ("07", ["julio", "jul"]),
+    ("08", ["agosto", "ago"]),
+    ("09", ["septiembre", "setiembre", "sep"]),
+    ("10", ["octubre", "oct"]),
+    ("11", ["noviembre", "nov"]),
+    ("12", ["diciembre", "dic"]),
+]
+_MONTH_BY_WORD = {word: month for month, words in MONTH_WORDS for word in words}
+_MONTH_ABBR = "|".join(words[-1] for _, words in MONTH_WORDS)
+# Nombre de mes pegado a otras letras: "SEPTIEMBRELUENSER"
+_MONTH_NAME_RE = re.compile(
+    "(" + "|".join(sorted(_MONTH_BY_WORD, key=len, reverse=True)) + ")", re.IGNORECASE
+)
+
+Slot = Tuple[str, str, str, str]  # (carpeta cliente, año, mes, tipo)
+
+
+def classify_statement(filename: str) -> Optional[str]:
+    """Tipo de estado financiero según el nombre del archivo."""
+    name = filename.lower()
+    if "anexo" in name or "catalogo" in name or "catálogo" in name:
+        return "anexos"
+    if "resultado" in name or name.startswith("edo") or " edo " in f" {name}":
+        return "estado_resultados"
+    if "balance" in name or "posicion" in name or "posición" in name:
+        return "balance_general"
+    return None
+
+
+def month_from_word(word: str) -> Optional[str]:
+    """Mes de un nombre o abreviatura: "Ene", "MARZO", "sep" -> "01", "03", "09"."""
+    return _MONTH_BY_WORD.get(word.strip().lower())
+
+
+def _valid_month(month: int) -> Optional[str]:
+    return f"{month:02d}" if 1 <= month <= 12 else None
+
+
+def _full_month_name(text: str) -> Optional[str]:
+    """
+    Primer nombre completo de mes en el texto. Las abreviaturas sueltas no cuentan:
+    "ene" aparece dentro de "balance general" antes que "MAYO".
+    """
+    for match in _MONTH_NAME_RE.finditer(text):
+        if len(match.group(1)) > 3:
+            return _MONTH_BY_WORD[match.group(1).lower()]
+    return None
+
+
+def month_from_folder(name: str) -> Optional[str]:
+    """Mes de una carpeta: "01", "02.-Febrero", "1.ENERO 2024", "03 MARZO", "ENERO"."""
+    match = re.match(r"\s*(\d{1,2})(?!\d)", name)
+    if match:
+        return _valid_month(int(match.group(1)))
+    return _full_month_name(name)
+
+
+def month_from_filename(name: str, year: str) -> Optional[str]:
+    """
+    Mes en el nombre de un archivo:
+    "Estado de Resultados 01 Ene 2024.pdf", "12 2024 balance general.pdf",
+    "042025 Anexos del Catalogo.pdf", "1.ANEXOS ... ENERO LUENSER 2024.pdf",
+    "balance general MAYO SEDENTARIUS.pdf"
+    """
+    stem = name.rsplit(".", 1)[0]
+    # "01 Ene 2024"
+    match = re.search(r"(?<!\d)(\d{1,2})\s*(?:" + _MONTH_ABBR + r")", stem, re.IGNORECASE)
+    if match:
+        return _valid_month(int(match.group(1)))
+    # "12 2024", "042025"
+    match = re.search(r"(?<!\d)(\d{1,2})\s*" + re.escape(year), stem)
+    if match:
+        return _valid_month(int(match.group(1)))
+    # "1.ANEXOS", "02.-Estado"
+    match = re.match(r"\s*(\d{1,2})\s*[.\-]", stem)
+    if match:
+        return _valid_month(int(match.group(1)))
+    # Nombre completo del mes
+    return _full_month_name(stem)
+
+
+class CorpusIndex:
+    """Índice (cliente, año, mes, tipo) -> PDF con refresco incremental por carpeta."""
+
+    def __init__(self, pdf_root: Path = PDF_BASE_DIR, index_path: Optional[Path] = DEFAULT_INDEX_PATH):
+        self.pdf_root = Path(pdf_root)
+        self.index_path = Path(index_path) if index_path else None
+        # ruta relativa de carpeta -> {"mtime_ns", "dirs": [...], "pdfs": [...],
+        #                              "hashes": {pdf: [tamaño, mtime_ns, sha256]}}
+        self._dirs: Dict[str, Dict] = {}
+        self._slots: Dict[Slot, Path] = {}
+        self._hashes: Dict[Path, str] = {}
+        self._contents: Dict[Slot, Dict[str, Path]] = {}  # contenidos distintos de cada mes
+        self.conflicts: List[Tuple[Slot, Path, Path]] = []
+        self.duplicates: List[Tuple[Slot, Path, Path]] = []  # mismo mes, mismo contenido
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self.files_hashed = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") == INDEX_FORMAT and data.get("root") == str(self.pdf_root.resolve()):
+            self._dirs = data.get("dirs", {})
+
+    def save(self):
+        """Guarda los listados de carpetas si cambiaron."""
+        if not self.index_path or not self._dirty:
+            return
+        write_json_atomic(
+            self.index_path,
+            {"format": INDEX_FORMAT, "root": str(self.pdf_root.resolve()), "dirs": self._dirs},
+            indent=None,
+        )
+        self._dirty = False
+
+    def _listing(self, rel: str) -> Dict:
+        """Listado de una carpeta, reutilizando el guardado si su mtime no cambió."""
+        path = self.pdf_root / rel if rel else self.pdf_root
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = self._dirs.get(rel)
+        if cached and cached["mtime_ns"] == mtime_ns:
+            self.dirs_reused += 1
+            return cached
+
+        dirs, pdfs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                elif entry.name.lower().endswith(".pdf"):
+                    pdfs.append(entry.name)
+        listing = {"mtime_ns": mtime_ns, "dirs": sorted(dirs), "pdfs": sorted(pdfs)}
+        if cached and cached.get("hashes"):
+            listing["hashes"] = {name: entry for name, entry in cached["hashes"].items() if name in pdfs}
+        self._dirs[rel] = listing
+        self.dirs_listed += 1
+        self._dirty = True
+        return listing
+
+    def refresh(self) -> "CorpusIndex":
+        """Recorre el árbol (solo lista las carpetas que cambiaron) y rearma el índice."""
+        self._slots = {}
+        self._hashes = {}
+        self._contents = {}
+        self.conflicts = []
+        self.duplicates = []
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self.files_hashed = 0
+        seen = {""}
+
+        if not self.pdf_root.exists():
+            return self
+
+        for client in self._listing("")["dirs"]:
+            seen.add(client)
+            for year in self._listing(client)["dirs"]:
+                if not (year.isdigit() and len(year) == 4):
+                    continue
+                year_rel = f"{client}/{year}"
+                seen.add(year_rel)
+                year_listing = self._listing(year_rel)
+
+                # Archivos directos en la carpeta del año
+                for pdf in year_listing["pdfs"]:
+                    self._add(client, year, month_from_filename(pdf, year), pdf, year_rel, year_listing)
+
+                # Subcarpetas de mes
+                for month_folder in year_listing["dirs"]:
+                    month_rel = f"{year_rel}/{month_folder}"
+                    seen.add(month_rel)
+                    folder_month = month_from_folder(month_folder)
+                    month_listing = self._listing(month_rel)
+                    for pdf in month_listing["pdfs"]:
+                        month = folder_month or month_from_filename(pdf, year)
+                        self._add(client, year, month, pdf, month_rel, month_listing)
+
+        # Olvidar carpetas que ya no existen
+        for rel in [rel for rel in self._dirs if rel not in seen]:
+            del self._dirs[rel]
+            self._dirty = True
+        return self
+
+    def _hash(self, listing: Dict, path: Path) -> str:
+        """sha256 del PDF, reutilizando el guardado si no cambió su tamaño ni su mtime."""
+        st = os.stat(path)
+        hashes = listing.setdefault("hashes", {})
+        entry = hashes.get(path.name)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        sha = file_sha256(path)
+        hashes[path.name] = [st.st_size, st.st_mtime_ns, sha]
+        self.files_hashed += 1
+        self._dirty = True
+        return sha
+
+    def _add(self, client: str, year: str, month: Optional[str], filename: str, rel: str, listing: Dict):
+        kind = classify_statement(filename)
+        if not month or not kind:
+            return
+        slot = (client, year, month, kind)
+        path = self.pdf_root / rel / filename
+        sha = self._hashes[path] = self._hash(listing, path)
+        contents = self._contents.setdefault(slot, {})
+        if not contents:
+            self._slots[slot] = path
+        if sha in contents:
+            self.duplicates.append((slot, contents[sha], path))
+            return
+        if contents:
+            self.conflicts.append((slot, self._slots[slot], path))
+        contents[sha] = path
+
+    def content_hash(self, path: Path) -> Optional[str]:
+        """sha256 de un PDF del índice (None si no está indexado)."""
+        return self._hashes.get(Path(path))
+
+    def shared_contents(self) -> Dict[str, List[Slot]]:
+        """sha256 -> meses que usan ese mismo contenido (solo los que tienen más de uno)."""
+        slots: Dict[str, List[Slot]] = {}
+        for slot, path in sorted(self._slots.items()):
+            slots.setdefault(self._hashes[path], []).append(slot)
+        return {sha: shared for sha, shared in slots.items() if len(shared) > 1}
+
+    def get(self, client: str, year: str, month: str, kind: str) -> Optional[Path]:
+        return self._slots.get((client, year, month, kind))
+
+    def statements(self, client: str, year: str, month: str) -> Dict[str, Optional[Path]]:
+        """Los 3 PDFs de un mes: {'estado_resultados', 'balance_general', 'anexos'}."""
+        return {kind: self.get(client, year, month, kind) for kind in STATEMENT_KINDS}
+
+    def years(self, client: str) -> List[str]:
+        return sorted({year for (c, year, _, _) in self._slots if c == client})
+
+    def months(self, client: str, year: str) -> List[str]:
+        return sorted({month for (c, y, month, _) in self._slots if c == client and y == year})
+
+    def entries(self) -> Iterator[Tuple[Slot, Path]]:
+        """Todas las entradas en orden (cliente, año, mes, tipo)."""
+        for slot in sorted(self._slots):
+            yield slot, self._slots[slot]
+
+    def summary(self) -> str:
+        summary = (f"{len(self._slots)} PDFs indexados, {self.dirs_listed} carpetas listadas, "
+                   f"{self.dirs_reused} sin cambios")
+        if self.files_hashed:
+            summary += f", {self.files_hashed} PDFs con hash nuevo"
+        unique = len({self._hashes[path] for path in self._slots.values()})
+        if unique < len(self._slots) or self.duplicates:
+            summary += (f", {unique} contenidos distintos "
+                        f"({len(self._slots) - unique + len(self.duplicates)} copias idénticas)")
+        return summary
+
+
+def load_corpus_index(pdf_root: Path = PDF_BASE_DIR, index_path: Optional[Path] = DEFAULT_INDEX_PATH) -> CorpusIndex:
+    """Carga, refresca y guarda el índice."""
+    with METRICS.stage("discovery"):
+        index = CorpusIndex(pdf_root, index_path).refresh()
+    index.save()
+    return index
+
+
+if __name__ == "__main__":
+    index = load_corpus_index()
+    for (client, year, month, kind), path in index.entries():
+        print(f"{client:<22} {year} {month} {kind:<18} {path.name}")
+    for slot, first, other in index.duplicates:
+        print(f"📑 Copia idéntica para {slot}: {first.name} / {other.name}")
+    for sha, slots in index.shared_contents().items():
+        print(f"📑 Mismo PDF en {len(slots)} meses: {', '.join('/'.join(slot[1:3]) for slot in slots)} "
+              f"({slots[0][0]}, {slots[0][3]})")
+    for slot, first, other in index.conflicts:
+        print(f"⚠️  Dos PDFs distintos para {slot}: {first.name} / {other.name}")
+    print(f"\n📁 {index.summary()}")
@@ -1,25 +1,63 @@
 #!/usr/bin/env python3
 """
 Script para extraer datos financieros de PDFs de TODOS los clientes
+
+Uso:
+    python extract_all_clients.py            # secuencial
+    python extract_all_clients.py --jobs 8   # 8 procesos en paralelo
+    python extract_all_clients.py --rebuild  # ignorar caché y re-extraer todo
+    python extract_all_clients.py --no-cache # no usar el caché
+    python extract_all_clients.py --no-templates  # no usar plantillas de layout
+    python extract_all_clients.py --metrics metrics/  # tiempos por etapa (JSON-lines + Prometheus)
+    python extract_all_clients.py --watch    # observar el árbol y publicar solo los meses nuevos
+    python extract_all_clients.py --pipeline -j 4 --queue-size 32  # leer/extraer/escribir traslapados
+    python extract_all_clients.py --client mrm --year 2025 --month 03  # solo ese cliente-mes
+    python extract_all_clients.py --since 2025-06 --statement bg       # solo balances desde junio 2025
+    python extract_all_clients.py -j 8 --low-memory --rss-warn 300     # una página a la vez por worker
+    python extract_all_clients.py --family generico   # forzar la familia de patrones (ver layout_family.py)
 """
 
-import pdfplumber
-import json
-import re
+import argparse
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import extract_financial_data
+from corpus_index import load_corpus_index
+from extraction_cache import add_cache_arguments, cache_from_args
+from instrumentation import METRICS, add_metrics_arguments, metrics_from_args
+from json_store import ClientJsonBatch, write_client_json, write_json_atomic
+from kpis import add_kpis
+from layout_family import FAMILY_CONTPAQ, FAMILY_GENERIC, add_family_arguments, families_from_args, fingerprint
+from layout_templates import LayoutTemplates
+from pdf_text import (ScanStats, add_backend_arguments, add_memory_arguments, add_text_store_arguments,
+                      backends_config, backends_from_args, configure_backends, configure_memory, configure_text_store,
+                      memory_config, memory_from_args, record_memory, record_text_store, scan_pdf,
+                      text_store_config, text_store_from_args)
+from pipeline import DEFAULT_QUEUE_SIZE, DEFAULT_READ_AHEAD, run_pipeline
+from scope import add_scope_arguments, scope_from_args
+from statement_scanner import FieldScanner
+from tree_watcher import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, TreeWatcher
+from verify_all_clients import DEFAULT_REPORT_PATH, run_verification
+from warehouse import add_warehouse_arguments, warehouse_from_args
+
+# Subir cuando cambien los patrones para invalidar el caché de extracción
+EXTRACTOR_VERSION = "3"
+
 # Mapeo de nombres de carpetas a IDs de clientes
+# encabezado: razón social como la imprime CONTPAQ i en la primera hoja
 CLIENT_MAPPING = {
-    "FIDUZ": {"id": "fiduz", "nombre": "FIDUZ", "razon": "FIDUZ S.A. de C.V."},
-    "Jose Manuel Luengas": {"id": "luengas", "nombre": "José Manuel Luengas", "razon": "José Manuel Luengas S.A. de C.V."},
-    "Josivna": {"id": "josivna", "nombre": "JOSIVNA", "razon": "JOSIVNA S.A. de C.V."},
-    "Leret Leret": {"id": "leret", "nombre": "Leret Leret", "razon": "Leret Leret S.A. de C.V."},
-    "Luenser": {"id": "luenser", "nombre": "Luenser", "razon": "Luenser S.A. de C.V."},
-    "MRM": {"id": "mrm", "nombre": "MRM", "razon": "MRM Ingeniería Integral S. de R.L. MI"},
-    "SINMSA": {"id": "sinmsa", "nombre": "SINMSA", "razon": "SINMSA S.A. de C.V."},
-    "Sedentarius": {"id": "sedentarius", "nombre": "Sedentarius", "razon": "Sedentarius S.A. de C.V."},
-    "Soluciones Whipple": {"id": "whipple", "nombre": "Soluciones Whipple", "razon": "Soluciones Whipple S.A. de C.V."},
-    "Vilego": {"id": "vilego", "nombre": "Vilego", "razon": "Vilego S.A. de C.V."}
+    "FIDUZ": {"id": "fiduz", "nombre": "FIDUZ", "razon": "FIDUZ S.A. de C.V.", "encabezado": "FIDUZ"},
+    "Jose Manuel Luengas": {"id": "luengas", "nombre": "José Manuel Luengas", "razon": "José Manuel Luengas S.A. de C.V.", "encabezado": "JOSE MANUEL LUENGAS MORALES"},
+    "Josivna": {"id": "josivna", "nombre": "JOSIVNA", "razon": "JOSIVNA S.A. de C.V.", "encabezado": "GRUPO JOSIVNA SA DE CV"},
+    "Leret Leret": {"id": "leret", "nombre": "Leret Leret", "razon": "Leret Leret S.A. de C.V.", "encabezado": "LERET LERET CASHMERE SA DE CV"},
+    "Luenser": {"id": "luenser", "nombre": "Luenser", "razon": "Luenser S.A. de C.V.", "encabezado": "LUENSER SA DE CV"},
+    "MRM": {"id": "mrm", "nombre": "MRM", "razon": "MRM Ingeniería Integral S. de R.L. MI", "encabezado": "MRM INGENIERIA INTEGRAL S DE RL MI"},
+    "SINMSA": {"id": "sinmsa", "nombre": "SINMSA", "razon": "SINMSA S.A. de C.V.", "encabezado": "SUMINISTROS DE INSUMOS NACIONALES DE MEXICO SA DE CV"},
+    "Sedentarius": {"id": "sedentarius", "nombre": "Sedentarius", "razon": "Sedentarius S.A. de C.V.", "encabezado": "SEDENTARIUS SA DE CV"},
+    "Soluciones Whipple": {"id": "whipple", "nombre": "Soluciones Whipple", "razon": "Soluciones Whipple S.A. de C.V.", "encabezado": "SOLUCIONES WHIPPLE"},
+    "Vilego": {"id": "vilego", "nombre": "Vilego", "razon": "Vilego S.A. de C.V.", "encabezado": "VILEGO SA DE CV"}
 }
 
 def clean_number(text):
@@ -32,45 +70,88 @@ def clean_number(text):
     except:
         return 0.0
 
-def extract_estado_resultados(pdf_path, month_str):
+# Patrones del Estado de Resultados: (periodo, %, acumulado). Los importes pueden
+# ser negativos y CONTPAQ i recorta los porcentajes que no caben ("33,355,..")
+ER_PATTERNS = {
+    # Total INGRESOS
+    "ingresos": [r'Total INGRESOS\s+(-?[\d,\.]+)\s+\S+\s+(-?[\d,\.]+)'],
+    # Total COSTO
+    "compras": [r'Total COSTO\s+(-?[\d,\.]+)\s+\S+\s+(-?[\d,\.]+)'],
+    # GASTOS GENERALES
+    "gastos": [r'(?:GASTOS GENERALES|Total GASTOS)\s+(-?[\d,\.]+)\s+\S+\s+(-?[\d,\.]+)'],
+}
+
+# Patrones del Balance General
+BG_PATTERNS = {
+    "bancos": [r'BANCOS\s+(-?[\d,\.]+)'],
+    "deudores": [r'DEUDORES DIVERSOS\s+(-?[\d,\.]+)'],
+    "clientes": [r'CLIENTES\s+(-?[\d,\.]+)'],
+    "ac": [r'Total ACTIVO CIRCULANTE\s+(-?[\d,\.]+)'],
+    "pc": [r'Total PASIVO CIRCULANTE\s+(-?[\d,\.]+)'],
+}
+
+# Todas las variantes se buscan en una sola pasada sobre el texto
+ER_SCANNER = FieldScanner(ER_PATTERNS)
+BG_SCANNER = FieldScanner(BG_PATTERNS)
+
+# Totales que siempre trae el estado: si el backend rápido no los encuentra se usa pdfplumber
+ER_REQUIRED = ("gastos",)
+BG_REQUIRED = ("ac", "pc")
+
+# Plantillas de layout del proceso (en el pool, una por worker; ver init_worker)
+_templates = None
+# Familia de layout de cada carpeta de cliente (layout_family.py), resuelta en el proceso principal
+_families = {}
+
+def init_worker(templates_enabled=True, metrics_config=None, memory=None, backends=None, text_store=None,
+                families=None):
+    """
+    Carga las plantillas de layout (y configura las métricas, la memoria, los
+    backends de texto, el almacén de texto y la familia de cada cliente) en el
+    proceso actual
+    """
+    global _templates, _families
+    _templates = LayoutTemplates(enabled=templates_enabled)
+    _families = dict(families or {})
+    if metrics_config:
+        METRICS.configure(**metrics_config)
+    if memory:
+        configure_memory(**memory)
+    if backends:
+        configure_backends(backends)
+    if text_store:
+        configure_text_store(text_store)
+
+def scan_statement(pdf_path, scanner, stats=None, template_key=None, required=None):
+    """Busca los campos por plantilla de layout si hay una para `template_key`"""
+    if template_key and _templates is not None:
+        return _templates.scan(template_key, pdf_path, scanner, stats, required)
+    return scan_pdf(pdf_path, scanner, stats=stats, required=required)
+
+def extract_estado_resultados(pdf_path, month_str, stats=None, template_key=None):
     """Extrae datos del Estado de Resultados"""
     data_periodo = {"mes": month_str, "ingresos": 0, "compras": 0, "gastos": 0, "prodFin": 0, "gastFin": 0, "utilidad": 0}
     data_ytd = {"mes": month_str, "ingresosYTD": 0, "comprasYTD": 0, "gastosYTD": 0, "prodFinYTD": 0, "gastFinYTD": 0, "utilidadYTD": 0}
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-            
-            # Buscar Total INGRESOS
-            ingresos_match = re.search(r'Total INGRESOS\s+([\d,\.]+)\s+[\d\.]+\s+([\d,\.]+)', text)
-            if ingresos_match:
-                data_periodo["ingresos"] = clean_number(ingresos_match.group(1))
-                data_ytd["ingresosYTD"] = clean_number(ingresos_match.group(2))
-            
-            # Buscar Total COSTO
-            costo_match = re.search(r'Total COSTO\s+([\d,\.]+)\s+[\d\.]+\s+([\d,\.]+)', text)
-            if costo_match:
-                data_periodo["compras"] = clean_number(costo_match.group(1))
-                data_ytd["comprasYTD"] = clean_number(costo_match.group(2))
-            
-            # Buscar GASTOS GENERALES
-            gastos_match = re.search(r'(?:GASTOS GENERALES|Total GASTOS)\s+([\d,\.]+)\s+[\d\.]+\s+([\d,\.]+)', text)
-            if gastos_match:
-                data_periodo["gastos"] = clean_number(gastos_match.group(1))
-                data_ytd["gastosYTD"] = clean_number(gastos_match.group(2))
-            
-            # Calcular utilidad
-            data_periodo["utilidad"] = data_periodo["ingresos"] - data_periodo["compras"] - data_periodo["gastos"]
-            data_ytd["utilidadYTD"] = data_ytd["ingresosYTD"] - data_ytd["comprasYTD"] - data_ytd["gastosYTD"]
+        matches = scan_statement(pdf_path, ER_SCANNER, stats, template_key, ER_REQUIRED)
+        
+        for key, match in matches.items():
+            data_periodo[key] = clean_number(match.group(1))
+            data_ytd[key + "YTD"] = clean_number(match.group(2))
+        
+        # Calcular utilidad
+        data_periodo["utilidad"] = data_periodo["ingresos"] - data_periodo["compras"] - data_periodo["gastos"]
+        data_ytd["utilidadYTD"] = data_ytd["ingresosYTD"] - data_ytd["comprasYTD"] - data_ytd["gastosYTD"]
             
     except Exception as e:
         print(f"  ⚠️  Error leyendo {pdf_path.name}: {e}")
+        if stats is not None:
+            stats.errors += 1
     
     return data_periodo, data_ytd
 
-def extract_balance_general(pdf_path, month_str):
+def extract_balance_general(pdf_path, month_str, stats=None, template_key=None):
     """Extrae datos del Balance General"""
     data = {
         "mes": month_str,
@@ -80,47 +161,202 @@ def extract_balance_general(pdf_path, month_str):
     }
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-            
-            # Buscar BANCOS
-            bancos_match = re.search(r'BANCOS\s+([\d,\.]+)', text)
-            if bancos_match:
-                data["bancos"] = clean_number(bancos_match.group(1))
-            
-            # Buscar DEUDORES DIVERSOS
-            deudores_match = re.search(r'DEUDORES DIVERSOS\s+([\d,\.]+)', text)
-            if deudores_match:
-                data["deudores"] = clean_number(deudores_match.group(1))
-            
-            # Buscar CLIENTES
-            clientes_match = re.search(r'CLIENTES\s+([\d,\.]+)', text)
-            if clientes_match:
-                data["clientes"] = clean_number(clientes_match.group(1))
-            
-            # Buscar Total ACTIVO CIRCULANTE
-            ac_match = re.search(r'Total ACTIVO CIRCULANTE\s+([\d,\.]+)', text)
-            if ac_match:
-                data["ac"] = clean_number(ac_match.group(1))
-            
-            # Buscar Total PASIVO CIRCULANTE
-            pc_match = re.search(r'Total PASIVO CIRCULANTE\s+([\d,\.]+)', text)
-            if pc_match:
-                data["pc"] = clean_number(pc_match.group(1))
+        matches = scan_statement(pdf_path, BG_SCANNER, stats, template_key, BG_REQUIRED)
+        
+        for key, match in matches.items():
+            data[key] = clean_number(match.group(1))
             
     except Exception as e:
         print(f"  ⚠️  Error leyendo {pdf_path.name}: {e}")
+        if stats is not None:
+            stats.errors += 1
     
     return data
 
-def process_client_folder(client_folder, client_info):
-    """Procesa la carpeta de un cliente"""
-    print(f"\n{'='*70}")
-    print(f"📂 PROCESANDO: {client_info['nombre']}")
-    print(f"{'='*70}")
+def extract_estado_resultados_generico(pdf_path, month_str, stats=None, template_key=None):
+    """Estado de Resultados de la familia genérica (patrones de extract_financial_data, sin acumulado)"""
+    periodo, ytd = extract_financial_data.extract_estado_resultados(pdf_path, stats)
+    data_periodo = {"mes": month_str, "ingresos": 0, "compras": 0, "gastos": 0, "prodFin": 0, "gastFin": 0, "utilidad": 0}
+    data_ytd = {"mes": month_str, "ingresosYTD": 0, "comprasYTD": 0, "gastosYTD": 0, "prodFinYTD": 0, "gastFinYTD": 0, "utilidadYTD": 0}
+    return {**data_periodo, **periodo}, {**data_ytd, **ytd}
+
+def extract_balance_general_generico(pdf_path, month_str, stats=None, template_key=None):
+    """Balance General de la familia genérica (patrones de extract_financial_data)"""
+    return {"mes": month_str, **extract_financial_data.extract_balance_general(pdf_path, stats)}
+
+# Familia de layout -> extractores (estado de resultados, balance general)
+FAMILY_EXTRACTORS = {
+    FAMILY_CONTPAQ: (extract_estado_resultados, extract_balance_general),
+    FAMILY_GENERIC: (extract_estado_resultados_generico, extract_balance_general_generico),
+}
+
+def job_family(job):
+    """Familia de layout del cliente de la tarea; si no se resolvió antes, se reconoce con este PDF"""
+    _, _, pdf_path, _, client = job
+    if client not in _families:
+        _families[client] = fingerprint(pdf_path)[0]
+    return _families[client]
+
+def plan_client_folder(client_folder, index=None):
+    """
+    Arma la lista ordenada de extracciones de un cliente a partir del índice del
+    árbol de PDFs (ver corpus_index.py). Cada tarea es (año, tipo, ruta_pdf, mes,
+    carpeta cliente) con tipo "er" o "bg"; el orden de la lista es el mismo en que se agregan los
+    meses al JSON (año y mes ascendentes).
+    """
+    if index is None:
+        index = load_corpus_index(client_folder.parent)
+    
+    client = client_folder.name
+    jobs = []
+    for year_name in index.years(client):
+        print(f"\n📅 Año {year_name}")
+        
+        for month_num in index.months(client, year_name):
+            month = month_jobs(index, client, year_name, month_num)
+            if month:
+                print(f"  ├─ Mes {month_num}")
+                jobs.extend(month)
+    
+    return jobs
+
+def month_jobs(index, client, year_name, month_num):
+    """Tareas de extracción (estado de resultados y balance) de un solo mes"""
+    month_str = f"{year_name}-{month_num}"
+    jobs = []
+    er_file = index.get(client, year_name, month_num, "estado_resultados")
+    if er_file:
+        jobs.append((year_name, "er", er_file, month_str, client))
+    bg_file = index.get(client, year_name, month_num, "balance_general")
+    if bg_file:
+        jobs.append((year_name, "bg", bg_file, month_str, client))
+    return jobs
+
+def run_job(job):
+    """
+    Ejecuta una tarea de extracción (debe ser de nivel módulo para el pool).
+    Regresa (resultado, ScanStats, plantillas aprendidas, eventos de métricas)
+    para sumar en el proceso principal las páginas omitidas, las plantillas
+    nuevas y los tiempos por etapa.
+    """
+    _, kind, pdf_path, month_str, client = job
+    stats = ScanStats()
+    template_key = f"{client}|{kind}"
+    extract_er, extract_bg = FAMILY_EXTRACTORS[job_family(job)]
+    if kind == "er":
+        result = extract_er(pdf_path, month_str, stats, template_key)
+    else:
+        result = extract_bg(pdf_path, month_str, stats, template_key)
+    learned = _templates.take_learned() if _templates is not None else {}
+    record_memory(stats)
+    record_text_store(stats)
+    return result, stats, learned, METRICS.drain()
+
+def _cache_namespace(kind, family=FAMILY_CONTPAQ):
+    if family == FAMILY_CONTPAQ:
+        return f"extract_all_clients.{kind}"
+    return f"extract_all_clients.{family}.{kind}"
+
+def _with_month(kind, result, month_str):
+    """El caché guarda resultados por contenido; el mes depende de la ruta"""
+    if kind == "er":
+        periodo, ytd = result
+        return {**periodo, "mes": month_str}, {**ytd, "mes": month_str}
+    return {**result, "mes": month_str}
+
+def _cache_version(job, templates=None):
+    """
+    Versión del resultado en el caché: EXTRACTOR_VERSION más la huella de la
+    plantilla de layout del cliente y tipo (la familia genérica no usa plantillas)
+    """
+    _, kind, _, _, client = job
+    if templates is None or job_family(job) != FAMILY_CONTPAQ:
+        return EXTRACTOR_VERSION
+    return f"{EXTRACTOR_VERSION}+{templates.digest(f'{client}|{kind}')}"
+
+def _indexed_sha(job, index=None):
+    """sha256 del PDF según el índice del corpus (None si no está indexado: el caché lo calcula)"""
+    return index.content_hash(job[2]) if index is not None else None
+
+def _cached_result(job, cache, templates=None, index=None):
+    """Resultado guardado de la tarea (con su mes), o None"""
+    _, kind, pdf_path, month_str, _ = job
+    if not cache:
+        return None
+    cached = cache.get(_cache_namespace(kind, job_family(job)), _cache_version(job, templates), pdf_path,
+                       sha=_indexed_sha(job, index))
+    return _with_month(kind, cached, month_str) if cached is not None else None
+
+def _collect(job, output, cache=None, stats=None, templates=None, index=None):
+    """
+    Suma en el proceso principal lo que regresó run_job y guarda el resultado en el
+    caché (salvo si el PDF no se pudo leer: un error pasajero no se queda en ceros)
+    """
+    _, kind, pdf_path, _, _ = job
+    result, job_stats, learned, events = output
+    METRICS.extend(events)
+    if stats is not None:
+        stats.merge(job_stats)
+    if templates is not None:
+        templates.update(learned)
+    if cache and not job_stats.errors:
+        cache.put(_cache_namespace(kind, job_family(job)), _cache_version(job, templates), pdf_path, result,
+                  sha=_indexed_sha(job, index))
+    return result
+
+def _content_key(job, index=None):
+    """
+    Llave de deduplicación: tipo + familia + sha256 del PDF (según el índice), o
+    la ruta si no está indexado
+    """
+    _, kind, pdf_path, _, _ = job
+    return kind, job_family(job), _indexed_sha(job, index) or str(pdf_path)
+
+def _copy_result(job, source_job, result, stats=None):
+    """Resultado de un PDF idéntico a `source_job`, con el mes de `job`"""
+    _, kind, pdf_path, month_str, _ = job
+    if stats is not None:
+        stats.copies += 1
+        source = stats.sources.get(str(source_job[2]))
+        if source:
+            stats.sources[str(pdf_path)] = source
+    return _with_month(kind, result, month_str)
+
+def run_jobs(jobs, executor=None, cache=None, stats=None, templates=None, index=None, workers=1):
+    """
+    Ejecuta las tareas en orden o en un pool de procesos de `workers` procesos.
+    Los resultados se regresan en el mismo orden que las tareas. Con caché,
+    solo se extraen los PDFs que no tienen un resultado guardado. Con `index`,
+    las copias idénticas (mismo contenido y tipo) se extraen una sola vez y el
+    resultado se reparte a cada mes. Si se pasa `stats` se le suman las páginas
+    leídas/omitidas; si se pasa `templates` se le agregan las plantillas de
+    layout aprendidas en los workers.
+    """
+    results = [_cached_result(job, cache, templates, index) for job in jobs]
+    first = {}
+    copies = {}
+    for i, result in enumerate(results):
+        if result is None:
+            copies[i] = first.setdefault(_content_key(jobs[i], index), i)
+    pending = list(first.values())
+    
+    pending_jobs = [jobs[i] for i in pending]
+    if executor is None:
+        extracted = [run_job(job) for job in pending_jobs]
+    else:
+        chunksize = max(1, len(pending_jobs) // (workers * 4))
+        extracted = list(executor.map(run_job, pending_jobs, chunksize=chunksize))
     
+    for i, output in zip(pending, extracted):
+        results[i] = _collect(jobs[i], output, cache, stats, templates, index)
+    for i, source in copies.items():
+        if i != source:
+            results[i] = _copy_result(jobs[i], jobs[source], results[source], stats)
+    
+    return results
+
+def build_client_data(client_info, jobs, results):
+    """Acomoda los resultados en la estructura years -> listas del cliente"""
     all_data = {
         "clienteId": client_info["id"],
         "clienteNombre": client_info["nombre"],
@@ -128,112 +364,354 @@ def process_client_folder(client_folder, client_info):
         "years": {}
     }
     
-    # Buscar carpetas de años
-    for year_folder in sorted(client_folder.iterdir()):
-        if not year_folder.is_dir():
-            continue
-        
-        year_name = year_folder.name
-        
-        # Verificar si es un año válido
-        if not (year_name.isdigit() and len(year_name) == 4):
-            continue
-        
-        print(f"\n📅 Año {year_name}")
-        
-        year_data = {
+    years = {}
+    for (year_name, kind, _, _, _), result in zip(jobs, results):
+        year_data = years.setdefault(year_name, {
             "estadoResultadosPeriodo": [],
             "estadoResultadosYTD": [],
             "balanceGeneral": []
-        }
-        
-        # Buscar archivos directamente en la carpeta del año (como 2024)
-        direct_files = list(year_folder.glob("*.pdf"))
-        if direct_files:
-            # Archivos directos en carpeta de año
-            er_files = [f for f in direct_files if "resultados" in f.name.lower() or "edo" in f.name.lower()]
-            bg_files = [f for f in direct_files if "balance" in f.name.lower() or "posicion" in f.name.lower()]
-            
-            # Extraer mes del nombre del archivo - dos formatos posibles:
-            # Formato 1: "12 2024 Estado de Resultados.pdf"
-            # Formato 2: "Estado de Resultados 01 Ene 2024.pdf"
-            for er_file in er_files:
-                month_num = None
-                
-                # Intentar formato 1: "12 2024"
-                month_match = re.search(r'(\d{2})\s*' + year_name, er_file.name)
-                if month_match:
-                    month_num = month_match.group(1)
-                else:
-                    # Intentar formato 2: "01 Ene 2024" o solo "01"
-                    month_match = re.search(r'(\d{2})\s*(?:Ene|Feb|Mar|Abr|May|Jun|Jul|Ago|Sep|Oct|Nov|Dic)', er_file.name)
-                    if month_match:
-                        month_num = month_match.group(1)
-                
-                if month_num:
-                    month_str = f"{year_name}-{month_num}"
-                    print(f"  ├─ Mes {month_num}")
-                    
-                    periodo, ytd = extract_estado_resultados(er_file, month_str)
-                    year_data["estadoResultadosPeriodo"].append(periodo)
-                    year_data["estadoResultadosYTD"].append(ytd)
-                    
-                    # Buscar balance correspondiente
-                    bg_file = next((f for f in bg_files if month_num in f.name), None)
-                    if bg_file:
-                        bg = extract_balance_general(bg_file, month_str)
-                        year_data["balanceGeneral"].append(bg)
-        
-        # Buscar subcarpetas de meses (varios formatos posibles)
-        for month_folder in sorted(year_folder.iterdir()):
-            if not month_folder.is_dir():
-                continue
-            
-            folder_name = month_folder.name
-            month_num = None
-            
-            # Formato 1: Solo número "01", "02"
-            if folder_name.isdigit() and len(folder_name) == 2:
-                month_num = folder_name
-            else:
-                # Formato 2: "01 ENERO", "02.-Febrero", "1.ENERO 2024", etc.
-                # Extraer los primeros 1-2 dígitos
-                match = re.match(r'(\d{1,2})', folder_name)
-                if match:
-                    month_num = match.group(1).zfill(2)  # Asegurar 2 dígitos
-            
-            if not month_num:
-                continue
-            
-            month_str = f"{year_name}-{month_num}"
-            print(f"  ├─ Mes {month_num}")
-            
-            er_files = list(month_folder.glob("*EDO*RESULTADOS*.pdf")) or \
-                      list(month_folder.glob("*Estado*Resultados*.pdf")) or \
-                      list(month_folder.glob("*ESTADO*RESULTADOS*.pdf")) or \
-                      list(month_folder.glob("*resultados*.pdf"))
-            bg_files = list(month_folder.glob("*balance*.pdf")) or \
-                      list(month_folder.glob("*BALANCE*.pdf"))
-            
-            if er_files:
-                periodo, ytd = extract_estado_resultados(er_files[0], month_str)
-                year_data["estadoResultadosPeriodo"].append(periodo)
-                year_data["estadoResultadosYTD"].append(ytd)
-            
-            if bg_files:
-                bg = extract_balance_general(bg_files[0], month_str)
-                year_data["balanceGeneral"].append(bg)
-        
+        })
+        if kind == "er":
+            periodo, ytd = result
+            year_data["estadoResultadosPeriodo"].append(periodo)
+            year_data["estadoResultadosYTD"].append(ytd)
+        else:
+            year_data["balanceGeneral"].append(result)
+    
+    for year_name in sorted(years):
+        year_data = years[year_name]
         if year_data["estadoResultadosPeriodo"]:
             all_data["years"][year_name] = year_data
-            print(f"  └─ ✅ {len(year_data['estadoResultadosPeriodo'])} meses procesados")
+            print(f"  └─ ✅ {year_name}: {len(year_data['estadoResultadosPeriodo'])} meses procesados")
     
     return all_data
 
+def text_source_rows(jobs, sources):
+    """(cliente, mes, estado, backend, archivo) de las tareas leídas en esta corrida"""
+    rows = []
+    for _, kind, pdf_path, month_str, folder in jobs:
+        backend = sources.get(str(pdf_path))
+        if backend:
+            rows.append((CLIENT_MAPPING[folder]["id"], month_str, kind, backend, Path(pdf_path).name))
+    return rows
+
+def save_client_json(data, output_dir, columnar=False):
+    """Guarda el JSON del cliente (y sus fragmentos por año)"""
+    output_path = output_dir / f"{data['clienteId']}.json"
+    write_client_json(output_path, data, columnar)
+    print(f"✅ JSON guardado: {output_path.name}")
+
+def publish_client_month(index, folder_name, year_name, month_num, output_dir, cache=None, warehouse=None):
+    """
+    Extrae un solo mes de un cliente y lo escribe en su JSON sin tocar los demás
+    meses. Regresa False si el mes ya no tiene PDFs.
+    """
+    client_info = CLIENT_MAPPING[folder_name]
+    jobs = month_jobs(index, folder_name, year_name, month_num)
+    if not jobs:
+        print(f"  ⚠️  {client_info['nombre']} {year_name}-{month_num}: sin PDFs, el JSON no cambia")
+        return False
+    results = run_jobs(jobs, cache=cache, templates=_templates)
+    write_client_month(folder_name, year_name, month_num, jobs, results, output_dir, warehouse)
+    return True
+
+def write_client_month(folder_name, year_name, month_num, jobs, results, output_dir, warehouse=None):
+    """
+    Reemplaza en el JSON del cliente las listas del mes con los resultados de sus
+    tareas, sin tocar los demás meses. Regresa {lista: renglón} de lo escrito.
+    """
+    client_info = CLIENT_MAPPING[folder_name]
+    items = {}
+    for (_, kind, _, _, _), result in zip(jobs, results):
+        if kind == "er":
+            items["estadoResultadosPeriodo"], items["estadoResultadosYTD"] = result
+        else:
+            items["balanceGeneral"] = result
+    
+    json_path = output_dir / f"{client_info['id']}.json"
+    if not json_path.exists():
+        write_json_atomic(json_path, build_client_data(client_info, [], []))
+    batch = ClientJsonBatch(json_path, warehouse)
+    batch.update_lists(year_name, month_num, items)
+    batch.save()
+    print(f"  ✅ {client_info['nombre']} {year_name}-{month_num} → {json_path.name}")
+    return items
+
+def watch_tree(base_path, output_dir, cache, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL,
+               warehouse=None):
+    """
+    Observa el árbol de PDFs y publica cada cliente-mes en cuanto sus PDFs
+    terminan de copiarse. Al arrancar procesa también los PDFs que el caché no
+    conoce (los que llegaron con el observador apagado), todos en una sola
+    extracción y un solo guardado por cliente. Con el caché vacío no se intenta
+    ponerse al día: eso es una extracción completa.
+    """
+    index = load_corpus_index(base_path)
+    watcher = TreeWatcher(base_path, debounce, poll_interval)
+    print(f"👀 Observando {base_path.name} ({watcher.backend}). Ctrl+C para salir.")
+    if cache.enabled and cache.empty:
+        print("⚠️  El caché está vacío: corre primero una extracción completa "
+              "(python3 extract_all_clients.py); solo se publican los cambios desde ahora")
+    elif cache.enabled:
+        missed = sorted({
+            (folder, year_name, month_num) for (folder, year_name, month_num, kind), path in index.entries()
+            if kind in ("estado_resultados", "balance_general") and folder in CLIENT_MAPPING
+            and not cache.is_current(path)
+        })
+        if missed:
+            jobs = [job for folder, year_name, month_num in missed
+                    for job in month_jobs(index, folder, year_name, month_num)]
+            print(f"📄 {len(missed)} mes(es) con PDFs nuevos desde la última corrida")
+            publish_jobs(index, jobs, output_dir, cache=cache, warehouse=warehouse)
+            cache.save()
+            _templates.save()
+    
+    try:
+        for changed in watcher.batches():
+            old_slots = {path: slot for slot, path in index.entries()}
+            index = load_corpus_index(base_path)
+            new_slots = {path: slot for slot, path in index.entries()}
+            months = sorted({
+                slots[path][:3]
+                for slots in (old_slots, new_slots) for path in changed if path in slots
+            })
+            for folder_name, year_name, month_num in months:
+                if folder_name not in CLIENT_MAPPING:
+                    print(f"  ⚠️  Carpeta sin cliente asignado: {folder_name}")
+                    continue
+                try:
+                    publish_client_month(index, folder_name, year_name, month_num, output_dir, cache, warehouse)
+                except Exception as e:
+                    print(f"  ❌ ERROR publicando {folder_name} {year_name}-{month_num}: {e}")
+            cache.save()
+            _templates.save()
+    except KeyboardInterrupt:
+        print("\n👋 Observador detenido")
+    finally:
+        watcher.close()
+
+def publish_scope(index, scope, output_dir, executor=None, cache=None, warehouse=None, stats=None, workers=1):
+    """
+    Extrae solo el alcance pedido (--client/--year/--month/--since/--statement)
+    y reemplaza esos meses en los JSON sin tocar los demás.
+    Regresa (clientes actualizados, errores).
+    """
+    selected = [folder for folder, info in CLIENT_MAPPING.items() if scope.client(folder, info["id"])]
+    unknown = set(scope.clients) - {name.lower() for folder in selected
+                                    for name in (folder, CLIENT_MAPPING[folder]["id"])}
+    for name in sorted(unknown):
+        print(f"⚠️  Cliente desconocido: {name}")
+    
+    jobs = [job for folder in selected
+            for year_name in index.years(folder)
+            for month_num in index.months(folder, year_name) if scope.period(year_name, month_num)
+            for job in month_jobs(index, folder, year_name, month_num) if scope.statement(job[1])]
+    print(f"\n⚙️  Extrayendo {len(jobs)} PDFs ({scope.describe()}) con {workers} proceso(s)...")
+    processed, errors = publish_jobs(index, jobs, output_dir, executor, cache, warehouse, stats, workers)
+    return processed, errors + len(unknown)
+
+def publish_jobs(index, jobs, output_dir, executor=None, cache=None, warehouse=None, stats=None, workers=1):
+    """
+    Extrae las tareas en una sola corrida y reemplaza sus meses en los JSON, con
+    un solo guardado por cliente. Regresa (clientes actualizados, errores).
+    """
+    results = run_jobs(jobs, executor, cache, stats, _templates, index, workers)
+    
+    # Un solo update por mes aunque se extraigan sus dos estados
+    months = {}
+    for (year_name, kind, _, month_str, folder), result in zip(jobs, results):
+        items = months.setdefault((folder, year_name, month_str[5:]), {})
+        if kind == "er":
+            items["estadoResultadosPeriodo"], items["estadoResultadosYTD"] = result
+        else:
+            items["balanceGeneral"] = result
+    
+    batches = {}
+    for (folder, year_name, month_num), items in months.items():
+        if folder not in batches:
+            client_info = CLIENT_MAPPING[folder]
+            json_path = output_dir / f"{client_info['id']}.json"
+            if not json_path.exists():
+                write_json_atomic(json_path, build_client_data(client_info, [], []))
+            batches[folder] = ClientJsonBatch(json_path, warehouse)
+        batches[folder].update_lists(year_name, month_num, items)
+    
+    if warehouse is not None and stats is not None:
+        warehouse.record_text_sources(text_source_rows(jobs, stats.sources))
+    processed = errors = 0
+    for folder, batch in batches.items():
+        try:
+            written = batch.save()
+            print(f"✅ {CLIENT_MAPPING[folder]['nombre']}: {written} mes(es) → {batch.json_path.name}")
+            processed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR guardando {folder}: {e}")
+            errors += 1
+    return processed, errors
+
+def extract_with_pipeline(index, base_path, output_dir, cache, warehouse, workers, args, metrics, families=None):
+    """
+    --pipeline: descubrimiento, lectura, extracción y escritura traslapados con
+    colas acotadas (ver pipeline.py). Cada cliente se escribe (almacén, KPIs y
+    JSON) en cuanto terminan sus PDFs, sin esperar a los demás.
+    Regresa (clientes procesados, errores).
+    """
+    counts = {"processed": 0, "errors": 0}
+    folders = []
+    for folder_name in CLIENT_MAPPING:
+        if (base_path / folder_name).exists():
+            folders.append(folder_name)
+        else:
+            print(f"\n⚠️  ADVERTENCIA: No se encuentra carpeta '{folder_name}'")
+            counts["errors"] += 1
+    
+    def groups():
+        # Las tareas de cada cliente salen del índice mes por mes, sin armar la lista completa
+        for folder_name in folders:
+            yield folder_name, (job for year_name in index.years(folder_name)
+                                for month_num in index.months(folder_name, year_name)
+                                for job in month_jobs(index, folder_name, year_name, month_num))
+    
+    def write(folder_name, jobs, results):
+        client_info = CLIENT_MAPPING[folder_name]
+        print(f"\n📂 {client_info['nombre']} ({len(jobs)} PDFs)")
+        try:
+            data = build_client_data(client_info, jobs, results)
+            if warehouse.enabled:
+                warehouse.replace_clients([data])
+                warehouse.record_text_sources(text_source_rows(jobs, scan_stats.sources))
+                data = warehouse.client_data(data["clienteId"])
+            add_kpis([data])
+            save_client_json(data, output_dir, args.columnar)
+            counts["processed"] += 1
+        except Exception as e:
+            print(f"\n❌ ERROR procesando {folder_name}: {e}")
+            counts["errors"] += 1
+    
+    scan_stats = ScanStats()
+    templates_enabled = not args.no_templates
+    init_worker(templates_enabled, families=families)
+    print(f"\n⚙️  Pipeline: {workers} proceso(s), colas de {args.queue_size}, "
+          f"{args.read_ahead} lectura(s) anticipada(s)...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(templates_enabled, metrics.config(), memory_config(), backends_config(),
+                                       text_store_config(), families)) as executor:
+        asyncio.run(run_pipeline(
+            groups(), executor,
+            path_of=lambda job: job[2],
+            # Con el sha256 del índice ni la búsqueda en el caché ni el collect releen el PDF
+            cached=lambda job: _cached_result(job, cache, _templates, index),
+            extract=run_job,
+            collect=lambda job, output: _collect(job, output, cache, scan_stats, _templates, index),
+            write=write,
+            # Copias idénticas (mismo contenido y tipo): se extraen una vez
+            key=lambda job: _content_key(job, index),
+            copy=lambda job, source_job, result: _copy_result(job, source_job, result, scan_stats),
+            workers=workers,
+            queue_size=args.queue_size,
+            read_ahead_limit=args.read_ahead,
+        ))
+    
+    print(f"\n📄 {scan_stats.summary()}")
+    _templates.save()
+    cache.prune()
+    cache.save()
+    if cache.enabled:
+        print(f"💾 {cache.summary()}")
+    if warehouse.enabled:
+        print(f"🗄️  Almacén actualizado: {warehouse.path}")
+    return counts["processed"], counts["errors"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extrae datos financieros de PDFs de todos los clientes")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Número de procesos para extraer PDFs en paralelo (default: 1, 0 = todos los núcleos)"
+    )
+    parser.add_argument(
+        "--no-templates", action="store_true",
+        help="No usar plantillas de layout: leer siempre el texto completo con pdfplumber"
+    )
+    parser.add_argument(
+        "--columnar", action="store_true",
+        help="Escribir también <id>.columnar.json (un arreglo por campo sobre un eje de meses)"
+    )
+    parser.add_argument(
+        "--verify", action="store_true",
+        help="Al terminar, verificar la consistencia de los JSON (verify_all_clients.py)"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Observar el árbol de PDFs y publicar solo los cliente-mes que cambien"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=DEFAULT_DEBOUNCE,
+        help="Segundos sin cambios antes de procesar un PDF nuevo (default: 2)"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+        help="Segundos entre recorridos del árbol cuando no hay inotify (default: 5)"
+    )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="Pipeline asíncrono: leer, extraer y escribir cada cliente en cuanto termina (colas acotadas)"
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+        help=f"Con --pipeline, tareas/resultados en espera como máximo (default: {DEFAULT_QUEUE_SIZE})"
+    )
+    parser.add_argument(
+        "--read-ahead", type=int, default=DEFAULT_READ_AHEAD,
+        help=f"Con --pipeline, PDFs que se leen del disco a la vez (default: {DEFAULT_READ_AHEAD})"
+    )
+    add_scope_arguments(parser)
+    add_memory_arguments(parser)
+    add_backend_arguments(parser)
+    add_text_store_arguments(parser)
+    add_family_arguments(parser)
+    add_cache_arguments(parser)
+    add_warehouse_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+def resolve_families(families, index):
+    """Familia de layout de cada cliente con PDFs en el índice (ver layout_family.py)"""
+    resolved = families.resolve(index, CLIENT_MAPPING)
+    families.save()
+    print(f"📑 {families.summary(resolved)}")
+    return resolved
+
+def verify_output(output_dir):
+    """--verify: reglas de consistencia de verify_all_clients.py sobre los JSON recién escritos"""
+    report = run_verification(output_dir)
+    failures = {name: rule["fallas"] for name, rule in report["reglas"].items() if rule["fallas"]}
+    detail = ", ".join(f"{name} {count}" for name, count in failures.items())
+    print(f"🔍 Verificación: {report['totales']['fallas']} falla(s){f' ({detail})' if detail else ''} "
+          f"en {report['seconds'] * 1000:.0f} ms → {DEFAULT_REPORT_PATH}")
+
+def print_summary(processed, errors):
+    print("\n" + "="*70)
+    print("📊 RESUMEN FINAL")
+    print("="*70)
+    print(f"✅ Clientes procesados: {processed}")
+    print(f"❌ Errores: {errors}")
+    print(f"📁 Total clientes: {len(CLIENT_MAPPING)}")
+    print("="*70)
+
 def main():
     """Procesa todos los clientes"""
+    args = parse_args()
     base_path = Path(__file__).parent.parent / "Ejercicio Analisis MRM Vilego Luenser y otros"
     output_dir = Path(__file__).parent.parent / "public" / "data" / "clients"
+    workers = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    cache = cache_from_args(args)
+    warehouse = warehouse_from_args(args)
+    metrics = metrics_from_args(args)
+    scope = scope_from_args(args)
+    memory = memory_from_args(args)
+    backends = backends_from_args(args)
+    text_store = text_store_from_args(args)
+    families = families_from_args(args)
     
     print("="*70)
     print("🚀 EXTRACTOR MASIVO DE DATOS FINANCIEROS")
@@ -243,9 +721,56 @@ def main():
         print(f"❌ ERROR: No se encuentra la carpeta {base_path}")
         return
     
+    if args.watch:
+        client_families = resolve_families(families, load_corpus_index(base_path))
+        init_worker(not args.no_templates, families=client_families)
+        watch_tree(base_path, output_dir, cache, args.debounce, args.poll_interval, warehouse)
+        warehouse.close()
+        return
+    
     processed = 0
     errors = 0
     
+    # 1. Recorrer el árbol una vez y armar todas las tareas de todos los clientes
+    index = load_corpus_index(base_path)
+    print(f"📁 {index.summary()}")
+    for slot, first, other in index.duplicates:
+        print(f"📑 Copia idéntica para {slot}: {first.name} / {other.name} (se lee una vez)")
+    for slot, first, other in index.conflicts:
+        print(f"⚠️  Dos PDFs distintos para {slot}: se usa {first.name}, se ignora {other.name}")
+    client_families = resolve_families(families, index)
+    
+    if not scope.is_full:
+        # Solo el alcance pedido: se actualizan esos meses y el resto del JSON se conserva
+        scan_stats = ScanStats()
+        templates_enabled = not args.no_templates
+        init_worker(templates_enabled, families=client_families)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=(templates_enabled, metrics.config(), memory, backends, text_store,
+                                               client_families)) as executor:
+                processed, errors = publish_scope(index, scope, output_dir, executor, cache, warehouse, scan_stats,
+                                                  workers)
+        else:
+            processed, errors = publish_scope(index, scope, output_dir, cache=cache, warehouse=warehouse,
+                                              stats=scan_stats)
+        print(f"📄 {scan_stats.summary()}")
+        _templates.save()
+        cache.save()
+    elif args.pipeline:
+        processed, errors = extract_with_pipeline(index, base_path, output_dir, cache, warehouse,
+                                                  workers, args, metrics, client_families)
+    
+    if args.pipeline or not scope.is_full:
+        print_summary(processed, errors)
+        if args.verify:
+            verify_output(output_dir)
+        warehouse.close()
+        if args.metrics:
+            metrics.export(args.metrics, "extract_all_clients", args.slowest)
+        return
+    
+    plans = []
     for folder_name, client_info in CLIENT_MAPPING.items():
         client_folder = base_path / folder_name
         
@@ -254,28 +779,76 @@ def main():
             errors += 1
             continue
         
+        print(f"\n{'='*70}")
+        print(f"📂 PROCESANDO: {client_info['nombre']}")
+        print(f"{'='*70}")
+        
         try:
-            data = process_client_folder(client_folder, client_info)
-            
-            # Guardar JSON
-            output_path = output_dir / f"{client_info['id']}.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            print(f"\n✅ JSON guardado: {output_path.name}")
-            processed += 1
-            
+            plans.append((folder_name, client_info, plan_client_folder(client_folder, index)))
         except Exception as e:
             print(f"\n❌ ERROR procesando {folder_name}: {e}")
             errors += 1
     
-    print("\n" + "="*70)
-    print("📊 RESUMEN FINAL")
-    print("="*70)
-    print(f"✅ Clientes procesados: {processed}")
-    print(f"❌ Errores: {errors}")
-    print(f"📁 Total clientes: {len(CLIENT_MAPPING)}")
-    print("="*70)
+    # 2. Extraer todos los PDFs (en paralelo si se pidió --jobs)
+    all_jobs = [job for _, _, jobs in plans for job in jobs]
+    scan_stats = ScanStats()
+    print(f"\n⚙️  Extrayendo {len(all_jobs)} PDFs con {workers} proceso(s)...")
+    templates_enabled = not args.no_templates
+    init_worker(templates_enabled, families=client_families)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(templates_enabled, metrics.config(), memory, backends, text_store,
+                                           client_families)) as executor:
+            all_results = run_jobs(all_jobs, executor, cache, scan_stats, _templates, index, workers)
+    else:
+        all_results = run_jobs(all_jobs, cache=cache, stats=scan_stats, templates=_templates, index=index)
+    
+    print(f"📄 {scan_stats.summary()}")
+    _templates.save()
+    cache.prune()
+    cache.save()
+    if cache.enabled:
+        print(f"💾 {cache.summary()}")
+    
+    # 3. Reacomodar resultados por cliente
+    clients = []
+    offset = 0
+    for folder_name, client_info, jobs in plans:
+        results = all_results[offset:offset + len(jobs)]
+        offset += len(jobs)
+        
+        print(f"\n📂 {client_info['nombre']}")
+        try:
+            clients.append((folder_name, build_client_data(client_info, jobs, results)))
+        except Exception as e:
+            print(f"\n❌ ERROR procesando {folder_name}: {e}")
+            errors += 1
+    
+    # 4. Guardar en el almacén (una transacción) y generar los JSON desde ahí
+    if warehouse.enabled:
+        warehouse.replace_clients([data for _, data in clients])
+        warehouse.record_text_sources(text_source_rows(all_jobs, scan_stats.sources))
+        clients = [(folder_name, warehouse.client_data(data["clienteId"])) for folder_name, data in clients]
+        print(f"\n🗄️  Almacén actualizado: {warehouse.path}")
+    
+    # 5. KPIs de todos los meses de todos los clientes en un solo cálculo, y guardar JSON
+    months = add_kpis([data for _, data in clients])
+    print(f"\n📈 KPIs precalculados: {months} meses")
+    for folder_name, data in clients:
+        try:
+            save_client_json(data, output_dir, args.columnar)
+            processed += 1
+        except Exception as e:
+            print(f"\n❌ ERROR guardando {folder_name}: {e}")
+            errors += 1
+    
+    print_summary(processed, errors)
+    if args.verify:
+        verify_output(output_dir)
+    
+    warehouse.close()
+    if args.metrics:
+        metrics.export(args.metrics, "extract_all_clients", args.slowest)
 
 if __name__ == "__main__":
     main()
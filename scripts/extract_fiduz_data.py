@@ -4,12 +4,25 @@ Script para extraer datos financieros de PDFs de FIDUZ y generar el JSON
 Requiere: pip install pdfplumber
 """
 
-import pdfplumber
 import json
 import os
 import re
 from pathlib import Path
 
+from pdf_text import iter_page_texts, open_pdf
+
+def read_text_prefix(pdf_path, max_chars):
+    """Lee páginas solo hasta juntar `max_chars` caracteres"""
+    parts = []
+    length = 0
+    with open_pdf(pdf_path) as pdf:
+        for text in iter_page_texts(pdf, pdf_path):
+            parts.append(text)
+            length += len(text)
+            if length >= max_chars:
+                break
+    return "".join(parts)[:max_chars]
+
 def extract_estado_resultados(pdf_path):
     """Extrae datos del Estado de Resultados"""
     data = {
@@ -23,18 +36,15 @@ def extract_estado_resultados(pdf_path):
     }
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-            
-            # Aquí necesitas ajustar los patrones según el formato exacto de tus PDFs
-            print(f"\n=== ESTADO DE RESULTADOS: {pdf_path.name} ===")
-            print(text[:500])  # Imprime primeras líneas para análisis
-            
-            # Buscar valores (ajustar según el formato real)
-            # Ejemplo de patrón: buscar números con formato $xxx,xxx.xx
-            
+        text = read_text_prefix(pdf_path, 500)
+        
+        # Aquí necesitas ajustar los patrones según el formato exacto de tus PDFs
+        print(f"\n=== ESTADO DE RESULTADOS: {pdf_path.name} ===")
+        print(text)  # Imprime primeras líneas para análisis
+        
+        # Buscar valores (ajustar según el formato real)
+        # Ejemplo de patrón: buscar números con formato $xxx,xxx.xx
+        
     except Exception as e:
         print(f"Error leyendo {pdf_path}: {e}")
     
@@ -61,13 +71,10 @@ def extract_balance_general(pdf_path):
     }
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-            
-            print(f"\n=== BALANCE GENERAL: {pdf_path.name} ===")
-            print(text[:500])  # Imprime primeras líneas para análisis
+        text = read_text_prefix(pdf_path, 500)
+        
+        print(f"\n=== BALANCE GENERAL: {pdf_path.name} ===")
+        print(text)  # Imprime primeras líneas para análisis
             
     except Exception as e:
         print(f"Error leyendo {pdf_path}: {e}")
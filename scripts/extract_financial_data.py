@@ -7,21 +7,41 @@ Extrae información de:
 - Anexos del Catálogo
 
 Uso:
-    python extract_financial_data.py
+    python extract_financial_data.py                       # todos los clientes
+    python extract_financial_data.py --client fiduz --year 2025 --month 01
+    python extract_financial_data.py --since 2025-06 --statement er
+    python extract_financial_data.py --low-memory --rss-warn 300  # una página a la vez
+    python extract_financial_data.py --rebuild   # ignorar caché y re-extraer todo
+    python extract_financial_data.py --no-cache  # no usar el caché
+    python extract_financial_data.py --metrics metrics/  # tiempos por etapa
+    python extract_financial_data.py --family contpaq  # forzar la familia de patrones (ver layout_family.py)
 """
 
-import os
-import json
+import argparse
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import pdfplumber
+from typing import Dict, Optional, Tuple
+
+from corpus_index import CorpusIndex, load_corpus_index
+from extraction_cache import ExtractionCache, add_cache_arguments, cache_from_args
+from instrumentation import add_metrics_arguments, metrics_from_args
+from json_store import ClientJsonBatch
+from layout_family import FAMILY_CONTPAQ, FAMILY_GENERIC, LayoutFamilies, add_family_arguments, families_from_args
+from pdf_text import (ScanStats, add_backend_arguments, add_memory_arguments, add_text_store_arguments,
+                      backends_from_args, memory_from_args, peak_rss_mb, record_text_store, scan_pdf,
+                      text_store_from_args)
+from scope import Scope, add_scope_arguments, scope_from_args
+from statement_scanner import FieldScanner
+from warehouse import Warehouse, add_warehouse_arguments, warehouse_from_args
 
 # Configuración de rutas
 BASE_DIR = Path(__file__).parent.parent
 PDF_BASE_DIR = BASE_DIR / "Ejercicio Analisis MRM Vilego Luenser y otros"
 JSON_BASE_DIR = BASE_DIR / "public" / "data" / "clients"
 
+# Subir cuando cambien los patrones para invalidar el caché de extracción
+EXTRACTOR_VERSION = "2"
+
 # Mapeo de clientes a sus carpetas
 CLIENTS = {
     "fiduz": "FIDUZ",
@@ -35,22 +55,78 @@ CLIENTS = {
     "luengas": "Jose Manuel Luengas",
 }
 
-# Nombres de meses
-MONTH_NAMES = {
-    "01": ["Ene", "Enero", "ENERO", "January"],
-    "02": ["Feb", "Febrero", "FEBRERO", "February"],
-    "03": ["Mar", "Marzo", "MARZO", "March"],
-    "04": ["Abr", "Abril", "ABRIL", "April"],
-    "05": ["May", "Mayo", "MAYO", "May"],
-    "06": ["Jun", "Junio", "JUNIO", "June"],
-    "07": ["Jul", "Julio", "JULIO", "July"],
-    "08": ["Ago", "Agosto", "AGOSTO", "August"],
-    "09": ["Sep", "Septiembre", "SEPTIEMBRE", "September"],
-    "10": ["Oct", "Octubre", "OCTUBRE", "October"],
-    "11": ["Nov", "Noviembre", "NOVIEMBRE", "November"],
-    "12": ["Dic", "Diciembre", "DICIEMBRE", "December"],
+# Patrones para buscar valores: campo -> variantes en orden de prioridad
+ER_PATTERNS = {
+    "ingresos": [
+        r"Ingresos?\s+(?:por\s+)?(?:ventas?)?\s*[\$]?\s*([\d,\.]+)",
+        r"Ventas?\s*[\$]?\s*([\d,\.]+)",
+        r"INGRESOS?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "compras": [
+        r"Costo\s+de\s+ventas?\s*[\$]?\s*([\d,\.]+)",
+        r"Compras?\s*[\$]?\s*([\d,\.]+)",
+        r"COSTO\s+DE\s+VENTAS?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "gastos": [
+        r"Gastos?\s+de\s+operaci[oó]n\s*[\$]?\s*([\d,\.]+)",
+        r"Gastos?\s+operativos?\s*[\$]?\s*([\d,\.]+)",
+        r"GASTOS?\s+DE\s+OPERACI[OÓ]N\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "prodFin": [
+        r"Productos?\s+financieros?\s*[\$]?\s*([\d,\.]+)",
+        r"PRODUCTOS?\s+FINANCIEROS?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "gastFin": [
+        r"Gastos?\s+financieros?\s*[\$]?\s*([\d,\.]+)",
+        r"GASTOS?\s+FINANCIEROS?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "utilidad": [
+        r"Utilidad\s+(?:neta|del\s+ejercicio)\s*[\$]?\s*([\d,\.]+)",
+        r"UTILIDAD\s+(?:NETA|DEL\s+EJERCICIO)\s*[\$]?\s*([\d,\.]+)",
+    ],
 }
 
+BG_PATTERNS = {
+    "ac": [
+        r"Activo\s+circulante\s*[\$]?\s*([\d,\.]+)",
+        r"ACTIVO\s+CIRCULANTE\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "pc": [
+        r"Pasivo\s+circulante\s*[\$]?\s*([\d,\.]+)",
+        r"PASIVO\s+CIRCULANTE\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "bancos": [
+        r"Bancos?\s*[\$]?\s*([\d,\.]+)",
+        r"Efectivo\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "inversiones": [
+        r"Inversiones?\s+temporales?\s*[\$]?\s*([\d,\.]+)",
+        r"INVERSIONES?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "clientes": [
+        r"Clientes?\s*[\$]?\s*([\d,\.]+)",
+        r"Cuentas\s+por\s+cobrar\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "deudores": [
+        r"Deudores?\s+diversos?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "inventario": [
+        r"Inventarios?\s*[\$]?\s*([\d,\.]+)",
+    ],
+    "capital": [
+        r"Capital\s+contable\s*[\$]?\s*([\d,\.]+)",
+        r"CAPITAL\s+CONTABLE\s*[\$]?\s*([\d,\.]+)",
+    ],
+}
+
+# Todas las variantes se buscan en una sola pasada sobre el texto
+ER_SCANNER = FieldScanner(ER_PATTERNS, re.IGNORECASE)
+BG_SCANNER = FieldScanner(BG_PATTERNS, re.IGNORECASE)
+
+# Si el backend rápido no encuentra estos campos se vuelve a leer con pdfplumber
+ER_REQUIRED = ("ingresos",)
+BG_REQUIRED = ("bancos",)
+
 
 def clean_number(text: str) -> float:
     """Limpia y convierte texto a número float."""
@@ -70,28 +146,32 @@ def clean_number(text: str) -> float:
         return 0.0
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extrae todo el texto de un PDF."""
+def scan_pdf_fields(pdf_path: Path, scanner: FieldScanner, stats: Optional[ScanStats] = None,
+                    required: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, "re.Match"]]:
+    """
+    Busca los campos página por página (ver pdf_text.scan_pdf).
+    Regresa None si el PDF no se pudo leer o no tiene texto.
+    """
+    file_stats = ScanStats()
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-            return text
+        matches = scan_pdf(pdf_path, scanner, stats=file_stats, required=required)
     except Exception as e:
         print(f"❌ Error al leer {pdf_path.name}: {e}")
-        return ""
+        if stats is not None:
+            stats.errors += 1
+        return None
+    if stats is not None:
+        stats.merge(file_stats)
+    if not file_stats.chars_read:
+        return None
+    return matches
 
 
-def extract_estado_resultados(pdf_path: Path) -> Tuple[Dict, Dict]:
+def extract_estado_resultados(pdf_path: Path, stats: Optional[ScanStats] = None) -> Tuple[Dict, Dict]:
     """
     Extrae datos del Estado de Resultados (Periodo y YTD).
     Retorna: (periodo_data, ytd_data)
     """
-    text = extract_text_from_pdf(pdf_path)
-    if not text:
-        return {}, {}
-    
     periodo = {
         "ingresos": 0,
         "compras": 0,
@@ -110,44 +190,12 @@ def extract_estado_resultados(pdf_path: Path) -> Tuple[Dict, Dict]:
         "utilidadYTD": 0
     }
     
-    # Patrones para buscar valores
-    patterns = {
-        "ingresos": [
-            r"Ingresos?\s+(?:por\s+)?(?:ventas?)?\s*[\$]?\s*([\d,\.]+)",
-            r"Ventas?\s*[\$]?\s*([\d,\.]+)",
-            r"INGRESOS?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "compras": [
-            r"Costo\s+de\s+ventas?\s*[\$]?\s*([\d,\.]+)",
-            r"Compras?\s*[\$]?\s*([\d,\.]+)",
-            r"COSTO\s+DE\s+VENTAS?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "gastos": [
-            r"Gastos?\s+de\s+operaci[oó]n\s*[\$]?\s*([\d,\.]+)",
-            r"Gastos?\s+operativos?\s*[\$]?\s*([\d,\.]+)",
-            r"GASTOS?\s+DE\s+OPERACI[OÓ]N\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "prodFin": [
-            r"Productos?\s+financieros?\s*[\$]?\s*([\d,\.]+)",
-            r"PRODUCTOS?\s+FINANCIEROS?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "gastFin": [
-            r"Gastos?\s+financieros?\s*[\$]?\s*([\d,\.]+)",
-            r"GASTOS?\s+FINANCIEROS?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "utilidad": [
-            r"Utilidad\s+(?:neta|del\s+ejercicio)\s*[\$]?\s*([\d,\.]+)",
-            r"UTILIDAD\s+(?:NETA|DEL\s+EJERCICIO)\s*[\$]?\s*([\d,\.]+)",
-        ],
-    }
-    
-    # Buscar valores en el texto
-    for key, pattern_list in patterns.items():
-        for pattern in pattern_list:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                periodo[key] = clean_number(match.group(1))
-                break
+    # Buscar valores página por página
+    matches = scan_pdf_fields(pdf_path, ER_SCANNER, stats, ER_REQUIRED)
+    if matches is None:
+        return {}, {}
+    for key, match in matches.items():
+        periodo[key] = clean_number(match.group(1))
     
     # Para YTD, buscar columnas acumuladas
     # (esto puede variar según el formato del PDF)
@@ -158,12 +206,8 @@ def extract_estado_resultados(pdf_path: Path) -> Tuple[Dict, Dict]:
     return periodo, ytd
 
 
-def extract_balance_general(pdf_path: Path) -> Dict:
+def extract_balance_general(pdf_path: Path, stats: Optional[ScanStats] = None) -> Dict:
     """Extrae datos del Balance General."""
-    text = extract_text_from_pdf(pdf_path)
-    if not text:
-        return {}
-    
     balance = {
         "ac": 0,
         "pc": 0,
@@ -181,162 +225,138 @@ def extract_balance_general(pdf_path: Path) -> Dict:
         "plc": 0
     }
     
-    patterns = {
-        "ac": [
-            r"Activo\s+circulante\s*[\$]?\s*([\d,\.]+)",
-            r"ACTIVO\s+CIRCULANTE\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "pc": [
-            r"Pasivo\s+circulante\s*[\$]?\s*([\d,\.]+)",
-            r"PASIVO\s+CIRCULANTE\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "bancos": [
-            r"Bancos?\s*[\$]?\s*([\d,\.]+)",
-            r"Efectivo\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "inversiones": [
-            r"Inversiones?\s+temporales?\s*[\$]?\s*([\d,\.]+)",
-            r"INVERSIONES?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "clientes": [
-            r"Clientes?\s*[\$]?\s*([\d,\.]+)",
-            r"Cuentas\s+por\s+cobrar\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "deudores": [
-            r"Deudores?\s+diversos?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "inventario": [
-            r"Inventarios?\s*[\$]?\s*([\d,\.]+)",
-        ],
-        "capital": [
-            r"Capital\s+contable\s*[\$]?\s*([\d,\.]+)",
-            r"CAPITAL\s+CONTABLE\s*[\$]?\s*([\d,\.]+)",
-        ],
-    }
-    
-    for key, pattern_list in patterns.items():
-        for pattern in pattern_list:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                balance[key] = clean_number(match.group(1))
-                break
+    matches = scan_pdf_fields(pdf_path, BG_SCANNER, stats, BG_REQUIRED)
+    if matches is None:
+        return {}
+    for key, match in matches.items():
+        balance[key] = clean_number(match.group(1))
     
     return balance
 
 
+def extract_estado_resultados_contpaq(pdf_path: Path, stats: Optional[ScanStats] = None) -> Tuple[Dict, Dict]:
+    """
+    Estado de Resultados de la familia CONTPAQ i: renglones "Total ..." de
+    extract_all_clients, con periodo y acumulado en sus columnas.
+    """
+    # Importado aquí: extract_all_clients importa este módulo para su familia genérica
+    import extract_all_clients
+    periodo, ytd = extract_all_clients.extract_estado_resultados(pdf_path, "", stats)
+    del periodo["mes"], ytd["mes"]
+    return periodo, ytd
+
+
+def extract_balance_general_contpaq(pdf_path: Path, stats: Optional[ScanStats] = None) -> Dict:
+    """Balance General de la familia CONTPAQ i (patrones de extract_all_clients)."""
+    import extract_all_clients
+    balance = extract_all_clients.extract_balance_general(pdf_path, "", stats)
+    del balance["mes"]
+    return balance
+
+
+# Familia de layout -> extractores (estado de resultados, balance general)
+FAMILY_EXTRACTORS = {
+    FAMILY_GENERIC: (extract_estado_resultados, extract_balance_general),
+    FAMILY_CONTPAQ: (extract_estado_resultados_contpaq, extract_balance_general_contpaq),
+}
+
+
+def _cache_namespace(name: str, family: str) -> str:
+    if family == FAMILY_GENERIC:
+        return f"extract_financial_data.{name}"
+    return f"extract_financial_data.{family}.{name}"
+
+
+_corpus_index: Optional[CorpusIndex] = None
+# Almacén SQLite (warehouse.py); se abre en main()
+_warehouse: Optional[Warehouse] = None
+# Familia de layout de cada cliente (layout_family.py); sin ella se usan los patrones genéricos
+_layout_families: Optional[LayoutFamilies] = None
+
+
+def get_corpus_index() -> CorpusIndex:
+    """Índice del árbol de PDFs; se construye una sola vez por ejecución."""
+    global _corpus_index
+    if _corpus_index is None:
+        _corpus_index = load_corpus_index(PDF_BASE_DIR)
+    return _corpus_index
+
+
 def find_pdf_files(client_folder: Path, year: str, month: str) -> Dict[str, Optional[Path]]:
     """
-    Busca los 3 archivos PDF de un mes específico.
+    Busca los 3 archivos PDF de un mes específico en el índice del árbol.
     Retorna dict con keys: 'estado_resultados', 'balance_general', 'anexos'
     """
-    year_path = client_folder / year
-    if not year_path.exists():
-        return {"estado_resultados": None, "balance_general": None, "anexos": None}
-    
-    pdfs = {"estado_resultados": None, "balance_general": None, "anexos": None}
-    
-    # Buscar en carpetas de mes o archivos directos
-    month_variations = MONTH_NAMES.get(month, [])
-    
-    # Opción 1: Buscar en carpeta de mes
-    for item in year_path.iterdir():
-        if item.is_dir() and any(var in item.name for var in month_variations + [month]):
-            # Dentro de la carpeta del mes
-            for pdf in item.glob("*.pdf"):
-                name_lower = pdf.name.lower()
-                if "estado" in name_lower and "resultado" in name_lower:
-                    pdfs["estado_resultados"] = pdf
-                elif "balance" in name_lower or "posicion" in name_lower:
-                    pdfs["balance_general"] = pdf
-                elif "anexo" in name_lower or "catalogo" in name_lower:
-                    pdfs["anexos"] = pdf
-            break
-    
-    # Opción 2: Buscar archivos directos en carpeta del año
-    if not pdfs["estado_resultados"]:
-        for pdf in year_path.glob("*.pdf"):
-            name = pdf.name
-            # Verificar si el nombre contiene el mes
-            if any(var in name for var in month_variations + [month]):
-                name_lower = name.lower()
-                if "estado" in name_lower and "resultado" in name_lower:
-                    pdfs["estado_resultados"] = pdf
-                elif "balance" in name_lower or "posicion" in name_lower:
-                    pdfs["balance_general"] = pdf
-                elif "anexo" in name_lower or "catalogo" in name_lower:
-                    pdfs["anexos"] = pdf
-    
-    return pdfs
+    index = get_corpus_index()
+    if client_folder.parent.resolve() != index.pdf_root.resolve():
+        index = load_corpus_index(client_folder.parent, index_path=None)
+    return index.statements(client_folder.name, year, month)
 
 
-def update_json_file(client_id: str, year: str, month: str, periodo_data: Dict, ytd_data: Dict, balance_data: Dict):
-    """Actualiza el archivo JSON del cliente con los datos extraídos."""
+def open_client_batch(client_id: str) -> Optional[ClientJsonBatch]:
+    """Carga el JSON del cliente para acumular actualizaciones."""
     json_path = JSON_BASE_DIR / f"{client_id}.json"
     
     if not json_path.exists():
         print(f"❌ Archivo JSON no encontrado: {json_path}")
-        return
+        return None
     
-    # Leer JSON actual
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    return ClientJsonBatch(json_path, _warehouse)
+
+
+def update_json_file(client_id: str, year: str, month: str, periodo_data: Optional[Dict], ytd_data: Optional[Dict],
+                     balance_data: Optional[Dict], batch: Optional[ClientJsonBatch] = None):
+    """
+    Actualiza el JSON del cliente con los datos extraídos (los estados en None
+    no se tocan).
+    Con `batch` solo se acumula el cambio en memoria; el archivo se escribe
+    una vez con batch.save(). Sin `batch` se escribe inmediatamente.
+    """
+    write_now = batch is None
+    if write_now:
+        batch = open_client_batch(client_id)
+        if batch is None:
+            return
     
-    # Verificar estructura
-    if year not in data.get("years", {}):
+    if not batch.update_month(year, month, periodo_data, ytd_data, balance_data):
         print(f"⚠️  Año {year} no encontrado en {client_id}.json")
         return
     
-    mes_str = f"{year}-{month}"
-    
-    # Actualizar Estado de Resultados Periodo
-    periodo_list = data["years"][year]["estadoResultadosPeriodo"]
-    periodo_item = {"mes": mes_str, **periodo_data}
-    
-    # Buscar y actualizar o agregar
-    found = False
-    for i, item in enumerate(periodo_list):
-        if item["mes"] == mes_str:
-            periodo_list[i] = periodo_item
-            found = True
-            break
-    if not found:
-        periodo_list.append(periodo_item)
-    
-    # Actualizar Estado de Resultados YTD
-    ytd_list = data["years"][year]["estadoResultadosYTD"]
-    ytd_item = {"mes": mes_str, **ytd_data}
-    
-    found = False
-    for i, item in enumerate(ytd_list):
-        if item["mes"] == mes_str:
-            ytd_list[i] = ytd_item
-            found = True
-            break
-    if not found:
-        ytd_list.append(ytd_item)
-    
-    # Actualizar Balance General
-    balance_list = data["years"][year]["balanceGeneral"]
-    balance_item = {"mes": mes_str, **balance_data}
-    
-    found = False
-    for i, item in enumerate(balance_list):
-        if item["mes"] == mes_str:
-            balance_list[i] = balance_item
-            found = True
-            break
-    if not found:
-        balance_list.append(balance_item)
-    
-    # Guardar JSON actualizado
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if write_now:
+        batch.save()
     
     print(f"✅ Actualizado: {client_id} - {year}/{month}")
 
 
-def process_client_month(client_id: str, client_folder: str, year: str, month: str):
-    """Procesa un mes específico de un cliente."""
+def extract_cached(cache: Optional[ExtractionCache], namespace: str, pdf_path: Path, extract,
+                   stats: Optional[ScanStats] = None):
+    """
+    Resultado guardado del PDF o recién extraído. Si el PDF no se pudo leer se
+    regresa el resultado vacío pero no se guarda, para volver a intentarlo en la
+    siguiente corrida.
+    """
+    value = cache.get(namespace, EXTRACTOR_VERSION, pdf_path) if cache else None
+    if value is not None:
+        return value
+    file_stats = ScanStats()
+    value = extract(pdf_path, file_stats)
+    if stats is not None:
+        stats.merge(file_stats)
+    if cache and not file_stats.errors:
+        cache.put(namespace, EXTRACTOR_VERSION, pdf_path, value)
+    return value
+
+
+def process_client_month(client_id: str, client_folder: str, year: str, month: str,
+                         cache: Optional[ExtractionCache] = None,
+                         batch: Optional[ClientJsonBatch] = None, scope: Scope = Scope(),
+                         stats: Optional[ScanStats] = None, family: Optional[str] = None):
+    """
+    Procesa un mes específico de un cliente (solo los estados dentro de `scope`).
+    Con `stats` se acumulan las páginas leídas y el backend de texto de cada PDF.
+    Solo se corren los patrones de la familia de layout del cliente (`family`; si
+    no se da, se reconoce con su estado de resultados).
+    """
     client_path = PDF_BASE_DIR / client_folder
     
     if not client_path.exists():
@@ -355,62 +375,118 @@ def process_client_month(client_id: str, client_folder: str, year: str, month: s
     print(f"   Balance General: {pdfs['balance_general'].name if pdfs['balance_general'] else 'No encontrado'}")
     print(f"   Anexos: {pdfs['anexos'].name if pdfs['anexos'] else 'No encontrado'}")
     
-    # Extraer datos
-    periodo_data = {}
-    ytd_data = {}
-    balance_data = {}
-    
-    if pdfs["estado_resultados"]:
-        periodo_data, ytd_data = extract_estado_resultados(pdfs["estado_resultados"])
-    
-    if pdfs["balance_general"]:
-        balance_data = extract_balance_general(pdfs["balance_general"])
+    if family is None:
+        family = FAMILY_GENERIC
+        if _layout_families is not None:
+            family = _layout_families.family(client_folder, pdfs["estado_resultados"])
+    extract_er, extract_bg = FAMILY_EXTRACTORS[family]
+    
+    # Extraer datos (None = fuera del alcance, no se toca en el JSON)
+    periodo_data = {} if scope.statement("er") else None
+    ytd_data = {} if scope.statement("er") else None
+    balance_data = {} if scope.statement("bg") else None
+    
+    if pdfs["estado_resultados"] and scope.statement("er"):
+        periodo_data, ytd_data = extract_cached(cache, _cache_namespace("estado_resultados", family),
+                                                pdfs["estado_resultados"], extract_er, stats)
+    
+    if pdfs["balance_general"] and scope.statement("bg"):
+        balance_data = extract_cached(cache, _cache_namespace("balance_general", family),
+                                      pdfs["balance_general"], extract_bg, stats)
+    
+    # Backend de texto de los PDFs leídos (los del caché conservan el registro anterior)
+    if stats is not None and _warehouse is not None:
+        _warehouse.record_text_sources(
+            (client_id, f"{year}-{month}", kind, stats.sources[str(path)], path.name)
+            for kind, path in (("er", pdfs["estado_resultados"]), ("bg", pdfs["balance_general"]))
+            if path and str(path) in stats.sources
+        )
     
     # Actualizar JSON
     if periodo_data or balance_data:
-        update_json_file(client_id, year, month, periodo_data, ytd_data, balance_data)
+        update_json_file(client_id, year, month, periodo_data, ytd_data, balance_data, batch)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extrae datos financieros de PDFs y actualiza los JSON")
+    add_scope_arguments(parser)
+    add_memory_arguments(parser)
+    add_backend_arguments(parser)
+    add_text_store_arguments(parser)
+    add_family_arguments(parser)
+    add_cache_arguments(parser)
+    add_warehouse_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args()
 
 
 def main():
     """Función principal."""
+    global _warehouse, _layout_families
+    args = parse_args()
+    cache = cache_from_args(args)
+    _warehouse = warehouse_from_args(args)
+    metrics = metrics_from_args(args)
+    scope = scope_from_args(args)
+    memory = memory_from_args(args)
+    backends_from_args(args)
+    text_store_from_args(args)
+    _layout_families = families_from_args(args)
+    stats = ScanStats()
+    
     print("🚀 Iniciando extracción de datos financieros de PDFs...")
     print(f"📁 Directorio PDFs: {PDF_BASE_DIR}")
     print(f"📁 Directorio JSONs: {JSON_BASE_DIR}")
     print("\n" + "="*60)
     
-    # Ejemplo: FIDUZ 2025/01
-    print("\n🔍 EJEMPLO: FIDUZ 2025/01")
-    process_client_month("fiduz", "FIDUZ", "2025", "01")
-    
-    print("\n" + "="*60)
-    print("\n¿Deseas procesar todos los clientes? (s/n): ", end="")
-    respuesta = input().strip().lower()
+    print(f"🎯 Alcance: {scope.describe()}")
     
-    if respuesta == "s":
-        # Procesar todos los clientes
-        for client_id, client_folder in CLIENTS.items():
-            client_path = PDF_BASE_DIR / client_folder
-            
-            if not client_path.exists():
-                continue
-            
-            # Buscar años
-            for year_path in sorted(client_path.glob("202*")):
-                if not year_path.is_dir():
-                    continue
-                
-                year = year_path.name
-                
-                # Procesar cada mes (01-12)
-                for month in ["01", "02", "03", "04", "05", "06", "07", "08", "09", "10", "11", "12"]:
-                    try:
-                        process_client_month(client_id, client_folder, year, month)
-                    except Exception as e:
-                        print(f"❌ Error en {client_id} {year}/{month}: {e}")
+    index = get_corpus_index()
+    families = _layout_families.resolve(index, [folder for client_id, folder in CLIENTS.items()
+                                                if scope.client(folder, client_id)])
+    _layout_families.save()
+    print(f"📑 {_layout_families.summary(families)}")
+    for client_id, client_folder in CLIENTS.items():
+        client_path = PDF_BASE_DIR / client_folder
+        
+        if not scope.client(client_folder, client_id) or not client_path.exists():
+            continue
+        
+        # Meses con PDFs según el índice del árbol, dentro del alcance
+        months = [(year, month) for year in index.years(client_folder)
+                  for month in index.months(client_folder, year) if scope.period(year, month)]
+        if not months:
+            continue
+        
+        # Todas las actualizaciones del cliente se escriben al final en una sola escritura
+        batch = open_client_batch(client_id)
+        if batch is None:
+            continue
+        
+        for year, month in months:
+            try:
+                process_client_month(client_id, client_folder, year, month, cache, batch, scope, stats,
+                                     families.get(client_folder))
+            except Exception as e:
+                print(f"❌ Error en {client_id} {year}/{month}: {e}")
         
-        print("\n✅ Proceso completado!")
-    else:
-        print("\n✅ Proceso terminado. Usa este script como ejemplo para procesar más clientes.")
+        written = batch.save()
+        if written:
+            print(f"💾 Guardado: {client_id}.json ({written} meses)")
+    
+    cache.prune()
+    cache.save()
+    if cache.enabled:
+        print(f"💾 {cache.summary()}")
+    record_text_store(stats)
+    print(f"📄 {stats.summary()}")
+    if memory["low_memory"]:
+        print(f"📄 Pico de memoria: {peak_rss_mb():.0f} MB")
+    print("\n✅ Proceso completado!")
+    
+    _warehouse.close()
+    if args.metrics:
+        metrics.export(args.metrics, "extract_financial_data", args.slowest)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Caché persistente de resultados de extracción de PDFs.
+
+Cada resultado se guarda con la llave (extractor, versión, sha256 del PDF), así
+que un PDF que no cambió nunca se vuelve a abrir con pdfplumber. Antes de
+calcular el hash se compara tamaño y mtime contra lo guardado para esa ruta; si
+coinciden se reutiliza el hash anterior sin leer el archivo, y quien ya conoce
+el sha256 (p. ej. el índice del corpus) lo pasa con `sha=` para no leerlo nunca.
+
+Cuando cambien los patrones de un extractor hay que subir su EXTRACTOR_VERSION
+para invalidar sus entradas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from json_store import write_json_atomic
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CACHE_PATH = BASE_DIR / ".cache" / "extraction_cache.json"
+
+CACHE_FORMAT = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Calcula el sha256 del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Caché en disco de resultados por contenido de PDF.
+
+    - enabled=False: no lee ni escribe nada (--no-cache)
+    - rebuild=True: no usa los resultados guardados (get siempre falla) pero los
+      conserva y reemplaza solo los que se vuelven a extraer (--rebuild), así que
+      un --rebuild con alcance no borra los demás clientes
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, enabled: bool = True, rebuild: bool = False):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.rebuild = rebuild
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._files: Dict[str, Dict] = {}
+        self._results: Dict[str, Any] = {}
+        # get/put pueden llamarse desde los hilos de E/S del pipeline
+        self._lock = threading.Lock()
+
+        if enabled:
+            self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Caché ilegible, se reconstruye: {e}")
+            return
+        if data.get("format") != CACHE_FORMAT:
+            return
+        self._files = data.get("files", {})
+        self._results = data.get("results", {})
+
+    def content_hash(self, pdf_path: Path, sha: Optional[str] = None) -> str:
+        """
+        Regresa el sha256 del PDF, usando tamaño/mtime para evitar releerlo. Con
+        `sha` (ya calculado por quien llama) no se lee el archivo.
+        """
+        key = str(Path(pdf_path).resolve())
+        entry = self._files.get(key)
+        if sha is not None and entry and entry["sha256"] == sha:
+            return sha
+        st = os.stat(key)
+        if sha is None:
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                return entry["sha256"]
+            sha = file_sha256(Path(key))
+        with self._lock:
+            self._files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+            self._dirty = True
+        return sha
+
+    @property
+    def empty(self) -> bool:
+        """True si no hay ningún resultado guardado (no se ha corrido una extracción completa)."""
+        return not self._results
+
+    def is_current(self, pdf_path: Path) -> bool:
+        """True si el PDF ya se procesó y no cambió (mismo tamaño y mtime)."""
+        if not self.enabled:
+            return False
+        entry = self._files.get(str(Path(pdf_path).resolve()))
+        if not entry:
+            return False
+        st = os.stat(pdf_path)
+        return entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+    def _key(self, namespace: str, version: str, pdf_path: Path, sha: Optional[str] = None) -> str:
+        return f"{namespace}:{version}:{self.content_hash(pdf_path, sha)}"
+
+    def get(self, namespace: str, version: str, pdf_path: Path, sha: Optional[str] = None) -> Optional[Any]:
+        """Regresa el resultado guardado o None si no existe."""
+        if not self.enabled:
+            return None
+        key = self._key(namespace, version, pdf_path, sha)
+        value = None if self.rebuild else self._results.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, namespace: str, version: str, pdf_path: Path, value: Any, sha: Optional[str] = None):
+        """Guarda el resultado de extraer un PDF."""
+        if not self.enabled:
+            return
+        key = self._key(namespace, version, pdf_path, sha)
+        with self._lock:
+            self._results[key] = value
+            self._dirty = True
+
+    def cached(self, namespace: str, version: str, pdf_path: Path, extract: Callable[[Path], Any]) -> Any:
+        """
+        Regresa el resultado guardado o lo extrae y lo guarda. Si `extract` lanza
+        una excepción no se guarda nada (un error no se queda en el caché).
+        """
+        value = self.get(namespace, version, pdf_path)
+        if value is None:
+            value = extract(pdf_path)
+            self.put(namespace, version, pdf_path, value)
+        return value
+
+    def prune(self) -> int:
+        """
+        Elimina las rutas que ya no existen y los resultados cuyo contenido ya
+        no corresponde a ningún archivo. Regresa cuántos resultados se borraron.
+        """
+        if not self.enabled:
+            return 0
+        for key in [k for k in self._files if not os.path.exists(k)]:
+            del self._files[key]
+            self._dirty = True
+
+        live = {entry["sha256"] for entry in self._files.values()}
+        stale = [k for k in self._results if k.rsplit(":", 1)[-1] not in live]
+        for key in stale:
+            del self._results[key]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def save(self):
+        """Escribe el caché a disco de forma atómica si hubo cambios."""
+        if not self.enabled or not self._dirty:
+            return
+        write_json_atomic(
+            self.path,
+            {"format": CACHE_FORMAT, "files": self._files, "results": self._results},
+            indent=None,
+        )
+        self._dirty = False
+
+    def summary(self) -> str:
+        return f"caché: {self.hits} aciertos, {self.misses} extracciones nuevas"
+
+
+def add_cache_arguments(parser):
+    """Agrega --no-cache y --rebuild a un argparse.ArgumentParser."""
+    parser.add_argument("--no-cache", action="store_true", help="No leer ni escribir el caché de extracción")
+    parser.add_argument("--rebuild", action="store_true", help="Ignorar el caché y volver a extraer todos los PDFs")
+
+
+def cache_from_args(args) -> ExtractionCache:
+    return ExtractionCache(enabled=not args.no_cache, rebuild=args.rebuild)
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Servicio local de extracción: pool de workers calientes detrás de una API HTTP.
+
+Cada corrida de los extractores es un proceso nuevo que importa pdfplumber y
+pdfminer, recorre el árbol y termina; el dashboard solo puede leer los JSON
+estáticos. Aquí el pool de procesos se levanta una vez al arrancar (cada worker
+ya con las plantillas de layout, el almacén de texto y la familia de cada
+cliente cargados, ver extract_all_clients.init_worker) y el índice del árbol se
+queda en memoria, así que una petición solo paga la lectura de sus PDFs. Las
+peticiones se atienden en hilos y sus PDFs se reparten en el mismo pool: las
+subidas de varios contadores a la vez se procesan en paralelo.
+
+    python3 extraction_service.py                     # http://127.0.0.1:8765, un worker por núcleo
+    python3 extraction_service.py -j 4 --port 9000
+    python3 extraction_service.py --allow-origin https://dashboard.ejemplo.mx
+
+Endpoints (también bajo /api, para usarlo como NEXT_PUBLIC_EXTRACTION_API_URL):
+
+    GET  /health
+    GET  /financial-data?clienteId=mrm&year=2024       JSON publicado del cliente
+    POST /financial-data/upload     multipart: clientId, files (PDFs), year y month opcionales
+    POST /financial-data/extract    {"clientId": "mrm", "year": "2025", "month": "03",
+                                     "statement": "er", "rebuild": false}
+
+Un PDF subido se coloca en el árbol en el lugar de su (cliente, año, mes, tipo):
+el tipo sale del nombre del archivo o del encabezado ("Estado de Resultados",
+"Balance General") y el periodo del encabezado ("... al 31/Mar/2024") si no se
+manda year/month. Si el mes ya tenía ese estado, el archivo se reemplaza; si no,
+se guarda con un nombre que el índice reconoce ("Balance General 03 2024.pdf").
+Se rechaza el PDF cuya razón social en el encabezado es de otro cliente, o que
+después de colocarlo no queda en el índice. Luego se extraen los meses tocados y
+se regenera public/data/clients/<id>.json.
+
+El servicio no tiene autenticación: escucha en 127.0.0.1 y solo atiende a
+navegadores del origen del dashboard (--allow-origin); las peticiones con otro
+Origin se rechazan con 403 aunque no pasen por un preflight de CORS. year y month
+se validan (4 dígitos, 1-12) antes de armar cualquier ruta, y un PDF subido nunca
+se coloca fuera del árbol de PDFs.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import signal
+import threading
+import time
+import unicodedata
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from corpus_index import PDF_BASE_DIR, classify_statement, load_corpus_index, month_from_word
+from extract_all_clients import (CLIENT_MAPPING, init_worker, month_jobs, resolve_families, run_jobs,
+                                 text_source_rows, write_client_month)
+from extraction_cache import add_cache_arguments, cache_from_args
+from layout_family import add_family_arguments, families_from_args, first_page_header
+from layout_templates import LayoutTemplates
+from pdf_text import (ScanStats, add_backend_arguments, add_memory_arguments, add_text_store_arguments,
+                      backends_from_args, memory_from_args, text_store_from_args)
+from warehouse import DEFAULT_OUTPUT_DIR, add_warehouse_arguments, warehouse_from_args
+
+BASE_DIR = Path(__file__).parent.parent
+UPLOAD_DIR = BASE_DIR / ".cache" / "uploads"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Nombre con el que se guarda un PDF subido que no reemplaza a otro (+ " MM AAAA.pdf")
+CANONICAL_NAMES = {
+    "estado_resultados": "Estado de Resultados",
+    "balance_general": "Balance General",
+    "anexos": "Anexos del Catalogo",
+}
+# Origen del dashboard (next dev / docker-compose); el único que puede llamar al servicio
+DEFAULT_ALLOWED_ORIGIN = "http://localhost:3000"
+MAX_UPLOAD_MB = 50
+API_PREFIX = "/api"
+
+# "Estado de Resultados del 01/Ene/2024 al 31/Ene/2024", "Balance General al 31/Mar/2024"
+_PERIOD_RE = re.compile(r"\bal\s+\d{1,2}/([A-Za-z]+)/(\d{4})")
+# "CONTPAQ i MRM INGENIERIA INTEGRAL S DE RL MI 2024 Hoja: 1" -> razón social
+_COMPANY_RE = re.compile(r"CONTPAQ\s*i\s+(.+?)(?:\s+\d{4})?\s+Hoja:", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\d{4}", re.ASCII)
+_MONTH_RE = re.compile(r"\d{1,2}", re.ASCII)
+
+
+class ServiceError(Exception):
+    """Error que se regresa al cliente HTTP con su código de estado."""
+
+    def __init__(self, status: int, message: str, code: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class Locked:
+    """Envuelve un objeto para que cada llamada a sus métodos tome el candado."""
+
+    def __init__(self, target, lock):
+        self._target = target
+        self._lock = lock
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return call
+
+
+def warm_worker(_=None) -> int:
+    """Tarea vacía: levanta cada proceso del pool al arrancar, no en la primera petición."""
+    return os.getpid()
+
+
+def identify_statement(pdf_path: Path, filename: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """
+    (tipo, año, mes, razón social) de un PDF subido. Corre en el pool: si el estado
+    es de una sola hoja, leer el encabezado ya lo deja en el almacén de texto para
+    la extracción.
+    """
+    kind = classify_statement(filename)
+    year = month = company = None
+    for row in first_page_header(pdf_path):
+        kind = kind or classify_statement(row)
+        match = _PERIOD_RE.search(row)
+        if match and month is None:
+            month, year = month_from_word(match.group(1)), match.group(2)
+        match = _COMPANY_RE.search(row)
+        if match and company is None:
+            company = match.group(1)
+    return kind, year, month, company
+
+
+def normalize_company(name: str) -> str:
+    """Razón social comparable: sin acentos ni puntuación, en mayúsculas ("S. de R.L." == "S DE RL")."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s]", "", text.upper())
+    return " ".join(text.split())
+
+
+def company_matches(folder: str, company: str) -> bool:
+    """True si la razón social del encabezado es la del cliente (encabezado, razón o nombre)."""
+    info = CLIENT_MAPPING[folder]
+    names = {normalize_company(info[key]) for key in ("encabezado", "razon", "nombre") if info.get(key)}
+    return normalize_company(company) in names
+
+
+def parse_period(year: Any, month: Any) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (año, mes "MM") de una petición, o None en los que no se mandaron. Se validan
+    antes de usarlos en una ruta: año de 4 dígitos y mes de 1 a 12.
+    """
+    year = str(year).strip() if year not in (None, "") else None
+    if year is not None and not _YEAR_RE.fullmatch(year):
+        raise ServiceError(400, f"year debe ser un año de 4 dígitos: {year}", "BAD_REQUEST")
+    if month in (None, ""):
+        return year, None
+    text = str(month).strip()
+    if not _MONTH_RE.fullmatch(text) or not 1 <= int(text) <= 12:
+        raise ServiceError(400, f"month debe ser un número de 1 a 12: {month}", "BAD_REQUEST")
+    return year, f"{int(text):02d}"
+
+
+def client_folder(client_id: str) -> str:
+    """Carpeta del cliente por id ("mrm"), carpeta ("MRM") o nombre."""
+    wanted = str(client_id).strip().lower()
+    for folder, info in CLIENT_MAPPING.items():
+        if wanted in (folder.lower(), info["id"], info["nombre"].lower()):
+            return folder
+    raise ServiceError(404, f"Cliente desconocido: {client_id}", "CLIENT_NOT_FOUND")
+
+
+def parse_multipart(content_type: str, body: bytes) -> Tuple[Dict[str, str], List[Tuple[str, bytes]]]:
+    """({campo: valor}, [(nombre de archivo, contenido)]) de un multipart/form-data."""
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    if not message.is_multipart():
+        raise ServiceError(400, "Se esperaba multipart/form-data", "BAD_REQUEST")
+    fields: Dict[str, str] = {}
+    files: List[Tuple[str, bytes]] = []
+    for part in message.iter_parts():
+        filename = part.get_filename()
+        payload = part.get_payload(decode=True) or b""
+        if filename:
+            files.append((Path(filename).name, payload))
+        else:
+            name = part.get_param("name", header="content-disposition")
+            if name:
+                fields[name] = payload.decode("utf-8").strip()
+    return fields, files
+
+
+class ExtractionService:
+    """Índice, caché, plantillas y almacén del proceso principal, compartidos entre peticiones."""
+
+    def __init__(self, executor, workers: int, cache, warehouse, templates: LayoutTemplates,
+                 pdf_root: Path = PDF_BASE_DIR, output_dir: Path = DEFAULT_OUTPUT_DIR):
+        self.executor = executor
+        self.workers = workers
+        self.pdf_root = pdf_root
+        self.output_dir = output_dir
+        self.warehouse = warehouse
+        # Candado de todo lo que vive en el proceso principal: índice, caché,
+        # plantillas, almacén y JSON. La lectura de los PDFs en el pool va sin él.
+        self._lock = threading.RLock()
+        self._cache = cache
+        self._templates = templates
+        self.cache = Locked(cache, self._lock)
+        self.templates = Locked(templates, self._lock)
+        self.index = load_corpus_index(pdf_root)
+        self.started = time.time()
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+
+    def count_request(self):
+        with self._requests_lock:
+            self.requests += 1
+
+    def refresh_index(self):
+        with self._lock:
+            self.index = load_corpus_index(self.pdf_root)
+            return self.index
+
+    def health(self) -> Dict[str, Any]:
+        return {"success": True, "workers": self.workers, "requests": self.requests,
+                "uptimeSeconds": round(time.time() - self.started, 1), "pdfs": len(list(self.index.entries()))}
+
+    def client_data(self, client_id: str, year: Optional[str] = None) -> Dict[str, Any]:
+        """Respuesta de GET /financial-data (la forma de FinancialDataResponse en api/financial-data.ts)."""
+        folder = client_folder(client_id)
+        path = self.output_dir / f"{CLIENT_MAPPING[folder]['id']}.json"
+        if not path.exists():
+            raise ServiceError(404, f"Sin datos publicados para {client_id}", "NOT_EXTRACTED")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if year:
+            data["years"] = {name: value for name, value in data.get("years", {}).items() if name == year}
+        return {"success": True, "message": "OK", "errorCode": None, "data": [data]}
+
+    def extract(self, folder: str, months: List[Tuple[str, str]], statement: Optional[str] = None,
+                rebuild: bool = False) -> Tuple[List[Dict], ScanStats]:
+        """
+        Extrae los meses en el pool y los escribe en el JSON del cliente.
+        Regresa ([{"mes", listas del mes}], ScanStats de la petición).
+        """
+        index = self.index
+        plan = []
+        for year_name, month_num in sorted(set(months)):
+            jobs = [job for job in month_jobs(index, folder, year_name, month_num)
+                    if statement in (None, job[1])]
+            if jobs:
+                plan.append((year_name, month_num, jobs))
+        stats = ScanStats()
+        all_jobs = [job for _, _, jobs in plan for job in jobs]
+        # Con rebuild no se lee ni se escribe el caché
+        results = run_jobs(all_jobs, self.executor, None if rebuild else self.cache, stats, self.templates, index,
+                           self.workers)
+
+        written = []
+        offset = 0
+        with self._lock:
+            for year_name, month_num, jobs in plan:
+                items = write_client_month(folder, year_name, month_num, jobs,
+                                           results[offset:offset + len(jobs)], self.output_dir, self.warehouse)
+                offset += len(jobs)
+                written.append({"mes": f"{year_name}-{month_num}", **items})
+            self.warehouse.record_text_sources(text_source_rows(all_jobs, stats.sources))
+            self._cache.save()
+            self._templates.save()
+        return written, stats
+
+    def extract_request(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /financial-data/extract: re-extraer un cliente (todo, un año o un mes)."""
+        start = time.perf_counter()
+        folder = client_folder(body.get("clientId") or body.get("clienteId") or "")
+        year, month = parse_period(body.get("year"), body.get("month"))
+        statement = body.get("statement")
+        if statement not in (None, "er", "bg"):
+            raise ServiceError(400, f"statement debe ser 'er' o 'bg': {statement}", "BAD_REQUEST")
+        index = self.refresh_index()
+        months = [(year_name, month_num)
+                  for year_name in index.years(folder) if not year or year_name == year
+                  for month_num in index.months(folder, year_name) if not month or month_num == month]
+        if not months:
+            raise ServiceError(404, "No hay PDFs para ese periodo", "NO_PDFS")
+        written, stats = self.extract(folder, months, statement, bool(body.get("rebuild")))
+        return {"success": True, "message": f"{len(written)} mes(es) extraídos",
+                "clientId": CLIENT_MAPPING[folder]["id"], "months": written,
+                "detail": stats.summary(), "seconds": round(time.perf_counter() - start, 3)}
+
+    def _place(self, folder: str, kind: str, year: str, month: str, staged: Path, filename: str) -> Tuple[Path, bool]:
+        """
+        Mueve el PDF subido a su lugar en el árbol; reemplaza el estado del mes si
+        ya había uno y si no lo guarda con su nombre canónico (el índice clasifica
+        por nombre: "documento.pdf" nunca se indexaría). 400 si la ruta resultante
+        queda fuera de la carpeta del mes.
+        """
+        existing = self.index.get(folder, year, month, kind)
+        directory = self.pdf_root / folder / year / month
+        target = existing or directory / f"{CANONICAL_NAMES[kind]} {month} {year}.pdf"
+        outside_month = existing is None and target.resolve().parent != directory.resolve()
+        if outside_month or not target.resolve().is_relative_to(self.pdf_root.resolve()):
+            staged.unlink()
+            raise ServiceError(400, f"Ruta inválida para {filename}", "BAD_REQUEST")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(staged), str(target))
+        return target, existing is not None
+
+    def upload(self, fields: Dict[str, str], files: List[Tuple[str, bytes]]) -> Dict[str, Any]:
+        """POST /financial-data/upload: colocar los PDFs en el árbol y extraer sus meses."""
+        start = time.perf_counter()
+        folder = client_folder(fields.get("clientId") or fields.get("clienteId") or "")
+        form_year, form_month = parse_period(fields.get("year"), fields.get("month"))
+        if not files:
+            raise ServiceError(400, "No se recibieron archivos", "BAD_REQUEST")
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+        rejected = []
+        staged = []
+        for filename, content in files:
+            if not content.startswith(b"%PDF") or b"%%EOF" not in content[-1024:]:
+                rejected.append({"archivo": filename, "motivo": "no es un PDF completo"})
+                continue
+            path = UPLOAD_DIR / f"{uuid.uuid4().hex}.pdf"
+            path.write_bytes(content)
+            staged.append((filename, path, self.executor.submit(identify_statement, path, filename)))
+
+        placed = []
+        for filename, path, future in staged:
+            try:
+                kind, year, month, company = future.result()
+            except Exception as e:
+                kind = year = month = company = None
+                print(f"  ⚠️  {filename}: {e}")
+            year = form_year or year
+            month = form_month or month
+            if not (kind and year and month):
+                path.unlink()
+                rejected.append({"archivo": filename, "motivo": "no se reconoce el tipo de estado o el periodo"})
+                continue
+            if company and not company_matches(folder, company):
+                path.unlink()
+                rejected.append({"archivo": filename,
+                                 "motivo": f"el encabezado es de {company}, no de {CLIENT_MAPPING[folder]['nombre']}"})
+                continue
+            with self._lock:
+                target, replaced = self._place(folder, kind, year, month, path, filename)
+            placed.append({"archivo": filename, "tipo": kind, "mes": f"{year}-{month}",
+                           "ruta": str(target.relative_to(self.pdf_root)), "reemplazo": replaced})
+
+        index = self.refresh_index()
+        months = set()
+        for entry in list(placed):
+            year, month = entry["mes"].split("-")
+            target = self.pdf_root / entry["ruta"]
+            if index.get(folder, year, month, entry["tipo"]) != target:
+                # Un archivo que el índice no ve nunca se extraería: no se deja huérfano
+                if not entry["reemplazo"]:
+                    target.unlink(missing_ok=True)
+                placed.remove(entry)
+                rejected.append({"archivo": entry["archivo"], "motivo": "no quedó en el índice del árbol de PDFs"})
+            elif entry["tipo"] != "anexos":
+                months.add((year, month))
+
+        if not placed:
+            reasons = "; ".join(f"{entry['archivo']}: {entry['motivo']}" for entry in rejected)
+            raise ServiceError(422, f"Ningún archivo se pudo procesar ({reasons})", "NO_VALID_FILES")
+        written, stats = self.extract(folder, sorted(months))
+        return {"success": True, "message": f"{len(placed)} archivo(s) procesado(s)",
+                "clientId": CLIENT_MAPPING[folder]["id"], "filesProcessed": len(placed),
+                "files": placed, "rejected": rejected, "months": written,
+                "detail": stats.summary(), "seconds": round(time.perf_counter() - start, 3)}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Rutas de la API; el servicio vive en el servidor (server.service)."""
+
+    server_version = "ExtractionService/1"
+
+    @property
+    def service(self) -> ExtractionService:
+        return self.server.service
+
+    def _route(self) -> Tuple[str, Dict[str, List[str]]]:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        if path.startswith(API_PREFIX + "/"):
+            path = path[len(API_PREFIX):]
+        return path, parse_qs(url.query)
+
+    def _origin_allowed(self) -> bool:
+        """Sin Origin (curl, scripts locales) o con el origen configurado en --allow-origin."""
+        origin = self.headers.get("Origin")
+        return origin is None or origin == self.server.allowed_origin
+
+    def _cors_headers(self):
+        if not self._origin_allowed():
+            return
+        self.send_header("Access-Control-Allow-Origin", self.server.allowed_origin)
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers",
+                         self.headers.get("Access-Control-Request-Headers") or "Content-Type")
+        self.send_header("Vary", "Origin")
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self._cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_UPLOAD_MB * 1024 * 1024:
+            raise ServiceError(413, f"La petición pasa de {MAX_UPLOAD_MB} MB", "PAYLOAD_TOO_LARGE")
+        return self.rfile.read(length)
+
+    def _handle(self, method: str):
+        self.service.count_request()
+        try:
+            if not self._origin_allowed():
+                raise ServiceError(403, f"Origen no permitido: {self.headers.get('Origin')}", "FORBIDDEN_ORIGIN")
+            path, query = self._route()
+            if method == "GET" and path == "/health":
+                payload = self.service.health()
+            elif method == "GET" and path == "/financial-data":
+                client_id = (query.get("clienteId") or query.get("clientId") or [""])[0]
+                payload = self.service.client_data(client_id, (query.get("year") or [None])[0])
+            elif method == "POST" and path == "/financial-data/upload":
+                fields, files = parse_multipart(self.headers.get("Content-Type", ""), self._read_body())
+                payload = self.service.upload(fields, files)
+            elif method == "POST" and path == "/financial-data/extract":
+                try:
+                    body = json.loads(self._read_body() or b"{}")
+                except ValueError:
+                    raise ServiceError(400, "JSON inválido", "BAD_REQUEST")
+                payload = self.service.extract_request(body)
+            else:
+                raise ServiceError(404, f"Ruta no encontrada: {method} {path}", "NOT_FOUND")
+            self._send_json(200, payload)
+        except ServiceError as e:
+            self._send_json(e.status, {"success": False, "message": str(e), "errorCode": e.code})
+        except Exception as e:
+            print(f"❌ ERROR en {method} {self.path}: {e}")
+            self._send_json(500, {"success": False, "message": str(e), "errorCode": "INTERNAL_ERROR"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_OPTIONS(self):
+        self.send_response(204 if self._origin_allowed() else 403)
+        self._cors_headers()
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servicio local de extracción con workers calientes")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interfaz (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Puerto (default: {DEFAULT_PORT})")
+    parser.add_argument("--allow-origin", default=DEFAULT_ALLOWED_ORIGIN, metavar="URL",
+                        help=f"Único origen de navegador que puede llamar al servicio, el del dashboard "
+                             f"(default: {DEFAULT_ALLOWED_ORIGIN})")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=0,
+        help="Procesos del pool (default: 0 = todos los núcleos)"
+    )
+    parser.add_argument(
+        "--no-templates", action="store_true",
+        help="No usar plantillas de layout: leer siempre el texto completo"
+    )
+    add_memory_arguments(parser)
+    add_backend_arguments(parser)
+    add_text_store_arguments(parser)
+    add_family_arguments(parser)
+    add_cache_arguments(parser)
+    add_warehouse_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workers = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    cache = cache_from_args(args)
+    warehouse = warehouse_from_args(args)
+    memory = memory_from_args(args)
+    backends = backends_from_args(args)
+    text_store = text_store_from_args(args)
+    templates_enabled = not args.no_templates
+
+    start = time.perf_counter()
+    families = resolve_families(families_from_args(args), load_corpus_index(PDF_BASE_DIR))
+    init_worker(templates_enabled, families=families)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(templates_enabled, None, memory, backends, text_store, families))
+    pids = set(executor.map(warm_worker, range(workers)))
+    service = ExtractionService(executor, workers, cache, warehouse, LayoutTemplates(enabled=templates_enabled))
+    print(f"🔥 {len(pids)} worker(s) listos en {time.perf_counter() - start:.2f}s")
+
+    server = ThreadingHTTPServer((args.host, args.port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.allowed_origin = args.allow_origin.rstrip("/")
+    print(f"🚀 Servicio de extracción en http://{args.host}:{args.port} para {server.allowed_origin} "
+          f"(Ctrl+C para salir)")
+    # Detener con SIGTERM (docker stop, systemd) igual que con Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servicio detenido")
+    finally:
+        server.server_close()
+        executor.shutdown()
+        cache.save()
+        warehouse.close()
+
+
+if __name__ == "__main__":
+    main()
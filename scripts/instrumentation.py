@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Instrumentación de las etapas calientes de la extracción.
+
+Las etapas se envuelven con `METRICS.stage(...)`:
+
+    discovery    recorrer el árbol de PDFs (corpus_index)
+    open         pdfplumber.open + lista de páginas
+    text         extract_text() de una página
+    layout       fragmentos de texto de una página (plantillas de layout)
+    match        búsqueda de patrones / lectura por posición en una página
+    json_write   serialización y escritura atómica de un JSON
+
+Mientras no se configure, `stage()` no mide nada. Con --metrics DIR los
+extractores escriben al final:
+
+    DIR/<script>.jsonl   un evento por línea, más totales por archivo y cliente
+    DIR/<script>.prom    formato textfile de Prometheus (node_exporter)
+
+Con --tracemalloc cada evento guarda además la memoria de Python asignada al
+terminar la etapa y el pico durante la etapa.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASE_DIR = Path(__file__).parent.parent
+PDF_BASE_DIR = BASE_DIR / "Ejercicio Analisis MRM Vilego Luenser y otros"
+
+DEFAULT_SLOWEST = 10
+
+
+class Metrics:
+    """Eventos de tiempo (y memoria) por etapa del proceso actual."""
+
+    def __init__(self, pdf_root: Path = PDF_BASE_DIR):
+        self.pdf_root = Path(pdf_root)
+        self.enabled = False
+        self.trace_memory = False
+        self.events: List[Dict] = []
+
+    def configure(self, enabled: bool = True, trace_memory: bool = False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def config(self) -> Dict:
+        """Configuración para replicarla en los workers de un pool."""
+        return {"enabled": self.enabled, "trace_memory": self.trace_memory}
+
+    def stage(self, name: str, file: Optional[Path] = None):
+        """Context manager que mide una etapa (no hace nada si está deshabilitado)."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name, file)
+
+    @contextmanager
+    def _timed(self, name: str, file: Optional[Path]):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            event = {"stage": name, "seconds": round(time.perf_counter() - start, 6)}
+            if file is not None:
+                event["file"] = str(file)
+            if self.trace_memory:
+                event["mem_current"], event["mem_peak"] = tracemalloc.get_traced_memory()
+            self.events.append(event)
+
+    def drain(self) -> List[Dict]:
+        """Regresa y olvida los eventos (para enviarlos desde un worker del pool)."""
+        events, self.events = self.events, []
+        return events
+
+    def extend(self, events: List[Dict]):
+        self.events.extend(events)
+
+    def client_of(self, file: str) -> Optional[str]:
+        """Carpeta de cliente de un PDF del árbol (None para otros archivos)."""
+        try:
+            return Path(file).relative_to(self.pdf_root).parts[0]
+        except ValueError:
+            return None
+
+    def stage_totals(self) -> Dict[str, Dict]:
+        totals: Dict[str, Dict] = {}
+        for event in self.events:
+            total = totals.setdefault(event["stage"], {"count": 0, "seconds": 0.0, "mem_peak": 0})
+            total["count"] += 1
+            total["seconds"] += event["seconds"]
+            total["mem_peak"] = max(total["mem_peak"], event.get("mem_peak", 0))
+        return totals
+
+    def file_totals(self) -> Dict[str, float]:
+        """Segundos por PDF (todas sus etapas)."""
+        totals: Dict[str, float] = {}
+        for event in self.events:
+            file = event.get("file")
+            if file and self.client_of(file):
+                totals[file] = totals.get(file, 0.0) + event["seconds"]
+        return totals
+
+    def client_totals(self) -> Dict[str, Dict]:
+        totals: Dict[str, Dict] = {}
+        for file, seconds in self.file_totals().items():
+            total = totals.setdefault(self.client_of(file), {"files": 0, "seconds": 0.0})
+            total["files"] += 1
+            total["seconds"] += seconds
+        return totals
+
+    def slowest_files(self, n: int = DEFAULT_SLOWEST) -> List[tuple]:
+        return sorted(self.file_totals().items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def write_jsonl(self, path: Path, slowest: int = DEFAULT_SLOWEST):
+        lines = [json.dumps({"type": "stage", **event}, ensure_ascii=False) for event in self.events]
+        for rank, (file, seconds) in enumerate(self.slowest_files(slowest), 1):
+            lines.append(json.dumps({"type": "slowest_file", "rank": rank, "file": file,
+                                     "seconds": round(seconds, 6)}, ensure_ascii=False))
+        for client, total in sorted(self.client_totals().items()):
+            lines.append(json.dumps({"type": "client", "client": client, "files": total["files"],
+                                     "seconds": round(total["seconds"], 6)}, ensure_ascii=False))
+        write_text_atomic(path, "\n".join(lines) + "\n")
+
+    def write_prometheus(self, path: Path, job: str, slowest: int = DEFAULT_SLOWEST):
+        """Formato textfile de Prometheus; `job` queda como etiqueta de todas las series."""
+        out = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in {"job": job, **labels}.items())
+                out.append(f"{name}{{{label_text}}} {value}")
+
+        stages = self.stage_totals()
+        metric("extraction_stage_seconds_total", "counter", "Segundos acumulados por etapa",
+               [({"stage": s}, round(t["seconds"], 6)) for s, t in sorted(stages.items())])
+        metric("extraction_stage_calls_total", "counter", "Veces que se ejecutó cada etapa",
+               [({"stage": s}, t["count"]) for s, t in sorted(stages.items())])
+        if self.trace_memory:
+            metric("extraction_stage_memory_peak_bytes", "gauge", "Pico de memoria Python (tracemalloc) por etapa",
+                   [({"stage": s}, t["mem_peak"]) for s, t in sorted(stages.items())])
+        clients = self.client_totals()
+        metric("extraction_client_seconds_total", "counter", "Segundos de extracción por cliente",
+               [({"client": c}, round(t["seconds"], 6)) for c, t in sorted(clients.items())])
+        metric("extraction_client_files_total", "counter", "PDFs procesados por cliente",
+               [({"client": c}, t["files"]) for c, t in sorted(clients.items())])
+        metric("extraction_slowest_file_seconds", "gauge", "PDFs más lentos de la corrida",
+               [({"rank": str(rank), "file": str(Path(file).relative_to(self.pdf_root))}, round(seconds, 6))
+                for rank, (file, seconds) in enumerate(self.slowest_files(slowest), 1)])
+        write_text_atomic(path, "\n".join(out) + "\n")
+
+    def export(self, out_dir: Path, job: str, slowest: int = DEFAULT_SLOWEST):
+        """Escribe <job>.jsonl y <job>.prom en `out_dir` e imprime un resumen."""
+        if not self.enabled:
+            return
+        out_dir = Path(out_dir)
+        self.write_jsonl(out_dir / f"{job}.jsonl", slowest)
+        self.write_prometheus(out_dir / f"{job}.prom", job, slowest)
+
+        print("\n⏱️  Tiempo por etapa:")
+        for name, total in sorted(self.stage_totals().items(), key=lambda item: -item[1]["seconds"]):
+            memory = f", pico {total['mem_peak'] / 1024 / 1024:.1f} MB" if self.trace_memory else ""
+            print(f"  ├─ {name:<11} {total['seconds']:>8.2f}s ({total['count']} veces{memory})")
+        for file, seconds in self.slowest_files(min(slowest, 5)):
+            print(f"  🐢 {seconds * 1000:>8.1f}ms  {Path(file).relative_to(self.pdf_root)}")
+        print(f"📈 Métricas: {out_dir / (job + '.jsonl')}, {out_dir / (job + '.prom')}")
+
+
+def write_text_atomic(path: Path, text: str):
+    # json_store importa este módulo para medir la escritura de JSON
+    from json_store import write_text_atomic as write
+    write(path, text)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Métricas del proceso actual; los módulos de extracción las usan directamente
+METRICS = Metrics()
+
+
+def add_metrics_arguments(parser):
+    """Agrega --metrics, --tracemalloc y --slowest a un argparse.ArgumentParser."""
+    parser.add_argument("--metrics", type=Path, metavar="DIR",
+                        help="Medir cada etapa y escribir <script>.jsonl y <script>.prom en DIR")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Con --metrics, registrar también la memoria de cada etapa")
+    parser.add_argument("--slowest", type=int, default=DEFAULT_SLOWEST,
+                        help="Cuántos PDFs lentos reportar (default: 10)")
+
+
+def metrics_from_args(args) -> Metrics:
+    METRICS.configure(enabled=args.metrics is not None, trace_memory=args.tracemalloc)
+    return METRICS
+
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Escritura de los JSON de clientes (public/data/clients/<id>.json).
+
+- `write_json_atomic` escribe a un archivo temporal en la misma carpeta, hace
+  fsync y lo renombra encima del destino. Si el proceso muere a la mitad, el
+  dashboard sigue viendo el JSON anterior completo.
+- `ClientJsonBatch` carga el JSON de un cliente una vez, acumula todas las
+  actualizaciones de meses en memoria (índice por `mes`) y lo escribe una sola vez,
+  con la sección `kpis` de cada año recalculada (ver kpis.py). Con un almacén
+  (warehouse.py) los meses actualizados se guardan primero ahí y solo esos meses
+  se escriben en el JSON tal como quedaron en el almacén; los demás meses del
+  JSON no se tocan aunque el almacén difiera (p. ej. después de --no-warehouse).
+- `write_client_json` escribe además un fragmento por año, `<id>/<año>.json`, y
+  `<id>/manifest.json` (años, meses disponibles, tamaño y sha256 de cada
+  fragmento) para que el dashboard descargue solo los años que muestra, y la
+  versión columnar `<id>.columnar.json` si se pidió o ya existe (ver columnar.py).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional
+
+from columnar import COLUMNAR_SUFFIX, columnar_path, to_columnar
+from instrumentation import METRICS
+from kpis import add_kpis
+from warehouse import Warehouse
+
+# Listas por año que se indexan por "mes"
+YEAR_LISTS = ("estadoResultadosPeriodo", "estadoResultadosYTD", "balanceGeneral")
+
+MANIFEST_FORMAT = 1
+
+
+def _target_mode(path: Path) -> int:
+    """Permisos del archivo existente, o los de un archivo nuevo según el umask."""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _write_atomic(path: Path, write: Callable[[IO], None]):
+    """Escribe con `write(f)` a un temporal en la misma carpeta, fsync y rename."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crea el archivo con permisos 0600; conservar los del destino
+        os.chmod(tmp_name, _target_mode(path))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+    # Persistir también la entrada del directorio (no disponible en Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_json_atomic(path: Path, data: Any, indent: Optional[int] = 2):
+    """Escribe `data` como JSON de forma atómica (temporal + fsync + rename)."""
+    with METRICS.stage("json_write", path):
+        _write_atomic(path, lambda f: json.dump(data, f, indent=indent, ensure_ascii=False))
+
+
+def write_text_atomic(path: Path, text: str):
+    """Escribe texto de forma atómica (p. ej. el textfile de Prometheus)."""
+    _write_atomic(path, lambda f: f.write(text))
+
+
+def write_year_shards(json_path: Path, data: Dict) -> Dict:
+    """
+    Escribe `<id>/<año>.json` (sin sangría) por cada año de `data` y
+    `<id>/manifest.json`. Solo reescribe los fragmentos cuyo sha256 cambió y
+    borra los de años que ya no existen. Regresa el manifest.
+    """
+    shard_dir = Path(json_path).with_suffix("")
+    manifest_path = shard_dir / "manifest.json"
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f).get("years", {})
+    except (OSError, ValueError):
+        previous = {}
+
+    years = {}
+    for year, year_data in data.get("years", {}).items():
+        text = json.dumps(year_data, ensure_ascii=False, separators=(",", ":"))
+        payload = text.encode("utf-8")
+        entry = {
+            "months": sorted(item["mes"] for item in year_data.get("estadoResultadosPeriodo", [])),
+            "file": f"{year}.json",
+            "bytes": len(payload),
+            "sha256": hashlib.sha256(payload).hexdigest(),
+        }
+        shard_path = shard_dir / entry["file"]
+        if previous.get(year, {}).get("sha256") != entry["sha256"] or not shard_path.exists():
+            with METRICS.stage("json_write", shard_path):
+                write_text_atomic(shard_path, text)
+        years[year] = entry
+
+    for stale in shard_dir.glob("*.json"):
+        if stale.name != manifest_path.name and stale.stem not in years:
+            stale.unlink()
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "clienteId": data.get("clienteId"),
+        "clienteNombre": data.get("clienteNombre"),
+        "razonSocial": data.get("razonSocial"),
+        "years": years,
+    }
+    write_json_atomic(manifest_path, manifest, indent=None)
+    return manifest
+
+
+def write_client_json(json_path: Path, data: Dict, columnar: bool = False):
+    """
+    Escribe `<id>.json` completo y sus fragmentos por año con su manifest. La
+    versión columnar se escribe con `columnar=True` o si ya existía (para que no
+    quede desactualizada).
+    """
+    write_json_atomic(json_path, data)
+    write_year_shards(json_path, data)
+    columnar_file = columnar_path(json_path)
+    if columnar or columnar_file.exists():
+        write_json_atomic(columnar_file, to_columnar(data), indent=None)
+
+
+def client_json_paths(directory: Path) -> List[Path]:
+    """Los <id>.json de clientes de una carpeta (sin las versiones columnares)."""
+    return sorted(p for p in Path(directory).glob("*.json") if not p.name.endswith(COLUMNAR_SUFFIX))
+
+
+class ClientJsonBatch:
+    """Acumula las actualizaciones de un cliente y escribe su JSON una sola vez."""
+
+    def __init__(self, json_path: Path, warehouse: Optional[Warehouse] = None):
+        self.json_path = Path(json_path)
+        self.warehouse = warehouse if warehouse is not None and warehouse.enabled else None
+        with open(self.json_path, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.updated_months = 0
+        # Meses actualizados desde el último save(), para el almacén: {lista: [datos]}
+        self._pending: Dict[str, List[Dict]] = {}
+        self._reindex()
+
+    def _reindex(self):
+        # (año, lista) -> {mes: posición en la lista}
+        self._index: Dict[tuple, Dict[str, int]] = {}
+        for year, year_data in self.data.get("years", {}).items():
+            for list_key in YEAR_LISTS:
+                items = year_data.setdefault(list_key, [])
+                self._index[(year, list_key)] = {item["mes"]: i for i, item in enumerate(items)}
+
+    def has_year(self, year: str) -> bool:
+        return year in self.data.get("years", {})
+
+    def ensure_year(self, year: str):
+        """Agrega el año con sus listas vacías si no existe."""
+        if self.has_year(year):
+            return
+        years = self.data.setdefault("years", {})
+        years[year] = {list_key: [] for list_key in YEAR_LISTS}
+        self.data["years"] = dict(sorted(years.items()))
+        for list_key in YEAR_LISTS:
+            self._index[(year, list_key)] = {}
+
+    def upsert(self, year: str, list_key: str, item: Dict):
+        """
+        Reemplaza el mes de `item` o lo inserta antes del primer mes posterior,
+        para que un mes atrasado no quede al final de la lista.
+        """
+        items = self.data["years"][year][list_key]
+        positions = self._index[(year, list_key)]
+        position = positions.get(item["mes"])
+        if position is not None:
+            items[position] = item
+        elif not items or items[-1]["mes"] < item["mes"]:
+            positions[item["mes"]] = len(items)
+            items.append(item)
+        else:
+            position = next(i for i, existing in enumerate(items) if existing["mes"] > item["mes"])
+            items.insert(position, item)
+            self._index[(year, list_key)] = {existing["mes"]: i for i, existing in enumerate(items)}
+
+    def update_lists(self, year: str, month: str, items: Dict[str, Dict]):
+        """
+        Reemplaza o agrega el mes solo en las listas dadas ({lista: datos}),
+        creando el año si no existe.
+        """
+        self.ensure_year(year)
+        mes_str = f"{year}-{month}"
+        for list_key, data in items.items():
+            item = {"mes": mes_str, **data}
+            self.upsert(year, list_key, item)
+            self._pending.setdefault(list_key, []).append(item)
+        self.updated_months += 1
+
+    def update_month(self, year: str, month: str, periodo_data: Optional[Dict], ytd_data: Optional[Dict],
+                     balance_data: Optional[Dict]) -> bool:
+        """
+        Reemplaza o agrega el mes en las tres listas del año (las que vienen en
+        None no se tocan). Regresa False si el año no existe en el JSON.
+        """
+        if not self.has_year(year):
+            return False
+
+        items = {
+            "estadoResultadosPeriodo": periodo_data,
+            "estadoResultadosYTD": ytd_data,
+            "balanceGeneral": balance_data,
+        }
+        self.update_lists(year, month, {key: data for key, data in items.items() if data is not None})
+        return True
+
+    def _reload_pending(self, stored: Dict):
+        """Reemplaza solo los meses actualizados por su versión en el almacén (`stored`)."""
+        by_month = {(list_key, item["mes"]): item
+                    for year_data in stored.get("years", {}).values()
+                    for list_key, items in year_data.items() for item in items}
+        for list_key, items in self._pending.items():
+            for item in items:
+                self.upsert(item["mes"][:4], list_key, by_month.get((list_key, item["mes"]), item))
+
+    def save(self) -> int:
+        """
+        Escribe el JSON si hubo cambios. Regresa cuántos meses se escribieron.
+        Con almacén, los meses se guardan ahí (la primera vez, el cliente completo)
+        y los meses actualizados se releen del almacén para que tengan los mismos
+        números que una corrida completa; el resto del JSON se conserva.
+        """
+        written = self.updated_months
+        if written and self.warehouse:
+            client_id = self.data["clienteId"]
+            if self.warehouse.has_client(client_id):
+                self.warehouse.upsert_months(self.data, self._pending)
+            else:
+                self.warehouse.replace_clients([self.data])
+            self._reload_pending(self.warehouse.client_data(client_id))
+        self._pending = {}
+        if written:
+            add_kpis([self.data])
+            write_client_json(self.json_path, self.data)
+            self.updated_months = 0
+        return written
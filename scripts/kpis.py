@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+KPIs financieros precalculados por mes (sección `kpis` de cada año del JSON).
+
+Replica `calcularKPIsFinancieros` de lib/financial-calculations.ts con NumPy:
+todos los meses de todos los clientes se calculan de una vez como columnas, con
+la misma regla de denominador cero (si el denominador es 0 el KPI vale 0).
+
+Antes del cálculo se aplica lo mismo que hace el reporte
+(components/contpaq-data/ReportContentDynamic.tsx) con el balance del mes:
+
+  - si no hay balance de ese mes se usa el más reciente anterior del mismo año
+    (o el más antiguo del año si no hay anterior),
+  - AC = 0  -> bancos + deudores + inventario + inversiones + clientes,
+  - PC = 0  -> AC * 0.5,
+  - capital = 0 -> utilidadEj.
+
+Así el dashboard solo busca `years[año].kpis` por `mes` y obtiene los mismos
+números que calcularía en el navegador.
+
+    python3 kpis.py                 # recalcular los KPIs de todos los JSON
+    python3 kpis.py --client mrm
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_OUTPUT_DIR = BASE_DIR / "public" / "data" / "clients"
+
+# Mismo orden que la interfaz KPIFinanciero (types/financial.ts)
+KPI_FIELDS = (
+    "razonCirculante", "pruebaAcida", "margenOperativo", "margenNeto",
+    "rotacionActivos", "rotacionCuentasCobrar", "diasCuentasCobrar",
+    "rotacionInventarios", "diasInventario", "razonEndeudamiento", "razonDeuda",
+    "coberturaIntereses", "ROE", "ROA", "capitalTrabajo",
+)
+
+ER_COLUMNS = ("ingresos", "compras", "gastos", "gastFin", "utilidad")
+BG_COLUMNS = ("ac", "pc", "anc", "plc", "bancos", "deudores", "inventario", "inversiones",
+              "clientes", "pagosAnt", "anticipoProv", "capital", "utilidadEj")
+
+DECIMALS = 6
+
+
+def _balance_for(balances: List[Dict], mes: str) -> Optional[Dict]:
+    """Balance que usa el reporte para `mes` (ver docstring del módulo)."""
+    exact = next((bg for bg in balances if bg["mes"] == mes), None)
+    if exact is not None or not balances:
+        return exact
+    ordered = sorted(balances, key=lambda bg: bg["mes"])
+    previous = [bg for bg in ordered if bg["mes"] <= mes]
+    return previous[-1] if previous else ordered[0]
+
+
+def _pairs(data: Dict) -> List[Tuple[str, Dict, Dict]]:
+    """(año, estado de resultados, balance) de cada mes del cliente que tiene ambos."""
+    pairs = []
+    for year, year_data in data.get("years", {}).items():
+        balances = year_data.get("balanceGeneral", [])
+        for er in year_data.get("estadoResultadosPeriodo", []):
+            bg = _balance_for(balances, er["mes"])
+            if bg is not None:
+                pairs.append((year, er, bg))
+    return pairs
+
+
+def _column(rows: List[Dict], key: str) -> np.ndarray:
+    return np.array([row.get(key) or 0 for row in rows], dtype=np.float64)
+
+
+def _ratio(numerator: np.ndarray, denominator) -> np.ndarray:
+    """numerator / denominator, con 0 donde el denominador es 0."""
+    numerator, denominator = np.broadcast_arrays(numerator, denominator)
+    return np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator != 0)
+
+
+def compute_kpis(er_rows: List[Dict], bg_rows: List[Dict]) -> Dict[str, np.ndarray]:
+    """KPIs de cada par (er_rows[i], bg_rows[i]), como una columna por KPI."""
+    er = {key: _column(er_rows, key) for key in ER_COLUMNS}
+    bg = {key: _column(bg_rows, key) for key in BG_COLUMNS}
+
+    # Compatibilidad con balances sin AC/PC (mismo orden de sumas que el reporte)
+    subcuentas = bg["bancos"] + bg["deudores"] + bg["inventario"] + bg["inversiones"] + bg["clientes"]
+    ac = np.where(bg["ac"] == 0, subcuentas, bg["ac"])
+    pc = np.where(bg["pc"] == 0, ac * 0.5, bg["pc"])
+    capital = np.where(bg["capital"] == 0, bg["utilidadEj"], bg["capital"])
+
+    activo_total = ac + bg["anc"]
+    pasivo_total = pc + bg["plc"]
+    utilidad_operativa = er["ingresos"] - er["compras"] - er["gastos"]
+    rotacion_cxc = _ratio(er["ingresos"], bg["clientes"])
+    rotacion_inventarios = _ratio(er["compras"], bg["inventario"])
+
+    return {
+        "razonCirculante": _ratio(ac, pc),
+        "pruebaAcida": _ratio(ac - bg["inventario"] - bg["pagosAnt"] - bg["anticipoProv"], pc),
+        "margenOperativo": _ratio(utilidad_operativa, er["ingresos"]),
+        "margenNeto": _ratio(er["utilidad"], er["ingresos"]),
+        "rotacionActivos": _ratio(er["ingresos"], activo_total),
+        "rotacionCuentasCobrar": rotacion_cxc,
+        "diasCuentasCobrar": _ratio(365.0, rotacion_cxc),
+        "rotacionInventarios": rotacion_inventarios,
+        "diasInventario": _ratio(365.0, rotacion_inventarios),
+        "razonEndeudamiento": _ratio(pasivo_total, activo_total),
+        "razonDeuda": _ratio(pasivo_total, capital),
+        "coberturaIntereses": _ratio(utilidad_operativa, er["gastFin"]),
+        "ROE": _ratio(er["utilidad"], capital),
+        "ROA": _ratio(er["utilidad"], activo_total),
+        "capitalTrabajo": ac - pc,
+    }
+
+
+def add_kpis(clients: List[Dict]) -> int:
+    """
+    Calcula en un solo paso los KPIs de todos los meses de `clients` (datos de
+    <id>.json) y los escribe en `years[año]["kpis"]`. Regresa cuántos meses.
+    """
+    pairs = [(data, year, er, bg) for data in clients for year, er, bg in _pairs(data)]
+    columns = compute_kpis([er for _, _, er, _ in pairs], [bg for _, _, _, bg in pairs])
+    rows = np.round(np.column_stack([columns[name] for name in KPI_FIELDS]), DECIMALS) if pairs else []
+
+    for data in clients:
+        for year_data in data.get("years", {}).values():
+            year_data["kpis"] = []
+    for (data, year, er, _), values in zip(pairs, rows):
+        data["years"][year]["kpis"].append({"mes": er["mes"], **dict(zip(KPI_FIELDS, values.tolist()))})
+    return len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula la sección kpis de los JSON de clientes")
+    parser.add_argument("--client", help="Solo este cliente (id del JSON, p. ej. mrm)")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="Carpeta con los <id>.json (default: public/data/clients)")
+    args = parser.parse_args()
+
+    # Importado aquí: json_store calcula los KPIs al guardar
+    from json_store import client_json_paths, write_client_json
+
+    paths = [args.output_dir / f"{args.client}.json"] if args.client else client_json_paths(args.output_dir)
+    clients = []
+    for path in paths:
+        if not path.exists():
+            print(f"❌ No existe {path}")
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            clients.append(json.load(f))
+
+    months = add_kpis(clients)
+    for path, data in zip(paths, clients):
+        write_client_json(path, data)
+    print(f"✅ KPIs de {months} meses en {len(clients)} clientes")
+
+
+if __name__ == "__main__":
+    main()
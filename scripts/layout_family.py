@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Familia de layout de cada cliente: qué conjunto de patrones le corresponde.
+
+En el repo hay dos familias de patrones que no son compatibles:
+
+    contpaq    renglones de totales de CONTPAQ i con periodo, % y acumulado
+               ("Total INGRESOS  23,733,693.97  100.00  23,733,693.97  100.00",
+               "Total ACTIVO CIRCULANTE ..."): extract_all_clients.py
+    generico   etiquetas sueltas ("Ingresos", "Ventas", "Activo circulante") con
+               un solo importe: extract_financial_data.py
+
+Antes había que saber qué script le quedaba a qué cliente, y el que no le quedaba
+leía el PDF, no encontraba sus campos obligatorios y lo volvía a leer con
+pdfplumber para nada. Aquí la familia se reconoce con señales baratas de la
+primera página, sin correr ningún patrón:
+
+    - los metadatos del PDF (Creator/Producer): CONTPAQ i exporta con
+      "Visor de Reportes" (iText)
+    - el encabezado de la primera página: "CONTPAQ i <RAZÓN SOCIAL> <año> Hoja: 1"
+
+Todos los PDFs de un cliente salen del mismo sistema, así que la familia se
+reconoce con el primer PDF del cliente y se guarda en .cache/layout_families.json;
+en las siguientes corridas solo cuesta un `stat` del PDF de muestra. Los
+extractores corren únicamente los patrones de esa familia (ver FAMILY_EXTRACTORS
+en extract_all_clients.py y extract_financial_data.py).
+
+    python3 layout_family.py                 # familia de cada cliente
+    python3 layout_family.py --all           # reconocer cada PDF y avisar si un cliente mezcla familias
+    python3 layout_family.py --refingerprint # ignorar lo guardado
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfparser import PDFParser
+
+from json_store import write_json_atomic
+from pdf_text import group_rows, iter_page_runs, row_text
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_FAMILIES_PATH = BASE_DIR / ".cache" / "layout_families.json"
+
+FAMILIES_FORMAT = 1
+
+# Renglones del encabezado de la primera página que se revisan
+HEADER_ROWS = 3
+
+
+@dataclass(frozen=True)
+class Family:
+    """Una familia de layout y las señales que la delatan."""
+    name: str
+    description: str
+    creators: Tuple[str, ...] = ()   # subcadenas de Creator/Producer
+    headers: Tuple[str, ...] = ()    # prefijos del encabezado de la primera página
+
+
+FAMILY_CONTPAQ = "contpaq"
+FAMILY_GENERIC = "generico"
+
+# En orden de prioridad; la genérica no tiene señales y es la que queda si ninguna coincide
+FAMILIES = (
+    Family(FAMILY_CONTPAQ, "CONTPAQ i: renglones Total con periodo y acumulado",
+           creators=("Visor de Reportes",), headers=("CONTPAQ i",)),
+    Family(FAMILY_GENERIC, "etiquetas sueltas con un solo importe"),
+)
+FAMILY_NAMES = [family.name for family in FAMILIES]
+
+
+def _decode(value) -> str:
+    if isinstance(value, bytes):
+        # Cadenas de texto PDF: UTF-16 con BOM o PDFDocEncoding (~latin-1)
+        if value.startswith(b"\xfe\xff"):
+            return value[2:].decode("utf-16-be", errors="replace")
+        return value.decode("latin-1")
+    return str(value) if value is not None else ""
+
+
+def pdf_metadata(pdf_path: Path) -> Dict[str, str]:
+    """Creator y Producer del diccionario Info (solo se lee el trailer, no las páginas)."""
+    with open(pdf_path, "rb") as f:
+        document = PDFDocument(PDFParser(f))
+        info = document.info[0] if document.info else {}
+        return {key: _decode(info.get(key)) for key in ("Creator", "Producer") if info.get(key)}
+
+
+def first_page_header(pdf_path: Path, rows: int = HEADER_ROWS) -> List[str]:
+    """Primeros renglones de la primera página (del almacén de texto si ya está)."""
+    pages = iter_page_runs(pdf_path)
+    try:
+        runs = next(pages, [])
+    finally:
+        pages.close()
+    return [row_text(row)[0] for row in islice(group_rows(runs), rows)]
+
+
+def fingerprint(pdf_path: Path) -> Tuple[str, List[str]]:
+    """(familia, señales encontradas) de un PDF."""
+    metadata = pdf_metadata(pdf_path)
+    header: Optional[List[str]] = None
+    for family in FAMILIES:
+        signals = [f"{key}: {value}" for key, value in metadata.items()
+                   if any(creator in value for creator in family.creators)]
+        if family.headers:
+            if header is None:
+                header = first_page_header(pdf_path)
+            signals += [f"encabezado: {row}" for row in header
+                        if any(row.startswith(prefix) for prefix in family.headers)]
+        if signals:
+            return family.name, signals
+    return FAMILY_GENERIC, []
+
+
+class LayoutFamilies:
+    """Familia de cada cliente (carpeta), reconocida con su primer PDF y guardada en disco."""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_FAMILIES_PATH, forced: Optional[str] = None,
+                 refresh: bool = False):
+        self.path = Path(path) if path else None
+        self.forced = forced
+        self.fingerprinted = 0
+        self.reused = 0
+        # carpeta -> {"family", "pdf", "size", "mtime_ns", "signals"}
+        self._clients: Dict[str, Dict] = {}
+        self._dirty = False
+        if self.path and not refresh:
+            self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") == FAMILIES_FORMAT:
+            self._clients = data.get("clients", {})
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        write_json_atomic(self.path, {"format": FAMILIES_FORMAT, "clients": self._clients})
+        self._dirty = False
+
+    def family(self, client: str, pdf_path: Path) -> str:
+        """
+        Familia del cliente. Se reconoce con `pdf_path` solo si no hay una guardada
+        o si el PDF de muestra con el que se reconoció cambió o ya no está.
+        """
+        if self.forced:
+            return self.forced
+        entry = self._clients.get(client)
+        if entry and self._sample_current(entry):
+            self.reused += 1
+            return entry["family"]
+        family, signals = fingerprint(pdf_path)
+        st = os.stat(pdf_path)
+        self._clients[client] = {"family": family, "pdf": str(pdf_path), "size": st.st_size,
+                                 "mtime_ns": st.st_mtime_ns, "signals": signals}
+        self._dirty = True
+        self.fingerprinted += 1
+        return family
+
+    @staticmethod
+    def _sample_current(entry: Dict) -> bool:
+        try:
+            st = os.stat(entry["pdf"])
+        except OSError:
+            return False
+        return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+
+    def resolve(self, index, clients) -> Dict[str, str]:
+        """{carpeta: familia} de los clientes con PDFs en el índice (el primer PDF es la muestra)."""
+        families = {}
+        for client in clients:
+            sample = next((path for (folder, _, _, kind), path in index.entries()
+                           if folder == client and kind != "anexos"), None)
+            if sample is not None:
+                families[client] = self.family(client, sample)
+        return families
+
+    def signals(self, client: str) -> List[str]:
+        return self._clients.get(client, {}).get("signals", [])
+
+    def summary(self, families: Dict[str, str]) -> str:
+        counts: Dict[str, int] = {}
+        for family in families.values():
+            counts[family] = counts.get(family, 0) + 1
+        detail = ", ".join(f"{family} {n}" for family, n in sorted(counts.items()))
+        if self.forced:
+            return f"Familias de layout: {detail} (forzada con --family)"
+        return (f"Familias de layout: {detail} ({self.fingerprinted} reconocidas, "
+                f"{self.reused} guardadas)")
+
+
+def add_family_arguments(parser):
+    parser.add_argument("--family", choices=["auto"] + FAMILY_NAMES, default="auto",
+                        help="Familia de patrones de todos los PDFs (default: auto, reconocida por cliente)")
+    parser.add_argument("--refingerprint", action="store_true",
+                        help="Volver a reconocer la familia de cada cliente aunque esté guardada")
+
+
+def families_from_args(args) -> LayoutFamilies:
+    forced = args.family if args.family != "auto" else None
+    return LayoutFamilies(forced=forced, refresh=args.refingerprint)
+
+
+def check_all(index, clients) -> int:
+    """Reconoce cada PDF de estado financiero; regresa cuántos clientes mezclan familias."""
+    mixed = 0
+    for client in clients:
+        counts: Dict[str, int] = {}
+        for (folder, _, _, kind), path in index.entries():
+            if folder == client and kind != "anexos":
+                family, _ = fingerprint(path)
+                counts[family] = counts.get(family, 0) + 1
+        detail = ", ".join(f"{family} {n}" for family, n in sorted(counts.items()))
+        if len(counts) > 1:
+            mixed += 1
+            print(f"⚠️  {client}: mezcla familias ({detail})")
+        else:
+            print(f"✅ {client}: {detail}")
+    return mixed
+
+
+def main():
+    # Importado aquí: corpus_index no se necesita para usar el módulo desde los extractores
+    from corpus_index import PDF_BASE_DIR, load_corpus_index
+
+    parser = argparse.ArgumentParser(description="Familia de layout de cada cliente")
+    parser.add_argument("--client", action="append", default=[], metavar="CARPETA",
+                        help="Solo esta carpeta de cliente (se puede repetir)")
+    parser.add_argument("--all", action="store_true",
+                        help="Reconocer cada PDF (no solo la muestra) y avisar si un cliente mezcla familias")
+    parser.add_argument("--refingerprint", action="store_true", help="Ignorar las familias guardadas")
+    args = parser.parse_args()
+
+    index = load_corpus_index(PDF_BASE_DIR)
+    clients = sorted({folder for (folder, _, _, _), _ in index.entries()})
+    if args.client:
+        wanted = {name.lower() for name in args.client}
+        clients = [client for client in clients if client.lower() in wanted]
+
+    start = time.perf_counter()
+    if args.all:
+        mixed = check_all(index, clients)
+        print(f"🔍 {len(clients)} clientes en {time.perf_counter() - start:.2f}s, {mixed} con familias mezcladas")
+        return
+
+    families = LayoutFamilies(refresh=args.refingerprint)
+    resolved = families.resolve(index, clients)
+    for client, family in resolved.items():
+        signals = families.signals(client)
+        print(f"📑 {client}: {family}" + (f" ({'; '.join(signals)})" if signals else ""))
+    families.save()
+    print(f"🔍 {families.summary(resolved)} en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Plantillas de layout por cliente y tipo de estado financiero.
+
+Todos los PDFs salen de CONTPAQ i con el mismo layout: cada renglón de totales
+("Total INGRESOS  23,733,693.97  100.00  23,733,693.97  100.00") está en su
+propia línea y cada importe está alineado a la derecha en una columna fija.
+
+pdfplumber construye un objeto por carácter (posición, fuente, colores...) antes
+de armar el texto; eso es ~60% del tiempo de cada PDF. Aquí el contenido de la
+página se interpreta con pdfminer registrando solo los fragmentos de texto tal
+como los dibuja el PDF (uno por celda) con su posición, y la plantilla indica en
+qué renglón (etiqueta) y en qué columna (borde derecho) está cada valor:
+
+    {"page": 0, "label": "Total INGRESOS", "y": 653.5, "columns": [385.5, 538.6]}
+
+Así el periodo y el acumulado salen de su columna y no de adivinar qué número
+del renglón es cuál con una regex.
+
+La plantilla se aprende la primera vez que se ve un (cliente, tipo) a partir del
+resultado del escaneo normal (pdf_text.scan_pdf) y solo se acepta si, aplicada a
+ese mismo PDF, lee exactamente los mismos campos y valores que las regex. Un campo
+cuya etiqueta no está en el PDF se omite, igual que con las regex. Si en otro PDF
+la plantilla falla (un importe no cae en su columna, falta un campo requerido, o
+las regex encuentran un campo que la plantilla no leyó) se usa el escaneo normal y
+se vuelve a aprender.
+
+Las páginas se leen conforme la plantilla las pide: si todos los campos están en
+la primera hoja no se abre el resto del PDF.
+
+La huella de cada plantilla (`LayoutTemplates.digest`) forma parte de la versión
+del caché de extracción, así que un resultado guardado con una plantilla no se
+reutiliza cuando la plantilla cambia.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from instrumentation import METRICS
+from json_store import write_json_atomic
+from pdf_text import ScanStats, TextRun, group_rows, open_page_runs, row_text, scan_pdf
+from statement_scanner import FieldScanner
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_TEMPLATES_PATH = BASE_DIR / ".cache" / "layout_templates.json"
+
+TEMPLATE_FORMAT = 2
+
+# Tolerancia en puntos PDF: borde derecho de un importe respecto a su columna
+COLUMN_TOLERANCE = 2.0
+
+AMOUNT_RE = re.compile(r"-?[\d,]*\.?\d+")
+
+
+def _run_at(starts: List[int], offset: int) -> int:
+    """Índice del fragmento que contiene la posición `offset` del texto del renglón."""
+    index = 0
+    for i, start in enumerate(starts):
+        if start <= offset:
+            index = i
+    return index
+
+
+class PageRows:
+    """
+    Renglones de cada página de un PDF, leídos (de pdf_text.open_page_runs) solo
+    hasta la página que se pide. `len()` es el total de páginas del documento.
+    """
+
+    def __init__(self, pages_total: int, pages: Iterator[List[TextRun]]):
+        self.pages_total = pages_total
+        self._pages = pages
+        self.read: List[List[List[TextRun]]] = []
+
+    def _read_until(self, index: int) -> bool:
+        while len(self.read) <= index:
+            runs = next(self._pages, None)
+            if runs is None:
+                return False
+            self.read.append(group_rows(runs))
+        return True
+
+    def __len__(self) -> int:
+        return self.pages_total
+
+    def __getitem__(self, index: int) -> List[List[TextRun]]:
+        if not self._read_until(index):
+            raise IndexError(index)
+        return self.read[index]
+
+    def __iter__(self):
+        index = 0
+        while self._read_until(index):
+            yield self.read[index]
+            index += 1
+
+
+class PositionMatch:
+    """Valores leídos por posición con la interfaz de re.Match que usan los extractores."""
+
+    def __init__(self, values: List[str]):
+        self._values = values
+
+    def group(self, index: int = 0) -> str:
+        return self._values[index - 1] if index else " ".join(self._values)
+
+
+def learn_template(pages: PageRows, matches: Dict) -> Optional[Dict]:
+    """
+    Arma la plantilla a partir de los renglones de cada página y las coincidencias
+    del escaneo normal. Regresa None si algún campo no se puede ubicar en un solo
+    renglón (la coincidencia cruza líneas o el texto no corresponde).
+    """
+    fields = {}
+    for field, match in matches.items():
+        wanted = " ".join(match.group(0).split())
+        location = None
+        for page_number, rows in enumerate(pages):
+            for row in rows:
+                text, starts = row_text(row)
+                offset = text.find(wanted)
+                if offset != -1:
+                    location = (page_number, row, starts, offset)
+                    break
+            if location:
+                break
+        if not location:
+            return None
+
+        page_number, row, starts, offset = location
+        label = row[_run_at(starts, offset)]
+        columns = []
+        for group in range(1, match.re.groups + 1):
+            run = row[_run_at(starts, offset + match.start(group) - match.start(0))]
+            if run.text != match.group(group) or not AMOUNT_RE.fullmatch(run.text):
+                return None
+            columns.append(round(run.x1, 1))
+        fields[field] = {"page": page_number, "label": label.text, "y": round(label.y, 1), "columns": columns}
+    return {"fields": fields}
+
+
+def apply_template(template: Dict, pages: PageRows) -> Optional[Dict[str, PositionMatch]]:
+    """
+    Lee los campos de la plantilla por posición. Los campos cuya etiqueta no está
+    en su página se omiten; regresa None si un importe no cae en su columna.
+    """
+    matches = {}
+    for field, spec in template["fields"].items():
+        if spec["page"] >= len(pages):
+            continue
+        rows = [row for row in pages[spec["page"]] if any(run.text == spec["label"] for run in row)]
+        if not rows:
+            continue
+        row = min(rows, key=lambda r: abs(r[0].y - spec["y"]))
+        label_x1 = next(run.x1 for run in row if run.text == spec["label"])
+        values = []
+        for column in spec["columns"]:
+            run = next((r for r in row if r.x0 > label_x1 and abs(r.x1 - column) <= COLUMN_TOLERANCE
+                        and AMOUNT_RE.fullmatch(r.text)), None)
+            if run is None:
+                return None
+            values.append(run.text)
+        matches[field] = PositionMatch(values)
+    return matches
+
+
+class LayoutTemplates:
+    """Plantillas aprendidas por llave "<cliente>|<tipo>", guardadas en disco."""
+
+    def __init__(self, path: Path = DEFAULT_TEMPLATES_PATH, enabled: bool = True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self._templates: Dict[str, Dict] = {}
+        self._dirty = False
+        # Aprendidas desde el último take_learned() (para regresarlas desde un worker del pool)
+        self._learned: Dict[str, Dict] = {}
+        if enabled:
+            self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") == TEMPLATE_FORMAT:
+            self._templates = data.get("templates", {})
+
+    def take_learned(self) -> Dict[str, Dict]:
+        """Regresa y olvida las plantillas aprendidas desde la última llamada."""
+        learned, self._learned = self._learned, {}
+        return learned
+
+    def update(self, learned: Dict[str, Dict]):
+        """Incorpora plantillas aprendidas en otro proceso."""
+        if learned:
+            self._templates.update(learned)
+            self._dirty = True
+
+    def save(self):
+        if not self.enabled or not self._dirty:
+            return
+        write_json_atomic(self.path, {"format": TEMPLATE_FORMAT, "templates": self._templates})
+        self._dirty = False
+
+    def digest(self, key: str) -> str:
+        """Huella de la plantilla de `key` para la versión del caché de extracción."""
+        if not self.enabled:
+            return "sin-plantillas"
+        template = self._templates.get(key)
+        if template is None:
+            return "sin-plantilla"
+        data = json.dumps(template, sort_keys=True).encode("utf-8")
+        return f"plantilla-{TEMPLATE_FORMAT}-{hashlib.sha256(data).hexdigest()[:12]}"
+
+    def scan(self, key: str, pdf_path: Path, scanner: FieldScanner,
+             stats: Optional[ScanStats] = None, required: Optional[List[str]] = None) -> Dict:
+        """
+        Regresa {campo: coincidencia} usando la plantilla de `key`; si no hay o no
+        cuadra, escanea el texto (pdf_text.scan_pdf, con `required`) y aprende la
+        plantilla.
+        """
+        if not self.enabled:
+            return scan_pdf(pdf_path, scanner, stats=stats, required=required)
+
+        with open_page_runs(pdf_path) as (pages_total, runs):
+            pages = PageRows(pages_total, runs)
+            template = self._templates.get(key)
+            if template:
+                with METRICS.stage("match", pdf_path):
+                    matches = apply_template(template, pages)
+                    usable = (matches is not None and all(field in matches for field in required or ())
+                              and not self._unread_fields(matches, pages, scanner))
+                if usable:
+                    if stats is not None:
+                        stats.positional += 1
+                        stats.files += 1
+                        stats.pages_total += pages_total
+                        stats.pages_read += len(pages.read)
+                        stats.chars_read += sum(len(run.text) for rows in pages.read for row in rows for run in row)
+                        stats.sources[str(pdf_path)] = "plantilla"
+                    return matches
+
+            matches = scan_pdf(pdf_path, scanner, stats=stats, required=required)
+            if matches:
+                self._learn(key, template, pages, matches)
+        return matches
+
+    def _learn(self, key: str, template: Optional[Dict], pages: PageRows, matches: Dict):
+        """
+        Aprende la plantilla de `key` con las coincidencias del escaneo normal. Se
+        conservan los campos de la plantilla anterior que este PDF no trae, y la
+        plantilla solo se guarda si al aplicarla al mismo PDF lee exactamente los
+        mismos campos y valores que las regex.
+        """
+        learned = learn_template(pages, matches)
+        if not learned:
+            return
+        if template:
+            learned["fields"] = {**template["fields"], **learned["fields"]}
+        positional = apply_template(learned, pages)
+        if positional is None or positional.keys() != matches.keys():
+            return
+        for field, match in matches.items():
+            groups = range(1, match.re.groups + 1)
+            if [positional[field].group(i) for i in groups] != [match.group(i) for i in groups]:
+                return
+        self._templates[key] = learned
+        self._learned[key] = learned
+        self._dirty = True
+
+    @staticmethod
+    def _unread_fields(matches: Dict, pages: PageRows, scanner: FieldScanner) -> bool:
+        """True si las regex encuentran algún campo que la plantilla no leyó (hay que re-aprender)."""
+        missing = [field for field in scanner.fields if field not in matches]
+        if not missing:
+            return False
+        state = scanner.start()
+        for rows in pages:
+            state.feed("\n".join(row_text(row)[0] for row in rows))
+        return any(field in state.matches() for field in missing)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Exporta todos los datos extraídos a Parquet para análisis en pandas / Polars.
+
+Un dataset por lista del JSON, particionado por cliente y año (estilo Hive):
+
+    exports/parquet/estado_resultados_periodo/cliente=mrm/anio=2024/part-0.parquet
+    exports/parquet/estado_resultados_ytd/...
+    exports/parquet/balance_general/...
+
+Cada archivo tiene `mes` como fecha (día 1 del mes, date32) y los importes como
+float64; `cliente` y `anio` salen de la ruta de la partición:
+
+    import pandas as pd
+    df = pd.read_parquet("exports/parquet/balance_general", columns=["cliente", "mes", "bancos"])
+
+Los datos salen del almacén SQLite (warehouse.py) o, con --from-json, de
+public/data/clients/*.json. Requiere pyarrow (opcional: pip3 install pyarrow).
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from json_store import client_json_paths
+from warehouse import DEFAULT_OUTPUT_DIR, DEFAULT_WAREHOUSE_PATH, TABLES, Warehouse
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_PARQUET_DIR = BASE_DIR / "exports" / "parquet"
+
+
+def iter_clients_from_warehouse(path: Path = DEFAULT_WAREHOUSE_PATH) -> Iterator[Dict]:
+    warehouse = Warehouse(path)
+    try:
+        for client_id in warehouse.client_ids():
+            yield warehouse.client_data(client_id)
+    finally:
+        warehouse.close()
+
+
+def iter_clients_from_json(directory: Path = DEFAULT_OUTPUT_DIR) -> Iterator[Dict]:
+    for path in client_json_paths(directory):
+        with open(path, "r", encoding="utf-8") as f:
+            yield json.load(f)
+
+
+def _month_date(mes: str) -> date:
+    return date(int(mes[:4]), int(mes[5:7]), 1)
+
+
+def export_parquet(clients: Iterator[Dict], out_dir: Path = DEFAULT_PARQUET_DIR) -> Dict[str, int]:
+    """
+    Escribe los datasets en `out_dir` (reemplazándolos completos) y regresa
+    {dataset: renglones}. Se escriben primero a una carpeta temporal y se
+    mueven al final, para no dejar un dataset a medias.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("❌ Falta pyarrow para exportar a Parquet: pip3 install pyarrow")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {table: 0 for table, _ in TABLES.values()}
+    with tempfile.TemporaryDirectory(prefix=".parquet.", dir=out_dir) as tmp:
+        for data in clients:
+            for year, year_data in data.get("years", {}).items():
+                for list_key, (table, columns) in TABLES.items():
+                    items: List[Dict] = year_data.get(list_key, [])
+                    if not items:
+                        continue
+                    # Mismo esquema en todas las particiones (null si el cliente no reporta el campo)
+                    schema = pa.schema([("mes", pa.date32())] + [(column, pa.float64()) for column in columns])
+                    arrays = [pa.array([_month_date(item["mes"]) for item in items], pa.date32())]
+                    arrays += [pa.array([item.get(column) for item in items], pa.float64()) for column in columns]
+                    partition = Path(tmp) / table / f"cliente={data['clienteId']}" / f"anio={year}"
+                    partition.mkdir(parents=True, exist_ok=True)
+                    pq.write_table(pa.Table.from_arrays(arrays, schema=schema), partition / "part-0.parquet")
+                    counts[table] += len(items)
+
+        for table in counts:
+            target = out_dir / table
+            if target.exists():
+                shutil.rmtree(target)
+            if (Path(tmp) / table).exists():
+                (Path(tmp) / table).rename(target)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta los datos extraídos a Parquet (cliente/año)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_PARQUET_DIR,
+                        help="Carpeta de salida (default: exports/parquet)")
+    parser.add_argument("--warehouse", type=Path, default=DEFAULT_WAREHOUSE_PATH, metavar="DB",
+                        help="Almacén SQLite de origen (default: data/financials.sqlite)")
+    parser.add_argument("--from-json", action="store_true",
+                        help="Leer public/data/clients/*.json en lugar del almacén")
+    args = parser.parse_args()
+
+    if args.from_json:
+        clients = iter_clients_from_json()
+    elif not args.warehouse.exists():
+        print(f"❌ No existe {args.warehouse}: corre el extractor o `python3 warehouse.py import`, "
+              f"o usa --from-json")
+        return
+    else:
+        clients = iter_clients_from_warehouse(args.warehouse)
+
+    counts = export_parquet(clients, args.output)
+    for table, rows in counts.items():
+        print(f"✅ {table}: {rows} meses")
+    print(f"📁 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Lectura de texto de PDFs página por página.
+
+En lugar de concatenar el texto de todo el documento y después buscar con regex,
+`scan_pdf` busca los campos página por página y deja de abrir páginas en cuanto
+todos los campos tienen su patrón de mayor prioridad. Los totales de los estados
+financieros casi siempre están en las hojas 1-2, así que el resto del documento
+ni siquiera se analiza.
+
+Cada página se cierra (`page.close()`) en cuanto se lee su texto, para que
+pdfplumber no conserve sus caracteres y layout hasta cerrar el documento. En modo
+de baja memoria (`configure_memory(low_memory=True)`, --low-memory en los
+extractores) además las páginas se crean una por una en lugar de armar la lista
+`pdf.pages` completa, y después de cada página se compara el RSS del proceso con
+el umbral de aviso (`rss_warn_mb`): si lo rebasa se fuerza una recolección de
+basura y, si sigue arriba, se cuenta en ScanStats.rss_warnings para avisarlo en el
+resumen. El umbral no detiene ni recicla al worker; solo indica que conviene bajar
+`--jobs`. El pico de RSS de cada worker queda en ScanStats.peak_rss_mb.
+
+Backends de texto (`--text-backend`):
+
+    pdfminer     interpreta el contenido de la página con pdfminer registrando solo
+                 los fragmentos de texto y su posición, y arma los renglones por
+                 línea base (sin objetos por carácter ni análisis de layout);
+                 ~2.4x más rápido que pdfplumber con el mismo texto para los
+                 renglones de totales
+    pdfplumber   page.extract_text() (análisis completo por carácter)
+
+Por omisión (`auto`) se prueba pdfminer y, si en ese PDF faltan los campos
+requeridos del extractor (o el backend falla), se vuelve a escanear con
+pdfplumber. El backend que produjo cada PDF queda en ScanStats.sources.
+
+Con el almacén de texto (text_store.py, `configure_text_store`) los backends
+guardan las páginas de cada PDF por contenido y la siguiente vez las leen de ahí
+sin interpretar el PDF. Las páginas se guardan conforme se leen y el PDF entra al
+almacén solo si se llegó a su última página: con el almacén se conservan la salida
+temprana y la liberación de cada página.
+"""
+
+import gc
+import os
+import re
+import resource
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pdfplumber
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from pdfplumber.page import Page
+
+from instrumentation import METRICS
+from statement_scanner import FieldScanner
+from text_store import DEFAULT_TEXT_STORE_DIR, TextStore
+
+# Backend de texto -> orden en que se prueban (--text-backend)
+BACKEND_CHOICES = {
+    "auto": ("pdfminer", "pdfplumber"),
+    "pdfminer": ("pdfminer",),
+    "pdfplumber": ("pdfplumber",),
+}
+
+# Tolerancia en puntos PDF: fragmentos con la misma línea base
+ROW_TOLERANCE = 1.0
+
+
+@dataclass
+class ScanStats:
+    """Contadores de páginas leídas/omitidas por el escaneo."""
+    files: int = 0
+    pages_total: int = 0
+    pages_read: int = 0
+    chars_read: int = 0
+    positional: int = 0  # PDFs leídos con plantilla de layout (ver layout_templates.py)
+    peak_rss_mb: float = 0.0  # pico de memoria del proceso (el mayor de todos los workers)
+    rss_warnings: int = 0  # páginas tras las que el proceso seguía arriba de rss_warn_mb
+    fallbacks: int = 0  # PDFs que se volvieron a escanear con el siguiente backend
+    sources: Dict[str, str] = field(default_factory=dict)  # ruta del PDF -> backend que lo leyó
+    stored: int = 0  # lecturas servidas por el almacén de texto (sin abrir el PDF)
+    copies: int = 0  # PDFs idénticos a otro ya extraído en la corrida (no se leyeron)
+    errors: int = 0  # PDFs que no se pudieron leer: su resultado en ceros no se guarda en el caché
+
+    @property
+    def pages_skipped(self) -> int:
+        return self.pages_total - self.pages_read
+
+    def merge(self, other: "ScanStats"):
+        self.files += other.files
+        self.pages_total += other.pages_total
+        self.pages_read += other.pages_read
+        self.chars_read += other.chars_read
+        self.positional += other.positional
+        self.peak_rss_mb = max(self.peak_rss_mb, other.peak_rss_mb)
+        self.rss_warnings += other.rss_warnings
+        self.fallbacks += other.fallbacks
+        self.sources.update(other.sources)
+        self.stored += other.stored
+        self.copies += other.copies
+        self.errors += other.errors
+
+    def summary(self) -> str:
+        summary = (f"{self.files} PDFs, {self.pages_read}/{self.pages_total} páginas leídas, "
+                   f"{self.pages_skipped} omitidas")
+        if self.positional:
+            summary += f", {self.positional} por plantilla"
+        counts: Dict[str, int] = {}
+        for backend in self.sources.values():
+            counts[backend] = counts.get(backend, 0) + 1
+        if counts:
+            summary += ", texto: " + ", ".join(f"{backend} {n}" for backend, n in sorted(counts.items()))
+            if self.fallbacks:
+                summary += f" ({self.fallbacks} con respaldo)"
+        if self.copies:
+            summary += f", {self.copies} copias idénticas sin releer"
+        if self.stored:
+            summary += f", {self.stored} lecturas del almacén de texto"
+        if self.errors:
+            summary += f", ⚠️  {self.errors} con error (no se guardan en el caché)"
+        if self.peak_rss_mb:
+            summary += f", pico de memoria por worker {self.peak_rss_mb:.0f} MB"
+            if self.rss_warnings:
+                summary += f" (⚠️  arriba de {_rss_warn_mb:.0f} MB en {self.rss_warnings} páginas)"
+        return summary
+
+
+_low_memory = False
+_rss_warn_mb: Optional[float] = None
+_rss_warnings = 0
+
+
+def configure_memory(low_memory: bool = False, rss_warn_mb: Optional[float] = None):
+    """Activa el modo de baja memoria en el proceso actual (llamar en cada worker)."""
+    global _low_memory, _rss_warn_mb
+    _low_memory = low_memory
+    _rss_warn_mb = rss_warn_mb
+
+
+def memory_config() -> Dict:
+    """Configuración actual, para pasarla a los workers (configure_memory(**config))."""
+    return {"low_memory": _low_memory, "rss_warn_mb": _rss_warn_mb}
+
+
+_backends: Tuple[str, ...] = BACKEND_CHOICES["auto"]
+
+
+def configure_backends(backends: Sequence[str] = BACKEND_CHOICES["auto"]):
+    """Orden de los backends de texto en el proceso actual (llamar en cada worker)."""
+    global _backends
+    unknown = [backend for backend in backends if backend not in TEXT_BACKENDS]
+    if unknown:
+        raise ValueError(f"Backend de texto desconocido: {', '.join(unknown)}")
+    _backends = tuple(backends)
+
+
+def backends_config() -> Tuple[str, ...]:
+    return _backends
+
+
+def add_backend_arguments(parser):
+    """Agrega --text-backend a un argparse.ArgumentParser."""
+    parser.add_argument("--text-backend", choices=sorted(BACKEND_CHOICES), default="auto",
+                        help="Lectura de texto: auto = pdfminer y pdfplumber de respaldo (default), "
+                             "o solo uno de los dos")
+
+
+def backends_from_args(args) -> Tuple[str, ...]:
+    """Configura el proceso actual y regresa el orden para los workers."""
+    configure_backends(BACKEND_CHOICES[args.text_backend])
+    return backends_config()
+
+
+_text_store: Optional[TextStore] = None
+
+
+def configure_text_store(root: Optional[Path] = None):
+    """Almacén de texto del proceso actual; None = sin almacén (llamar en cada worker)."""
+    global _text_store
+    _text_store = TextStore(root) if root else None
+
+
+def text_store_config() -> Optional[Path]:
+    return _text_store.root if _text_store is not None else None
+
+
+def add_text_store_arguments(parser):
+    """Agrega --text-store y --no-text-store a un argparse.ArgumentParser."""
+    parser.add_argument("--text-store", type=Path, default=DEFAULT_TEXT_STORE_DIR, metavar="DIR",
+                        help="Carpeta del almacén de texto extraído (default: .cache/text)")
+    parser.add_argument("--no-text-store", action="store_true",
+                        help="No leer ni guardar el texto extraído de los PDFs")
+
+
+def text_store_from_args(args) -> Optional[Path]:
+    """Configura el proceso actual y regresa la carpeta para los workers."""
+    configure_text_store(None if args.no_text_store else args.text_store)
+    return text_store_config()
+
+
+def record_text_store(stats: ScanStats):
+    """Pasa a `stats` las lecturas servidas por el almacén de texto en este proceso."""
+    if _text_store is not None:
+        hits, _ = _text_store.take_counts()
+        stats.stored += hits
+
+
+def add_memory_arguments(parser):
+    """Agrega --low-memory y --rss-warn a un argparse.ArgumentParser."""
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Leer los PDFs página por página liberando cada una (menos memoria por worker)")
+    parser.add_argument("--rss-warn", type=float, metavar="MB",
+                        help="Con --low-memory, avisar si el RSS de un worker sigue arriba de MB después de "
+                             "una página (solo aviso: no detiene al worker)")
+
+
+def memory_from_args(args) -> Dict:
+    """Configura el proceso actual y regresa la configuración para los workers."""
+    configure_memory(args.low_memory, args.rss_warn if args.low_memory else None)
+    return memory_config()
+
+
+def peak_rss_mb() -> float:
+    """Pico de RSS del proceso desde que arrancó (ru_maxrss: KB en Linux, bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """RSS actual del proceso, o None si el sistema no tiene /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def record_memory(stats: ScanStats):
+    """Pasa a `stats` el pico de RSS y las páginas sobre el umbral de aviso de este proceso."""
+    global _rss_warnings
+    stats.peak_rss_mb = max(stats.peak_rss_mb, peak_rss_mb())
+    stats.rss_warnings += _rss_warnings
+    _rss_warnings = 0
+
+
+def _check_rss_warn():
+    global _rss_warnings
+    if not _rss_warn_mb:
+        return
+    rss = current_rss_mb()
+    if rss is None or rss <= _rss_warn_mb:
+        return
+    gc.collect()
+    rss = current_rss_mb()
+    if rss is not None and rss > _rss_warn_mb:
+        _rss_warnings += 1
+
+
+def open_pdf(pdf_path: Path):
+    """
+    pdfplumber.open + lista de páginas (medido como etapa "open"). En modo de baja
+    memoria la lista no se arma: iter_pages crea las páginas al recorrerlas.
+    """
+    with METRICS.stage("open", pdf_path):
+        pdf = pdfplumber.open(pdf_path)
+        if not _low_memory:
+            pdf.pages
+    return pdf
+
+
+def page_count(pdf) -> int:
+    """Número de páginas sin crear los objetos Page (lee el árbol de páginas del PDF)."""
+    if hasattr(pdf, "_pages"):
+        return len(pdf._pages)
+    try:
+        return int(resolve1(resolve1(pdf.doc.catalog["Pages"])["Count"]))
+    except (KeyError, TypeError, ValueError):
+        return len(pdf.pages)
+
+
+def iter_pages(pdf) -> Iterator[Page]:
+    """
+    Páginas de un PDF ya abierto, una a la vez. Cada página se cierra (se liberan
+    sus caracteres y layout) cuando el llamador pide la siguiente o deja de iterar.
+    """
+    if not _low_memory:
+        for page in pdf.pages:
+            try:
+                yield page
+            finally:
+                page.close()
+        return
+
+    doctop = 0
+    for number, page_obj in enumerate(PDFPage.create_pages(pdf.doc), start=1):
+        page = Page(pdf, page_obj, page_number=number, initial_doctop=doctop)
+        doctop += page.height
+        try:
+            yield page
+        finally:
+            page.close()
+            del page
+            _check_rss_warn()
+
+
+def iter_page_texts(pdf, pdf_path: Optional[Path] = None) -> Iterator[str]:
+    """Genera el texto de cada página de un PDF ya abierto, una a la vez."""
+    for page in iter_pages(pdf):
+        with METRICS.stage("text", pdf_path):
+            text = page.extract_text() or ""
+        yield text
+
+
+@dataclass
+class TextRun:
+    """Fragmento de texto tal como lo dibuja el PDF (x0/x1 horizontales, y = línea base)."""
+    x0: float
+    x1: float
+    y: float
+    text: str
+
+
+class _RunDevice(PDFTextDevice):
+    """Dispositivo de pdfminer que solo registra fragmentos de texto y su posición."""
+
+    def __init__(self, rsrcmgr):
+        super().__init__(rsrcmgr)
+        self.runs: List[TextRun] = []
+        self._chars: List[str] = []
+        self._start: Optional[Tuple[float, float]] = None
+        self._end = 0.0
+
+    def render_string(self, textstate, seq, ncs, graphicstate):
+        self._chars = []
+        self._start = None
+        super().render_string(textstate, seq, ncs, graphicstate)
+        text = " ".join("".join(self._chars).split())
+        if text:
+            self.runs.append(TextRun(self._start[0], self._end, self._start[1], text))
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+        try:
+            self._chars.append(font.to_unichr(cid))
+        except Exception:
+            self._chars.append(" ")
+        advance = font.char_width(cid) * fontsize * scaling
+        if self._start is None:
+            self._start = (matrix[4], matrix[5])
+        self._end = matrix[4] + advance
+        return advance
+
+
+def group_rows(runs: List[TextRun]) -> List[List[TextRun]]:
+    """Agrupa los fragmentos en renglones (de arriba hacia abajo, izquierda a derecha)."""
+    rows: List[List[TextRun]] = []
+    for run in sorted(runs, key=lambda r: (-r.y, r.x0)):
+        if rows and abs(rows[-1][0].y - run.y) <= ROW_TOLERANCE:
+            rows[-1].append(run)
+        else:
+            rows.append([run])
+    for row in rows:
+        row.sort(key=lambda r: r.x0)
+    return rows
+
+
+def row_text(row: List[TextRun]) -> Tuple[str, List[int]]:
+    """Texto del renglón como lo arma pdfplumber y la posición donde empieza cada fragmento."""
+    starts, parts, offset = [], [], 0
+    for run in row:
+        starts.append(offset)
+        parts.append(run.text)
+        offset += len(run.text) + 1
+    return " ".join(parts), starts
+
+
+def _document_runs(document: PDFDocument, pdf_path: Path) -> Iterator[List[TextRun]]:
+    rsrcmgr = PDFResourceManager(caching=True)
+    for page in PDFPage.create_pages(document):
+        with METRICS.stage("layout", pdf_path):
+            device = _RunDevice(rsrcmgr)
+            PDFPageInterpreter(rsrcmgr, device).process_page(page)
+        yield device.runs
+        if _low_memory:
+            _check_rss_warn()
+
+
+def _stored_pages(pdf_path: Path, kind: str) -> Optional[List]:
+    """Páginas del PDF en el almacén de texto, o None si no están (o no hay almacén)."""
+    if _text_store is None:
+        return None
+    with METRICS.stage("store", pdf_path):
+        return _text_store.get(pdf_path, kind)
+
+
+def _storing(pages: Iterator, pdf_path: Path, kind: str, pages_total: int,
+             encode: Optional[Callable] = None) -> Iterator:
+    """
+    Genera las páginas tal como se leen y guarda el PDF en el almacén en cuanto se
+    lee la última. Si el escaneo se detiene antes (ya encontró sus campos) no se
+    guarda nada: el almacén nunca obliga a leer el PDF completo.
+    """
+    kept = []
+    for page in pages:
+        kept.append(encode(page) if encode else page)
+        if len(kept) == pages_total:
+            _text_store.put(pdf_path, kind, kept)
+        yield page
+
+
+@contextmanager
+def open_page_runs(pdf_path: Path):
+    """(páginas, fragmentos de cada página): del almacén o interpretando el PDF una página a la vez."""
+    stored = _stored_pages(pdf_path, "runs")
+    if stored is not None:
+        yield len(stored), ([TextRun(*run) for run in runs] for runs in stored)
+        return
+    with open(pdf_path, "rb") as f:
+        with METRICS.stage("open", pdf_path):
+            document = PDFDocument(PDFParser(f))
+            pages_total = int(resolve1(resolve1(document.catalog["Pages"])["Count"]))
+        pages = _document_runs(document, pdf_path)
+        if _text_store is not None:
+            pages = _storing(pages, pdf_path, "runs", pages_total,
+                             lambda runs: [[r.x0, r.x1, r.y, r.text] for r in runs])
+        yield pages_total, pages
+
+
+def iter_page_runs(pdf_path: Path) -> Iterator[List[TextRun]]:
+    """Genera los fragmentos de texto de cada página, una a la vez."""
+    with open_page_runs(pdf_path) as (_, pages):
+        yield from pages
+
+
+def _runs_texts(pages: Iterable[List[TextRun]], pdf_path: Path) -> Iterator[str]:
+    for runs in pages:
+        with METRICS.stage("text", pdf_path):
+            text = "\n".join(row_text(row)[0] for row in group_rows(runs))
+        yield text
+
+
+@contextmanager
+def _pdfminer_texts(pdf_path: Path):
+    """(páginas, texto de cada página) armando los renglones con los fragmentos de pdfminer."""
+    with open_page_runs(pdf_path) as (pages_total, pages):
+        yield pages_total, _runs_texts(pages, pdf_path)
+
+
+@contextmanager
+def _pdfplumber_texts(pdf_path: Path):
+    """(páginas, texto de cada página) con page.extract_text()."""
+    stored = _stored_pages(pdf_path, "pdfplumber")
+    if stored is not None:
+        yield len(stored), iter(stored)
+        return
+    with open_pdf(pdf_path) as pdf:
+        pages_total = page_count(pdf)
+        texts = iter_page_texts(pdf, pdf_path)
+        if _text_store is not None:
+            texts = _storing(texts, pdf_path, "pdfplumber", pages_total)
+        yield pages_total, texts
+
+
+TEXT_BACKENDS = {"pdfminer": _pdfminer_texts, "pdfplumber": _pdfplumber_texts}
+
+
+def read_pdf_text(pdf_path: Path) -> str:
+    """
+    Extrae todo el texto de un PDF (sin early-exit). Arma el texto completo en
+    memoria: los extractores usan scan_pdf, que solo guarda una página a la vez.
+    """
+    with open_pdf(pdf_path) as pdf:
+        return "".join(iter_page_texts(pdf, pdf_path))
+
+
+def _scan_with(backend: str, pdf_path: Path, scanner: FieldScanner) -> Tuple[Dict[str, re.Match], ScanStats]:
+    state = scanner.start()
+    file_stats = ScanStats(files=1)
+    with TEXT_BACKENDS[backend](pdf_path) as (pages_total, texts):
+        file_stats.pages_total = pages_total
+        for text in texts:
+            file_stats.pages_read += 1
+            file_stats.chars_read += len(text)
+            with METRICS.stage("match", pdf_path):
+                state.feed(text)
+            if state.done:
+                break
+    file_stats.sources[str(pdf_path)] = backend
+    return state.matches(), file_stats
+
+
+def scan_pdf(
+    pdf_path: Path,
+    scanner: Union[FieldScanner, Dict[str, List[str]]],
+    flags: int = 0,
+    stats: Optional[ScanStats] = None,
+    required: Optional[Iterable[str]] = None,
+    backends: Optional[Sequence[str]] = None,
+) -> Dict[str, re.Match]:
+    """
+    Busca los campos del `scanner` página por página.
+
+    `scanner` es un FieldScanner (o un dict campo -> lista de regex en orden de
+    prioridad, que se compila con `flags`). Para cada campo se regresa la primera
+    coincidencia del patrón de mayor prioridad que aparezca en el documento (igual
+    que `re.search` sobre el texto completo). Un campo queda resuelto cuando
+    coincide su primer patrón; cuando todos están resueltos ya no se leen más
+    páginas.
+
+    Los backends (`backends` o los configurados) se prueban en orden: se usa el
+    siguiente si el anterior falla o si le falta alguno de los campos `required`
+    (sin `required`, si no encontró ningún campo).
+
+    Las excepciones del último backend se propagan al llamador.
+    """
+    if not isinstance(scanner, FieldScanner):
+        scanner = FieldScanner(scanner, flags)
+    required = list(required) if required is not None else None
+    order = tuple(backends or _backends)
+
+    for attempt, backend in enumerate(order):
+        last = attempt == len(order) - 1
+        try:
+            matches, file_stats = _scan_with(backend, pdf_path, scanner)
+        except Exception:
+            if last:
+                raise
+            continue
+        complete = all(name in matches for name in required) if required is not None else bool(matches)
+        if complete or last:
+            break
+
+    if stats is not None:
+        file_stats.fallbacks = attempt
+        stats.merge(file_stats)
+
+    return matches
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Pipeline asíncrono productor/consumidor para la extracción masiva.
+
+    descubrimiento ──► cola de tareas ──► lectura anticipada ──► extracción ──► cola de resultados ──► escritor
+       (productor)       (acotada)         (hilos de E/S)      (pool de procesos)    (acotada)        (uno solo)
+
+- El productor recorre los grupos (un grupo = un cliente) y encola sus tareas;
+  la cola está acotada, así que con 50k PDFs nunca hay más de `queue_size`
+  tareas en memoria.
+- Cada consumidor lee el PDF completo en un hilo antes de mandarlo a extraer:
+  la lectura (lenta en una carpeta de red) queda en el caché del sistema operativo
+  mientras otros PDFs se están analizando en el pool, así que lectura y análisis
+  se traslapan. Como mucho `read_ahead` lecturas van a la vez.
+- La búsqueda en el caché corre en los hilos de E/S (puede tener que calcular
+  el sha256 del PDF); las tareas con resultado en caché no pasan por el pool.
+  Para que el PDF no se lea dos veces (hash y lectura anticipada), `cached` y
+  `collect` deben usar un sha256 ya conocido, p. ej. el del índice del corpus.
+- Con `key`, las tareas con la misma llave (p. ej. PDFs con el mismo contenido)
+  se extraen una sola vez: las demás esperan a la primera y reciben una copia de
+  su resultado (`copy`), aunque sean de otro grupo.
+- Un solo escritor junta los resultados de cada grupo y, cuando el grupo está
+  completo, lo entrega a `write` en un hilo dedicado (las escrituras de un grupo
+  nunca se mezclan con las de otro y no detienen el ciclo de eventos).
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_READ_AHEAD = 4
+
+READ_CHUNK = 1024 * 1024
+
+_DONE = object()
+
+
+def read_ahead(path: Path) -> int:
+    """Lee el archivo completo (queda en el caché del sistema). Regresa los bytes leídos."""
+    total = 0
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                total += len(chunk)
+    except OSError:
+        pass  # el extractor reportará el error al abrirlo
+    return total
+
+
+async def _produce(groups: Iterable[Tuple[Hashable, Iterator]], tasks: asyncio.Queue,
+                   results: asyncio.Queue, consumers: int):
+    for key, jobs in groups:
+        count = 0
+        for job in jobs:
+            await tasks.put((key, count, job))
+            count += 1
+        # El escritor cierra el grupo cuando recibe `count` resultados
+        await results.put(("planned", key, count))
+    for _ in range(consumers):
+        await tasks.put(_DONE)
+
+
+async def _consume(tasks: asyncio.Queue, results: asyncio.Queue, executor: Executor,
+                   io_pool: ThreadPoolExecutor, reads: asyncio.Semaphore,
+                   path_of: Callable, cached: Callable, extract: Callable, collect: Callable,
+                   key_of: Optional[Callable], copy: Optional[Callable], shared: Dict[Hashable, asyncio.Future]):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await tasks.get()
+        if item is _DONE:
+            return
+        key, seq, job = item
+        result = await loop.run_in_executor(io_pool, cached, job)
+        content = key_of(job) if key_of is not None and result is None else None
+        if content is not None and content in shared:
+            source_job, source_result = await shared[content]
+            result = copy(job, source_job, source_result)
+        elif result is None:
+            if content is not None:
+                shared[content] = loop.create_future()
+            async with reads:
+                await loop.run_in_executor(io_pool, read_ahead, path_of(job))
+            output = await loop.run_in_executor(executor, extract, job)
+            result = collect(job, output)
+            if content is not None:
+                shared[content].set_result((job, result))
+        await results.put(("result", key, (seq, job, result)))
+
+
+async def _write(results: asyncio.Queue, write: Callable, writer_pool: ThreadPoolExecutor) -> int:
+    loop = asyncio.get_running_loop()
+    planned: Dict[Hashable, int] = {}
+    received: Dict[Hashable, List] = {}
+    written = 0
+    while True:
+        item = await results.get()
+        if item is _DONE:
+            return written
+        kind, key, value = item
+        if kind == "planned":
+            planned[key] = value
+        else:
+            received.setdefault(key, []).append(value)
+        done = received.get(key, [])
+        if planned.get(key) == len(done):
+            done.sort(key=lambda entry: entry[0])
+            await loop.run_in_executor(writer_pool, write, key,
+                                       [job for _, job, _ in done], [result for _, _, result in done])
+            planned.pop(key)
+            received.pop(key, None)
+            written += 1
+
+
+async def run_pipeline(groups: Iterable[Tuple[Hashable, Iterator]], executor: Executor, *,
+                       path_of: Callable[[Any], Path],
+                       cached: Callable[[Any], Optional[Any]],
+                       extract: Callable[[Any], Any],
+                       collect: Callable[[Any, Any], Any],
+                       write: Callable[[Hashable, List, List], None],
+                       key: Optional[Callable[[Any], Hashable]] = None,
+                       copy: Optional[Callable[[Any, Any, Any], Any]] = None,
+                       workers: int = 1,
+                       queue_size: int = DEFAULT_QUEUE_SIZE,
+                       read_ahead_limit: int = DEFAULT_READ_AHEAD) -> int:
+    """
+    Corre el pipeline y regresa cuántos grupos se escribieron.
+
+    groups      (llave, tareas) por grupo, en orden; las tareas pueden ser un generador
+    path_of     ruta del PDF de una tarea (para la lectura anticipada)
+    cached      resultado guardado de una tarea, o None (corre en un hilo de E/S)
+    extract     función de nivel módulo que corre en `executor`
+    collect     (tarea, salida de extract) -> resultado (corre en el ciclo de eventos:
+                no debe leer el PDF)
+    write       (llave, tareas, resultados) de un grupo completo, en orden (hilo del escritor)
+    key         llave de contenido de una tarea (opcional): se extrae una vez por llave
+    copy        (tarea, tarea extraída, su resultado) -> resultado de la copia
+    """
+    tasks: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    results: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    # Un consumidor por worker más los que están leyendo, para que el pool no espere al disco
+    consumers = workers + read_ahead_limit
+    reads = asyncio.Semaphore(read_ahead_limit)
+    shared: Dict[Hashable, asyncio.Future] = {}
+
+    with ThreadPoolExecutor(max_workers=read_ahead_limit, thread_name_prefix="read-ahead") as io_pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer") as writer_pool:
+        writer = asyncio.ensure_future(_write(results, write, writer_pool))
+        stages = [asyncio.ensure_future(_produce(groups, tasks, results, consumers))]
+        stages += [
+            asyncio.ensure_future(_consume(tasks, results, executor, io_pool, reads,
+                                           path_of, cached, extract, collect, key, copy, shared))
+            for _ in range(consumers)
+        ]
+        try:
+            await asyncio.gather(*stages)
+            await results.put(_DONE)
+            return await writer
+        except BaseException:
+            for task in stages + [writer]:
+                task.cancel()
+            raise
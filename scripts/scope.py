@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Alcance de una corrida de extracción: qué clientes, periodos y estados procesar.
+
+    --client mrm --client vilego   # id del JSON o nombre de la carpeta
+    --year 2025 --month 03         # se pueden repetir
+    --since 2025-01                # periodos desde ese mes (inclusive)
+    --statement er                 # er = estado de resultados, bg = balance general
+
+Sin filtros el alcance es todo el árbol. Los filtros se combinan (cliente Y año
+Y mes Y periodo Y estado), así que corregir un mes cuesta extraer solo ese mes:
+
+    python3 extract_all_clients.py --client mrm --year 2025 --month 03
+"""
+
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+# Tipo de tarea de extracción -> tipo de PDF en el índice del árbol (corpus_index.py)
+STATEMENTS = {"er": "estado_resultados", "bg": "balance_general"}
+
+_PERIOD_RE = re.compile(r"^(\d{4})-(\d{1,2})(?:-\d{1,2})?$")
+
+
+def _month(value: str) -> str:
+    return f"{int(value):02d}"
+
+
+def _period(value: str) -> str:
+    """'2025-3', '2025-03' o '2025-03-15' -> '2025-03'"""
+    match = _PERIOD_RE.match(value.strip())
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Periodo inválido: {value!r} (se espera AAAA-MM)")
+    return f"{match.group(1)}-{_month(match.group(2))}"
+
+
+@dataclass(frozen=True)
+class Scope:
+    clients: FrozenSet[str] = frozenset()
+    years: FrozenSet[str] = frozenset()
+    months: FrozenSet[str] = frozenset()
+    statements: FrozenSet[str] = frozenset()
+    since: Optional[str] = None
+
+    @property
+    def is_full(self) -> bool:
+        """True si no hay ningún filtro (se procesa todo el árbol)."""
+        return not (self.clients or self.years or self.months or self.statements or self.since)
+
+    def client(self, folder: str, client_id: str) -> bool:
+        return not self.clients or folder.lower() in self.clients or client_id.lower() in self.clients
+
+    def period(self, year: str, month: str) -> bool:
+        if self.years and year not in self.years:
+            return False
+        if self.months and _month(month) not in self.months:
+            return False
+        return self.since is None or f"{year}-{_month(month)}" >= self.since
+
+    def statement(self, kind: str) -> bool:
+        """kind: 'er' o 'bg'"""
+        return not self.statements or kind in self.statements
+
+    def describe(self) -> str:
+        if self.is_full:
+            return "todo el árbol"
+        parts = []
+        if self.clients:
+            parts.append("clientes " + ", ".join(sorted(self.clients)))
+        if self.years:
+            parts.append("años " + ", ".join(sorted(self.years)))
+        if self.months:
+            parts.append("meses " + ", ".join(sorted(self.months)))
+        if self.since:
+            parts.append(f"desde {self.since}")
+        if self.statements:
+            parts.append("estados " + ", ".join(sorted(self.statements)))
+        return "; ".join(parts)
+
+
+def add_scope_arguments(parser):
+    """Agrega --client, --year, --month, --since y --statement a un argparse.ArgumentParser."""
+    parser.add_argument("--client", action="append", default=[], metavar="CLIENTE",
+                        help="Solo este cliente: id del JSON o carpeta (se puede repetir)")
+    parser.add_argument("--year", action="append", default=[], metavar="AAAA",
+                        help="Solo este año (se puede repetir)")
+    parser.add_argument("--month", action="append", default=[], metavar="MM",
+                        help="Solo este mes, 1-12 (se puede repetir)")
+    parser.add_argument("--since", metavar="AAAA-MM",
+                        help="Solo periodos a partir de este mes (inclusive)")
+    parser.add_argument("--statement", action="append", default=[], choices=sorted(STATEMENTS),
+                        help="Solo este estado: er = estado de resultados, bg = balance general")
+
+
+def scope_from_args(args) -> Scope:
+    try:
+        months = frozenset(_month(m) for m in args.month)
+        since = _period(args.since) if args.since else None
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    if any(not 1 <= int(m) <= 12 for m in months):
+        raise SystemExit(f"❌ Mes inválido en --month: {', '.join(args.month)}")
+    return Scope(
+        clients=frozenset(c.lower() for c in args.client),
+        years=frozenset(args.year),
+        months=months,
+        statements=frozenset(args.statement),
+        since=since,
+    )
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Escáner de campos de estados financieros en una sola pasada.
+
+Los extractores definen sus campos como {campo: [regex en orden de prioridad]}.
+Antes se hacía un `re.search` por cada patrón de cada campo (~25 recorridos del
+texto por PDF, casi todos completos porque la mayoría de las variantes no
+aparecen). `FieldScanner` extrae de cada variante su etiqueta literal inicial
+("Total INGRESOS", "Gastos", "BANCOS"...) y arma un índice de palabras clave: las
+posiciones de cada etiqueta se buscan una sola vez en el texto (con `str.find`,
+compartido entre todas las variantes y campos que usan la misma etiqueta) y cada
+patrón solo se prueba anclado en esas posiciones.
+
+El resultado es idéntico a buscar cada patrón por separado: para cada campo, la
+primera coincidencia del patrón de mayor prioridad que aparezca en el texto. Las
+variantes que no empiezan con una etiqueta literal (o que tienen una alternación
+`|` fuera de grupos), y los patrones sensibles a mayúsculas (donde `re` ya busca
+el prefijo literal en C), usan `re.search` compilado una sola vez; si ningún
+patrón tiene etiqueta, como en las tablas de extract_all_clients, el escaneo es
+solo ese ciclo, sin el índice.
+
+Nota: una sola regex alternada con grupos nombrados es *más lenta* que los
+re.search separados en el motor `re` de Python (prueba todas las ramas en cada
+posición), por eso el índice es de etiquetas y no una alternación.
+
+Micro-benchmark contra el ciclo de re.search:
+
+    python statement_scanner.py --bench
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Caracteres que terminan la etiqueta literal inicial de un patrón
+_REGEX_META = set("\\.^$*+?{}[]()|")
+_QUANTIFIERS = set("*?{")
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """True si el patrón tiene un `|` fuera de grupos y clases ("A\\s+x|B")."""
+    depth = 0
+    in_class = escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Regresa la etiqueta literal con la que empieza toda coincidencia del patrón.
+    "Ingresos?\\s+..." -> "Ingreso" ; "(?:A|B)..." -> "" ; "A\\s+x|B..." -> ""
+    (sin etiqueta)
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    prefix = []
+    for char in pattern:
+        if char in _REGEX_META:
+            # Un cuantificador vuelve opcional al carácter anterior
+            if char in _QUANTIFIERS and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    return "".join(prefix).rstrip()
+
+
+class FieldScanner:
+    """Compila los patrones de varios campos con un índice de etiquetas."""
+
+    def __init__(self, patterns: Dict[str, List[str]], flags: int = 0):
+        self.patterns = patterns
+        self.flags = flags
+        self.ignorecase = bool(flags & re.IGNORECASE)
+        # campo -> [(prioridad, patrón compilado, etiqueta o None)]
+        self.fields: Dict[str, List[Tuple[int, re.Pattern, Optional[str]]]] = {}
+        # False si ningún patrón tiene etiqueta: entonces feed() es el ciclo de re.search
+        self.indexed = False
+        for field, pattern_list in patterns.items():
+            alternatives = []
+            for priority, pattern in enumerate(pattern_list):
+                # Sin IGNORECASE `re` ya busca el prefijo literal a velocidad de C;
+                # el índice solo ayuda con patrones que ignoran mayúsculas
+                keyword = literal_prefix(pattern).lower() if self.ignorecase else ""
+                # Solo etiquetas ASCII: así str.lower() coincide con IGNORECASE de `re`
+                if len(keyword) < 2 or not keyword.isascii():
+                    keyword = None
+                alternatives.append((priority, re.compile(pattern, flags), keyword))
+                self.indexed = self.indexed or keyword is not None
+            self.fields[field] = alternatives
+        # Estado inicial de cada escaneo (se copia en ScanState en lugar de armarlo)
+        self._initial_best = {field: (len(alternatives), None) for field, alternatives in self.fields.items()}
+        self._initial_pending = [field for field, alternatives in self.fields.items() if alternatives]
+
+    def start(self) -> "ScanState":
+        """Inicia un escaneo incremental (p. ej. una página a la vez)."""
+        return ScanState(self)
+
+    def scan(self, text: str) -> Dict[str, re.Match]:
+        """Escanea un texto completo y regresa {campo: coincidencia}."""
+        if not self.indexed:
+            return self._search(text)
+        state = self.start()
+        state.feed(text)
+        return state.matches()
+
+    def _search(self, text: str) -> Dict[str, re.Match]:
+        """Un re.search compilado por patrón, en orden de prioridad (sin índice)."""
+        found = {}
+        for field, alternatives in self.fields.items():
+            for _, pattern, _ in alternatives:
+                match = pattern.search(text)
+                if match:
+                    found[field] = match
+                    break
+        return found
+
+
+class ScanState:
+    """Estado de un escaneo: mejor coincidencia encontrada por campo."""
+
+    def __init__(self, scanner: FieldScanner):
+        self.scanner = scanner
+        self._best: Dict[str, Tuple[int, Optional[re.Match]]] = dict(scanner._initial_best)
+        self._pending = list(scanner._initial_pending)
+
+    @property
+    def done(self) -> bool:
+        """True cuando todos los campos tienen su patrón de mayor prioridad."""
+        return not self._pending
+
+    def feed(self, text: str):
+        """Escanea un fragmento de texto (las coincidencias no cruzan fragmentos)."""
+        if not self.scanner.indexed:
+            self._feed_search(text)
+            return
+        haystack = text.lower()
+        if len(haystack) != len(text):
+            haystack = None  # lower() cambió longitudes: usar re.search directo
+        positions: Dict[str, List[int]] = {}
+
+        still_pending = []
+        for field in self._pending:
+            best_priority = self._best[field][0]
+            for priority, pattern, keyword in self.scanner.fields[field][:best_priority]:
+                if keyword is None or haystack is None:
+                    match = pattern.search(text)
+                else:
+                    match = None
+                    for start in self._keyword_positions(haystack, keyword, positions):
+                        match = pattern.match(text, start)
+                        if match:
+                            break
+                if match:
+                    self._best[field] = (priority, match)
+                    break
+            if self._best[field][0] != 0:
+                still_pending.append(field)
+        self._pending = still_pending
+
+    def _feed_search(self, text: str):
+        """Sin etiquetas (patrones sensibles a mayúsculas): un re.search compilado por patrón."""
+        still_pending = []
+        for field in self._pending:
+            best_priority = self._best[field][0]
+            for priority, pattern, _ in self.scanner.fields[field][:best_priority]:
+                match = pattern.search(text)
+                if match:
+                    self._best[field] = (priority, match)
+                    break
+            if self._best[field][0] != 0:
+                still_pending.append(field)
+        self._pending = still_pending
+
+    @staticmethod
+    def _keyword_positions(haystack: str, keyword: str, positions: Dict[str, List[int]]) -> List[int]:
+        """Posiciones de la etiqueta en el texto (se calculan una vez por fragmento)."""
+        found = positions.get(keyword)
+        if found is None:
+            found = []
+            start = haystack.find(keyword)
+            while start != -1:
+                found.append(start)
+                start = haystack.find(keyword, start + 1)
+            positions[keyword] = found
+        return found
+
+    def matches(self) -> Dict[str, re.Match]:
+        return {field: match for field, (_, match) in self._best.items() if match is not None}
+
+
+def _search_loop(patterns: Dict[str, List[str]], text: str, flags: int) -> Dict[str, re.Match]:
+    """Implementación anterior: un re.search por patrón (solo para el benchmark)."""
+    found = {}
+    for key, pattern_list in patterns.items():
+        for pattern in pattern_list:
+            match = re.search(pattern, text, flags)
+            if match:
+                found[key] = match
+                break
+    return found
+
+
+def _bench():
+    import timeit
+
+    from extract_all_clients import BG_PATTERNS as ALL_BG, ER_PATTERNS as ALL_ER
+    import extract_financial_data as efd
+    from pdf_text import read_pdf_text
+
+    # Texto real de un estado de resultados y un balance del árbol de PDFs
+    pdf_dir = efd.PDF_BASE_DIR / "MRM" / "2024"
+    er_text = read_pdf_text(pdf_dir / "Estado de Resultados 01 Ene 2024.pdf")
+    bg_text = read_pdf_text(pdf_dir / "Posicion financiera balance general 01 Ene 2024.pdf")
+
+    cases = [
+        ("extract_financial_data ER", efd.ER_PATTERNS, er_text, re.IGNORECASE),
+        ("extract_financial_data BG", efd.BG_PATTERNS, bg_text, re.IGNORECASE),
+        ("extract_all_clients ER", ALL_ER, er_text, 0),
+        ("extract_all_clients BG", ALL_BG, bg_text, 0),
+    ]
+    number = 2000
+    print(f"{'caso':<28} {'re.search':>12} {'FieldScanner':>14} {'mejora':>8}")
+    for name, patterns, text, flags in cases:
+        scanner = FieldScanner(patterns, flags)
+        expected = {k: m.group(0) for k, m in _search_loop(patterns, text, flags).items()}
+        got = {k: m.group(0) for k, m in scanner.scan(text).items()}
+        assert expected == got, (name, expected, got)
+
+        loop_t = timeit.timeit(lambda: _search_loop(patterns, text, flags), number=number)
+        scan_t = timeit.timeit(lambda: scanner.scan(text), number=number)
+        print(f"{name:<28} {loop_t / number * 1e6:>10.1f}µs {scan_t / number * 1e6:>12.1f}µs "
+              f"{loop_t / scan_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        _bench()
+    else:
+        print(__doc__)
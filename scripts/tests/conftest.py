@@ -0,0 +1,28 @@
+"""
+Configuración de pytest: los módulos de scripts/ se importan por nombre, como
+cuando se corren con `python3 <script>.py` desde esa carpeta.
+
+    cd scripts && python3 -m pytest -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from corpus_index import PDF_BASE_DIR  # noqa: E402
+
+
+@pytest.fixture
+def corpus_pdf():
+    """Regresa la ruta de un PDF del árbol de ejemplo (o salta la prueba si no está)."""
+    def find(client: str, pattern: str) -> Path:
+        matches = sorted((PDF_BASE_DIR / client).rglob(pattern))
+        if not matches:
+            pytest.skip(f"No está el PDF de ejemplo {client}/{pattern}")
+        return matches[0]
+    return find
@@ -0,0 +1,58 @@
+from columnar import columnar_path, from_columnar, month_axis, to_columnar
+
+
+def _data():
+    return {
+        "clienteId": "prueba",
+        "clienteNombre": "Prueba",
+        "razonSocial": "Prueba S.A. de C.V.",
+        "years": {
+            "2024": {
+                "estadoResultadosPeriodo": [{"mes": "2024-11", "ingresos": 10.0, "compras": 4.0},
+                                            {"mes": "2024-12", "ingresos": 12.0, "compras": 0.0}],
+                "estadoResultadosYTD": [{"mes": "2024-12", "ingresos": 22.0}],
+                "balanceGeneral": [{"mes": "2024-11", "ac": 5.0, "pc": 2.0}],
+                "kpis": [],
+            },
+            "2025": {
+                # Falta 2025-01: el eje no tiene huecos y ese mes queda en null
+                "estadoResultadosPeriodo": [{"mes": "2025-02", "ingresos": 7.5, "compras": 1.0}],
+                "estadoResultadosYTD": [],
+                "balanceGeneral": [{"mes": "2025-02", "ac": 6.0, "pc": 3.0, "anc": 1.0}],
+                "kpis": [],
+            },
+        },
+    }
+
+
+def test_month_axis_cruza_el_anio():
+    assert month_axis("2024-11", "2025-02") == ["2024-11", "2024-12", "2025-01", "2025-02"]
+
+
+def test_to_columnar_alinea_los_meses():
+    columnar = to_columnar(_data())
+    assert columnar["inicio"] == "2024-11"
+    assert columnar["meses"] == ["2024-11", "2024-12", "2025-01", "2025-02"]
+    assert columnar["estadoResultadosPeriodo"]["ingresos"] == [10.0, 12.0, None, 7.5]
+    # Campo opcional: null en los meses que no lo traen
+    assert columnar["balanceGeneral"]["anc"] == [None, None, None, 1.0]
+
+
+def test_ida_y_vuelta():
+    data = _data()
+    restored = from_columnar(to_columnar(data))
+    assert restored["clienteId"] == data["clienteId"]
+    assert restored["razonSocial"] == data["razonSocial"]
+    for year, year_data in data["years"].items():
+        for list_key, items in year_data.items():
+            assert restored["years"][year][list_key] == items
+
+
+def test_sin_meses():
+    columnar = to_columnar({"clienteId": "vacio", "years": {}})
+    assert columnar["meses"] == [] and columnar["inicio"] is None
+    assert from_columnar(columnar)["years"] == {}
+
+
+def test_columnar_path(tmp_path):
+    assert columnar_path(tmp_path / "mrm.json") == tmp_path / "mrm.columnar.json"
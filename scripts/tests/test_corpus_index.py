@@ -0,0 +1,53 @@
+import pytest
+
+from corpus_index import classify_statement, month_from_filename, month_from_folder, month_from_word
+
+
+@pytest.mark.parametrize("name, kind", [
+    ("Estado de Resultados 01 Ene 2024.pdf", "estado_resultados"),
+    ("1.ESTADO DE RESULTADOS ENERO LUENSER 2024.pdf", "estado_resultados"),
+    ("Edo Resultados.pdf", "estado_resultados"),
+    ("Posicion financiera balance general 09 Sep 2024.pdf", "balance_general"),
+    ("balance general  ENERO SEDENTARIUS.pdf", "balance_general"),
+    ("Posición Financiera.pdf", "balance_general"),
+    ("Anexos del Catalogo 06 Jun 2024.pdf", "anexos"),
+    ("Catálogo de cuentas.pdf", "anexos"),
+    ("documento.pdf", None),
+])
+def test_classify_statement(name, kind):
+    assert classify_statement(name) == kind
+
+
+def test_classify_statement_nombres_canonicos_del_servicio():
+    # extraction_service guarda las subidas con estos nombres: el índice debe reconocerlos
+    from extraction_service import CANONICAL_NAMES
+    for kind, name in CANONICAL_NAMES.items():
+        assert classify_statement(f"{name} 03 2025.pdf") == kind
+
+
+@pytest.mark.parametrize("word, month", [
+    ("Ene", "01"), ("MARZO", "03"), ("sep", "09"), ("Setiembre", "09"), (" dic ", "12"), ("Foo", None),
+])
+def test_month_from_word(word, month):
+    assert month_from_word(word) == month
+
+
+@pytest.mark.parametrize("name, month", [
+    ("01", "01"), ("02.-Febrero", "02"), ("1.ENERO 2024", "01"), ("03 MARZO", "03"), ("ENERO", "01"),
+    ("13", None), ("Otros", None),
+])
+def test_month_from_folder(name, month):
+    assert month_from_folder(name) == month
+
+
+@pytest.mark.parametrize("name, month", [
+    ("Estado de Resultados 01 Ene 2024.pdf", "01"),
+    ("12 2024 balance general.pdf", "12"),
+    ("042025 Anexos del Catalogo.pdf", "04"),
+    ("1.ANEXOS DEL CATALOGO ENERO LUENSER 2024.pdf", "01"),
+    ("balance general MAYO SEDENTARIUS.pdf", "05"),
+    ("Estado de Resultados.pdf", None),
+])
+def test_month_from_filename(name, month):
+    year = "2025" if "2025" in name else "2024"
+    assert month_from_filename(name, year) == month
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+import extract_all_clients as eac
+from extract_financial_data import extract_cached
+from extraction_cache import ExtractionCache, file_sha256
+from layout_family import FAMILY_CONTPAQ
+from pdf_text import ScanStats
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "estado.pdf"
+    path.write_bytes(b"%PDF-1.4 uno %%EOF")
+    return path
+
+
+def _touch(path, content):
+    """Cambia el contenido y el mtime (algunos sistemas de archivos tienen mtime de baja resolución)."""
+    st = os.stat(path)
+    path.write_bytes(content)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_guarda_y_recupera(tmp_path, pdf):
+    cache = ExtractionCache(tmp_path / "cache.json")
+    assert cache.get("ns", "1", pdf) is None
+    cache.put("ns", "1", pdf, {"ingresos": 1.0})
+    cache.save()
+
+    reloaded = ExtractionCache(tmp_path / "cache.json")
+    assert reloaded.get("ns", "1", pdf) == {"ingresos": 1.0}
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+
+def test_se_invalida_si_cambia_el_contenido(tmp_path, pdf):
+    cache = ExtractionCache(tmp_path / "cache.json")
+    cache.put("ns", "1", pdf, {"ingresos": 1.0})
+    _touch(pdf, b"%PDF-1.4 dos %%EOF")
+    assert cache.get("ns", "1", pdf) is None
+
+
+def test_se_invalida_si_cambia_la_version(tmp_path, pdf):
+    cache = ExtractionCache(tmp_path / "cache.json")
+    cache.put("ns", "1", pdf, {"ingresos": 1.0})
+    assert cache.get("ns", "2", pdf) is None
+    assert cache.get("otro", "1", pdf) is None
+
+
+def test_sha_conocido_no_relee_el_archivo(tmp_path, pdf, monkeypatch):
+    sha = file_sha256(pdf)
+    cache = ExtractionCache(tmp_path / "cache.json")
+    monkeypatch.setattr("extraction_cache.file_sha256", lambda path: pytest.fail("se releyó el PDF"))
+    cache.put("ns", "1", pdf, {"ingresos": 1.0}, sha=sha)
+    assert cache.get("ns", "1", pdf, sha=sha) == {"ingresos": 1.0}
+    # Sin sha tampoco: tamaño y mtime coinciden con lo guardado
+    assert cache.get("ns", "1", pdf) == {"ingresos": 1.0}
+
+
+def test_rebuild_ignora_pero_conserva_los_demas(tmp_path, pdf):
+    otro = tmp_path / "otro.pdf"
+    otro.write_bytes(b"%PDF-1.4 otro %%EOF")
+    cache = ExtractionCache(tmp_path / "cache.json")
+    cache.put("ns", "1", pdf, {"ingresos": 1.0})
+    cache.put("ns", "1", otro, {"ingresos": 2.0})
+    cache.save()
+
+    rebuild = ExtractionCache(tmp_path / "cache.json", rebuild=True)
+    assert rebuild.get("ns", "1", pdf) is None
+    rebuild.put("ns", "1", pdf, {"ingresos": 3.0})
+    rebuild.save()
+
+    reloaded = ExtractionCache(tmp_path / "cache.json")
+    assert reloaded.get("ns", "1", pdf) == {"ingresos": 3.0}
+    assert reloaded.get("ns", "1", otro) == {"ingresos": 2.0}
+
+
+def test_deshabilitado_no_escribe(tmp_path, pdf):
+    cache = ExtractionCache(tmp_path / "cache.json", enabled=False)
+    cache.put("ns", "1", pdf, {"ingresos": 1.0})
+    cache.save()
+    assert cache.get("ns", "1", pdf) is None
+    assert not (tmp_path / "cache.json").exists()
+
+
+def test_cached_no_guarda_una_excepcion(tmp_path, pdf):
+    cache = ExtractionCache(tmp_path / "cache.json")
+
+    def falla(path):
+        raise OSError("PDF ilegible")
+
+    with pytest.raises(OSError):
+        cache.cached("ns", "1", pdf, falla)
+    assert cache.empty
+    assert cache.cached("ns", "1", pdf, lambda path: {"ingresos": 1.0}) == {"ingresos": 1.0}
+    assert not cache.empty
+
+
+def test_extract_cached_no_guarda_los_ceros_de_un_error(tmp_path, pdf):
+    cache = ExtractionCache(tmp_path / "cache.json")
+    stats = ScanStats()
+
+    def ilegible(path, file_stats):
+        file_stats.errors += 1
+        return {"ingresos": 0.0}
+
+    assert extract_cached(cache, "ns", pdf, ilegible, stats) == {"ingresos": 0.0}
+    assert stats.errors == 1
+    assert cache.empty
+    assert extract_cached(cache, "ns", pdf, lambda path, file_stats: {"ingresos": 1.0}) == {"ingresos": 1.0}
+    assert extract_cached(cache, "ns", pdf, ilegible) == {"ingresos": 1.0}
+
+
+def test_collect_no_guarda_los_ceros_de_un_error(tmp_path, pdf, monkeypatch):
+    monkeypatch.setitem(eac._families, "Prueba", FAMILY_CONTPAQ)
+    job = ("2024", "bg", pdf, "2024-01", "Prueba")
+    cache = ExtractionCache(tmp_path / "cache.json")
+
+    failed = ScanStats(errors=1)
+    assert eac._collect(job, ({"bancos": 0.0}, failed, {}, []), cache) == {"bancos": 0.0}
+    assert eac._cached_result(job, cache) is None
+
+    eac._collect(job, ({"bancos": 5.0}, ScanStats(), {}, []), cache)
+    assert eac._cached_result(job, cache) == {"bancos": 5.0, "mes": "2024-01"}
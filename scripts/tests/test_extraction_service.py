@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import extraction_service
+from corpus_index import load_corpus_index
+from extraction_service import ExtractionService, ServiceError, company_matches, normalize_company, parse_period
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Servicio sobre un árbol de PDFs vacío; la extracción solo anota los meses pedidos."""
+    pdf_root = tmp_path / "pdfs"
+    (pdf_root / "Vilego").mkdir(parents=True)
+    (pdf_root / "MRM").mkdir()
+    monkeypatch.setattr(extraction_service, "UPLOAD_DIR", tmp_path / "uploads")
+    # Sin guardar el índice en .cache/ (es el del árbol real)
+    monkeypatch.setattr(extraction_service, "load_corpus_index", lambda root: load_corpus_index(root, None))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        svc = ExtractionService(executor, 1, cache=None, warehouse=None, templates=None,
+                                pdf_root=pdf_root, output_dir=tmp_path / "clients")
+        svc.extracted = []
+
+        def extract(folder, months, statement=None, rebuild=False):
+            svc.extracted.append((folder, list(months)))
+            return [{"mes": f"{year}-{month}"} for year, month in months], extraction_service.ScanStats()
+        svc.extract = extract
+        yield svc
+
+
+@pytest.fixture
+def balance_vilego(corpus_pdf):
+    return corpus_pdf("Vilego", "Posicion financiera balance general.pdf").read_bytes()
+
+
+@pytest.fixture
+def resultados_mrm(corpus_pdf):
+    return corpus_pdf("MRM", "Estado de Resultados 01 Ene 2024.pdf").read_bytes()
+
+
+def test_parse_period():
+    assert parse_period("2025", "3") == ("2025", "03")
+    assert parse_period(None, "") == (None, None)
+    for year, month in [("25", None), ("2025", "13"), ("2025", "../01"), ("2025/..", None)]:
+        with pytest.raises(ServiceError):
+            parse_period(year, month)
+
+
+def test_company_matches():
+    assert normalize_company("MRM Ingeniería Integral S. de R.L. MI") == "MRM INGENIERIA INTEGRAL S DE RL MI"
+    assert company_matches("MRM", "MRM INGENIERIA INTEGRAL S DE RL MI")
+    assert company_matches("SINMSA", "SUMINISTROS DE INSUMOS NACIONALES DE MEXICO SA DE CV")
+    assert not company_matches("SINMSA", "MRM INGENIERIA INTEGRAL S DE RL MI")
+
+
+def test_upload_con_nombre_generico_queda_indexado(service, balance_vilego):
+    response = service.upload({"clientId": "vilego", "year": "2030", "month": "1"},
+                              [("documento.pdf", balance_vilego)])
+    assert response["files"] == [{"archivo": "documento.pdf", "tipo": "balance_general", "mes": "2030-01",
+                                  "ruta": "Vilego/2030/01/Balance General 01 2030.pdf", "reemplazo": False}]
+    assert service.index.get("Vilego", "2030", "01", "balance_general") == \
+        service.pdf_root / "Vilego" / "2030" / "01" / "Balance General 01 2030.pdf"
+    assert service.extracted == [("Vilego", [("2030", "01")])]
+    assert not list(extraction_service.UPLOAD_DIR.iterdir())
+
+
+def test_upload_periodo_del_encabezado_y_reemplazo(service, balance_vilego):
+    first = service.upload({"clientId": "vilego"}, [("documento.pdf", balance_vilego)])
+    mes = first["files"][0]["mes"]
+    second = service.upload({"clientId": "vilego"}, [("otro nombre.pdf", balance_vilego)])
+    assert second["files"][0]["mes"] == mes
+    assert second["files"][0]["ruta"] == first["files"][0]["ruta"]
+    assert second["files"][0]["reemplazo"] is True
+    assert len(list((service.pdf_root / "Vilego").rglob("*.pdf"))) == 1
+
+
+def test_upload_de_otro_cliente_se_rechaza(service, resultados_mrm):
+    with pytest.raises(ServiceError) as error:
+        service.upload({"clientId": "sinmsa", "year": "2030", "month": "01"}, [("otro.pdf", resultados_mrm)])
+    assert error.value.status == 422
+    assert "MRM INGENIERIA INTEGRAL" in str(error.value)
+    assert not list(service.pdf_root.rglob("*.pdf"))
+    assert service.extracted == []
+
+
+def test_upload_no_indexado_se_borra(service, balance_vilego, monkeypatch):
+    # Si el índice no lo ve (p. ej. otro PDF ocupa su lugar) el subido quedaría huérfano
+    def index_without_slots(root):
+        index = load_corpus_index(root, None)
+        index.get = lambda *slot: None
+        return index
+    monkeypatch.setattr(extraction_service, "load_corpus_index", index_without_slots)
+    with pytest.raises(ServiceError) as error:
+        service.upload({"clientId": "vilego", "year": "2030", "month": "01"}, [("documento.pdf", balance_vilego)])
+    assert "no quedó en el índice" in str(error.value)
+    assert not list(service.pdf_root.rglob("*.pdf"))
+    assert service.extracted == []
+
+
+def test_upload_rechaza_lo_que_no_es_pdf(service):
+    with pytest.raises(ServiceError) as error:
+        service.upload({"clientId": "vilego"}, [("notas.txt", b"hola")])
+    assert error.value.status == 422
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from json_store import ClientJsonBatch
+
+
+def _client(tmp_path, meses):
+    data = {
+        "clienteId": "prueba",
+        "years": {"2024": {
+            "estadoResultadosPeriodo": [{"mes": mes, "ingresos": 1.0} for mes in meses],
+            "estadoResultadosYTD": [],
+            "balanceGeneral": [],
+        }},
+    }
+    path = tmp_path / "prueba.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return ClientJsonBatch(path)
+
+
+def _meses(batch, year="2024", list_key="estadoResultadosPeriodo"):
+    return [item["mes"] for item in batch.data["years"][year][list_key]]
+
+
+def test_upsert_reemplaza_el_mes_existente(tmp_path):
+    batch = _client(tmp_path, ["2024-01", "2024-02"])
+    batch.upsert("2024", "estadoResultadosPeriodo", {"mes": "2024-02", "ingresos": 5.0})
+    assert _meses(batch) == ["2024-01", "2024-02"]
+    assert batch.data["years"]["2024"]["estadoResultadosPeriodo"][1]["ingresos"] == 5.0
+
+
+def test_upsert_agrega_al_final(tmp_path):
+    batch = _client(tmp_path, ["2024-01", "2024-02"])
+    batch.upsert("2024", "estadoResultadosPeriodo", {"mes": "2024-03", "ingresos": 3.0})
+    assert _meses(batch) == ["2024-01", "2024-02", "2024-03"]
+
+
+def test_upsert_inserta_un_mes_atrasado_en_orden(tmp_path):
+    batch = _client(tmp_path, ["2024-01", "2024-03", "2024-04"])
+    batch.upsert("2024", "estadoResultadosPeriodo", {"mes": "2024-02", "ingresos": 2.0})
+    assert _meses(batch) == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    # El índice se rearma: reemplazar un mes después de la inserción cae en su lugar
+    batch.upsert("2024", "estadoResultadosPeriodo", {"mes": "2024-03", "ingresos": 9.0})
+    assert _meses(batch) == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    assert batch.data["years"]["2024"]["estadoResultadosPeriodo"][2]["ingresos"] == 9.0
+
+
+def test_update_lists_crea_el_anio_en_orden(tmp_path):
+    batch = _client(tmp_path, ["2024-01"])
+    batch.update_lists("2023", "12", {"balanceGeneral": {"bancos": 1.0}})
+    assert list(batch.data["years"]) == ["2023", "2024"]
+    assert _meses(batch, "2023", "balanceGeneral") == ["2023-12"]
+
+
+@pytest.mark.parametrize("nuevos", [["2024-05", "2024-02", "2024-03"], ["2024-03", "2024-02", "2024-05"]])
+def test_upsert_en_cualquier_orden_deja_la_lista_ordenada(tmp_path, nuevos):
+    batch = _client(tmp_path, ["2024-01", "2024-04"])
+    for mes in nuevos:
+        batch.upsert("2024", "estadoResultadosPeriodo", {"mes": mes})
+    assert _meses(batch) == sorted(_meses(batch))
+    assert len(_meses(batch)) == 5
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Almacén de texto extraído de los PDFs, por contenido.
+
+Casi todo el tiempo de una corrida se va en interpretar los PDFs, no en las
+regex. Aquí se guarda lo que sacan los backends de pdf_text, página por página,
+con la llave (sha256 del PDF, tipo). Un PDF entra al almacén cuando un escaneo
+llega a su última página; los escaneos que salen antes no lo guardan:
+
+    runs         fragmentos de texto con su posición (pdfminer): de ahí salen el
+                 texto del backend pdfminer y las plantillas de layout
+    pdfplumber   texto de page.extract_text()
+
+    .cache/text/3f/3f9a...c2.runs.json.gz
+
+Los extractores leen de aquí cuando el PDF no cambió (mismo contenido), así que
+después de cambiar un patrón basta con `--no-cache` (o subir EXTRACTOR_VERSION)
+para volver a extraer todo sin abrir los PDFs que ya están guardados. Cada entrada se escribe de forma
+atómica y no depende de ninguna otra, así que los workers del pool escriben en el
+almacén sin coordinarse.
+
+    python3 text_store.py replay                  # patrones actuales vs JSON publicados
+    python3 text_store.py replay --client mrm --show 20
+    python3 text_store.py show "ruta/al/estado.pdf"
+    python3 text_store.py stats
+
+Si cambia la forma en que un backend arma el texto hay que subir TEXT_STORE_FORMAT.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from extraction_cache import file_sha256
+from warehouse import DEFAULT_OUTPUT_DIR
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_TEXT_STORE_DIR = BASE_DIR / ".cache" / "text"
+
+TEXT_STORE_FORMAT = 1
+
+
+class TextStore:
+    """Páginas extraídas por (contenido del PDF, tipo), comprimidas con gzip."""
+
+    def __init__(self, root: Path = DEFAULT_TEXT_STORE_DIR):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+        # ruta -> (tamaño, mtime, sha256), para no volver a leer el PDF en la misma corrida
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+
+    def content_hash(self, pdf_path: Path) -> str:
+        key = str(pdf_path)
+        st = os.stat(key)
+        entry = self._hashes.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        sha = file_sha256(Path(key))
+        self._hashes[key] = (st.st_size, st.st_mtime_ns, sha)
+        return sha
+
+    def _path(self, sha: str, kind: str) -> Path:
+        return self.root / sha[:2] / f"{sha}.{kind}.json.gz"
+
+    def get(self, pdf_path: Path, kind: str) -> Optional[List[Any]]:
+        """Páginas guardadas del PDF, o None si no están (o son de otro formato)."""
+        path = self._path(self.content_hash(pdf_path), kind)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = None
+        except (OSError, ValueError, EOFError):
+            data = None  # entrada dañada: se vuelve a extraer y se reemplaza
+        if not data or data.get("format") != TEXT_STORE_FORMAT:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data["pages"]
+
+    def put(self, pdf_path: Path, kind: str, pages: List[Any]):
+        path = self._path(self.content_hash(pdf_path), kind)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp.")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                f.write(json.dumps({"format": TEXT_STORE_FORMAT, "kind": kind, "pages": pages},
+                                   ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def take_counts(self) -> Tuple[int, int]:
+        """(aciertos, fallos) desde la última llamada."""
+        counts = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return counts
+
+    def disk_usage(self) -> Dict[str, Tuple[int, int]]:
+        """{tipo: (entradas, bytes)} de todo el almacén."""
+        usage: Dict[str, Tuple[int, int]] = {}
+        for path in self.root.glob("*/*.json.gz"):
+            kind = path.name.split(".")[1]
+            entries, size = usage.get(kind, (0, 0))
+            usage[kind] = (entries + 1, size + path.stat().st_size)
+        return usage
+
+
+def _published_items(client_id: str) -> Dict[Tuple[str, str], Dict]:
+    """(mes, tipo) -> renglón publicado en public/data/clients/<id>.json"""
+    path = DEFAULT_OUTPUT_DIR / f"{client_id}.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    items = {}
+    for year_data in data.get("years", {}).values():
+        for item in year_data.get("estadoResultadosPeriodo", []):
+            items[(item["mes"], "er")] = item
+        for item in year_data.get("balanceGeneral", []):
+            items[(item["mes"], "bg")] = item
+    return items
+
+
+def replay(clients: Optional[List[str]] = None, show: int = 10, templates: bool = True) -> int:
+    """
+    Corre los patrones actuales de extract_all_clients sobre todo el árbol leyendo
+    el texto del almacén (los PDFs que falten se leen y se guardan si se leyeron completos) y
+    compara contra los JSON publicados. No escribe nada. Regresa cuántos valores
+    cambiaron.
+    """
+    # Importados aquí: pdf_text (y por él los extractores) importa este módulo
+    import extract_all_clients as eac
+    from corpus_index import PDF_BASE_DIR, load_corpus_index
+    from layout_family import LayoutFamilies
+    from pdf_text import ScanStats, configure_text_store
+
+    configure_text_store(DEFAULT_TEXT_STORE_DIR)
+    index = load_corpus_index(PDF_BASE_DIR)
+    eac.init_worker(templates, families=LayoutFamilies().resolve(index, eac.CLIENT_MAPPING))
+    stats = ScanStats()
+    changes: List[Tuple[str, str, str, str, Any, Any]] = []
+    coverage: Dict[str, Dict[str, int]] = {"er": {}, "bg": {}}
+    pdfs = 0
+    start = time.perf_counter()
+    for folder, info in eac.CLIENT_MAPPING.items():
+        if clients and folder.lower() not in clients and info["id"].lower() not in clients:
+            continue
+        published = _published_items(info["id"])
+        for year_name in index.years(folder):
+            for month_num in index.months(folder, year_name):
+                for job in eac.month_jobs(index, folder, year_name, month_num):
+                    result, job_stats, _, _ = eac.run_job(job)
+                    stats.merge(job_stats)
+                    pdfs += 1
+                    _, kind, _, month_str, _ = job
+                    item = result[0] if kind == "er" else result
+                    old = published.get((month_str, kind), {})
+                    for name, value in item.items():
+                        if name == "mes":
+                            continue
+                        if value:
+                            coverage[kind][name] = coverage[kind].get(name, 0) + 1
+                        if old and old.get(name) != value:
+                            changes.append((info["id"], month_str, kind, name, old.get(name), value))
+    seconds = time.perf_counter() - start
+
+    print(f"⚙️  {pdfs} PDFs en {seconds:.2f}s — {stats.summary()}")
+    for kind, label in (("er", "Estado de resultados"), ("bg", "Balance general")):
+        counts = coverage[kind]
+        if counts:
+            print(f"📄 {label}: " + ", ".join(f"{name} {n}" for name, n in sorted(counts.items())))
+    if not changes:
+        print("✅ Sin cambios contra los JSON publicados")
+        return 0
+    print(f"⚠️  {len(changes)} valores cambian contra los JSON publicados:")
+    for client_id, month_str, kind, name, old, new in changes[:show]:
+        print(f"  {client_id} {month_str} {kind} {name}: {old} → {new}")
+    if len(changes) > show:
+        print(f"  ... y {len(changes) - show} más")
+    return len(changes)
+
+
+def show_text(pdf_path: Path, backend: str = "pdfminer"):
+    """Imprime el texto de cada página (del almacén si ya está) para diseñar patrones."""
+    from pdf_text import TEXT_BACKENDS, configure_text_store
+
+    configure_text_store(DEFAULT_TEXT_STORE_DIR)
+    with TEXT_BACKENDS[backend](pdf_path) as (pages_total, texts):
+        for number, text in enumerate(texts, start=1):
+            print(f"\n=== {pdf_path.name} — página {number}/{pages_total} ({backend}) ===")
+            print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén de texto extraído de los PDFs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_parser = sub.add_parser("replay", help="Correr los patrones actuales sobre el texto guardado")
+    replay_parser.add_argument("--client", action="append", default=[], metavar="CLIENTE",
+                               help="Solo este cliente: id del JSON o carpeta (se puede repetir)")
+    replay_parser.add_argument("--show", type=int, default=10, help="Cambios a mostrar (default: 10)")
+    replay_parser.add_argument("--no-templates", action="store_true",
+                               help="Solo regex sobre el texto, sin plantillas de layout")
+    show_parser = sub.add_parser("show", help="Imprimir el texto de un PDF")
+    show_parser.add_argument("pdf", type=Path)
+    show_parser.add_argument("--backend", choices=["pdfminer", "pdfplumber"], default="pdfminer")
+    sub.add_parser("stats", help="Entradas y tamaño del almacén")
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        replay([c.lower() for c in args.client], args.show, not args.no_templates)
+    elif args.command == "show":
+        show_text(args.pdf, args.backend)
+    else:
+        usage = TextStore().disk_usage()
+        if not usage:
+            print(f"📁 Almacén vacío: {DEFAULT_TEXT_STORE_DIR}")
+        for kind, (entries, size) in sorted(usage.items()):
+            print(f"💾 {kind}: {entries} PDFs, {size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
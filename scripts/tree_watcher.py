@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Observa el árbol de PDFs y entrega los archivos que cambiaron, ya completos.
+
+En Linux usa inotify (vía ctypes, sin dependencias); en otros sistemas, o si
+inotify no está disponible, recorre el árbol cada `poll_interval` segundos y
+compara tamaño y mtime de cada PDF.
+
+Los contadores copian los PDFs por red o desde el explorador de archivos, así
+que un PDF puede verse a medio copiar. Un archivo se entrega solo cuando:
+  - no hubo eventos sobre él durante `debounce` segundos,
+  - su tamaño y mtime no cambiaron desde la revisión anterior, y
+  - termina con el marcador %%EOF de PDF.
+Los archivos borrados se entregan igual (ya no existen).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+FileState = Tuple[int, int]  # (tamaño, mtime_ns)
+
+
+def is_pdf(path: Path) -> bool:
+    return path.suffix.lower() == ".pdf"
+
+
+def file_state(path: Path) -> Optional[FileState]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def pdf_complete(path: Path, tail_size: int = 1024) -> bool:
+    """True si el PDF termina con %%EOF (no está a medio copiar)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - tail_size))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+def scan_tree(root: Path) -> Dict[Path, FileState]:
+    """{pdf: (tamaño, mtime)} de todo el árbol."""
+    snapshot = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            if is_pdf(path):
+                state = file_state(path)
+                if state:
+                    snapshot[path] = state
+    return snapshot
+
+
+class _Inotify:
+    """Observador recursivo mínimo sobre inotify(7)."""
+
+    def __init__(self, root: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._dirs: Dict[int, Path] = {}
+        self.add_tree(root)
+
+    def add_tree(self, root: Path):
+        for dirpath, _, _ in os.walk(root):
+            wd = self._add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(dirpath)
+
+    def read(self, timeout: float) -> Tuple[Set[Path], bool]:
+        """
+        Espera hasta `timeout` segundos. Regresa (rutas tocadas, desbordó) donde
+        desbordó=True indica que se perdieron eventos y hay que reescanear.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), False
+
+        touched: Set[Path] = set()
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Carpeta nueva (p. ej. "04.-Abril" copiada con sus PDFs)
+                    self.add_tree(path)
+                    touched.update(scan_tree(path))
+            elif is_pdf(path):
+                touched.add(path)
+        return touched, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class TreeWatcher:
+    """Entrega lotes de PDFs nuevos, modificados o borrados, ya estables."""
+
+    def __init__(self, root: Path, debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        self.root = Path(root)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.snapshot = scan_tree(self.root)
+        # pdf -> (último evento, estado visto en la última revisión)
+        self._pending: Dict[Path, Tuple[float, Optional[FileState]]] = {}
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and hasattr(os, "O_CLOEXEC"):
+            try:
+                self._inotify = _Inotify(self.root)
+            except (OSError, AttributeError):
+                self._inotify = None
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify else f"polling cada {self.poll_interval:g}s"
+
+    def touch(self, paths):
+        """Marca rutas como cambiadas (también sirve para forzar una re-extracción)."""
+        now = time.monotonic()
+        for path in paths:
+            self._pending[Path(path)] = (now, file_state(Path(path)))
+
+    def _rescan(self):
+        """Compara el árbol contra la foto anterior (polling o desborde de inotify)."""
+        current = scan_tree(self.root)
+        changed = {p for p, state in current.items() if self.snapshot.get(p) != state}
+        changed |= set(self.snapshot) - set(current)
+        self.touch(changed)
+        self.snapshot = current
+
+    def _ready(self) -> Set[Path]:
+        """PDFs sin eventos recientes, con tamaño estable y completos (o borrados)."""
+        now = time.monotonic()
+        ready = set()
+        for path, (last_event, last_state) in list(self._pending.items()):
+            if now - last_event < self.debounce:
+                continue
+            state = file_state(path)
+            if state != last_state:
+                # Sigue creciendo: esperar otro intervalo
+                self._pending[path] = (now, state)
+            elif state is None or pdf_complete(path):
+                ready.add(path)
+                del self._pending[path]
+                if state is None:
+                    self.snapshot.pop(path, None)
+                else:
+                    self.snapshot[path] = state
+        return ready
+
+    def batches(self) -> Iterator[Set[Path]]:
+        """Genera indefinidamente lotes de PDFs listos para procesar."""
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            timeout = self.debounce / 2 if self._pending else self.poll_interval
+            if self._inotify:
+                touched, overflow = self._inotify.read(timeout)
+                if overflow:
+                    self._rescan()
+                self.touch(touched)
+            else:
+                time.sleep(max(0.0, min(timeout, next_poll - time.monotonic())))
+                if time.monotonic() >= next_poll:
+                    self._rescan()
+                    next_poll = time.monotonic() + self.poll_interval
+
+            ready = self._ready()
+            if ready:
+                yield ready
+
+    def close(self):
+        if self._inotify:
+            self._inotify.close()
@@ -1,91 +1,337 @@
 #!/usr/bin/env python3
 """
-Script para verificar completitud de datos de todos los clientes
+Verificación de consistencia de los datos de todos los clientes.
+
+Carga todos los <id>.json en arreglos NumPy (un renglón por mes y lista, con el
+cliente, el año y el mes como columnas) y revisa cada regla sobre todo el
+portafolio de una vez, sin ciclos por cliente:
+
+    utilidad             utilidad = ingresos - compras - gastos (periodo)
+    utilidad_ytd         lo mismo con los acumulados
+    ytd_acumulado        el YTD de cada mes = suma del periodo de enero a ese mes
+                         (solo años que tienen todos los meses desde enero)
+    meses_duplicados     un mes aparece dos veces en la misma lista
+    meses_faltantes      hueco entre el primer y el último mes del cliente
+    sin_balance          mes con estado de resultados y sin balance general
+    sin_estado           mes con balance general y sin estado de resultados
+    activo_circulante    ac < bancos + clientes + deudores
+    en_ceros             todos los importes del mes en cero (extracción fallida)
+
+El reporte completo (cada falla con cliente, mes y valores) se escribe en JSON
+para revisarlo o procesarlo después de cada extracción:
+
+    python3 verify_all_clients.py                      # exports/verificacion.json
+    python3 verify_all_clients.py --client mrm --show 10
+    python3 verify_all_clients.py --strict             # sale con 1 si hay fallas
 """
 
+import argparse
 import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
-def verify_client_data(client_file):
-    """Verifica completitud de datos de un cliente"""
-    with open(client_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    client_id = data['clienteId']
-    client_name = data['clienteNombre']
-    
-    print(f"\n{'='*70}")
-    print(f"📊 {client_name.upper()} ({client_id})")
-    print(f"{'='*70}")
-    
-    total_months = 0
-    has_data = False
-    
-    for year, year_data in data['years'].items():
-        er_count = len(year_data.get('estadoResultadosPeriodo', []))
-        bg_count = len(year_data.get('balanceGeneral', []))
-        
-        if er_count > 0 or bg_count > 0:
-            has_data = True
-            total_months += er_count
-            print(f"  📅 Año {year}: {er_count} meses")
-            
-            # Verificar si hay datos reales (no solo ceros)
-            has_real_data = False
-            for er in year_data.get('estadoResultadosPeriodo', []):
-                if er.get('gastos', 0) > 0 or er.get('ingresos', 0) > 0:
-                    has_real_data = True
-                    break
-            
-            if has_real_data:
-                # Mostrar resumen de datos
-                for er in year_data['estadoResultadosPeriodo'][:3]:  # Primeros 3 meses
-                    print(f"    ├─ {er['mes']}: Ingresos=${er['ingresos']:,.0f}, Gastos=${er['gastos']:,.0f}")
-                
-                if er_count > 3:
-                    print(f"    └─ ... y {er_count - 3} meses más")
-            else:
-                print(f"    ⚠️  Datos extraídos pero todos son ceros")
-    
-    if not has_data:
-        print(f"  ❌ SIN DATOS EXTRAÍDOS")
-        return False, 0
-    elif total_months == 0:
-        print(f"  ⚠️  Estructura creada pero sin meses")
-        return False, 0
-    else:
-        print(f"  ✅ Total: {total_months} meses con datos")
-        return True, total_months
+import numpy as np
 
-def main():
-    clients_dir = Path(__file__).parent.parent / "public" / "data" / "clients"
-    
-    print("="*70)
+from json_store import client_json_paths, write_json_atomic
+from warehouse import DEFAULT_OUTPUT_DIR, TABLES
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_REPORT_PATH = BASE_DIR / "exports" / "verificacion.json"
+
+REPORT_FORMAT = 1
+
+# Diferencia máxima (en pesos) para considerar iguales dos importes
+TOLERANCE = 1.0
+
+# Periodo -> acumulado de los campos del estado de resultados
+YTD_FIELDS = tuple(zip(TABLES["estadoResultadosPeriodo"][1], TABLES["estadoResultadosYTD"][1]))
+
+CHECKS = {
+    "utilidad": "utilidad = ingresos - compras - gastos",
+    "utilidad_ytd": "utilidadYTD = ingresosYTD - comprasYTD - gastosYTD",
+    "ytd_acumulado": "YTD = suma del periodo de enero al mes",
+    "meses_duplicados": "mes repetido en la misma lista",
+    "meses_faltantes": "meses sin datos entre el primero y el último del cliente",
+    "sin_balance": "mes con estado de resultados y sin balance general",
+    "sin_estado": "mes con balance general y sin estado de resultados",
+    "activo_circulante": "ac < bancos + clientes + deudores",
+    "en_ceros": "todos los importes del mes en cero",
+}
+
+# Llave (cliente, mes) en un solo entero: cliente * MONTH_SPAN + año * 12 + (mes - 1)
+MONTH_SPAN = 100_000
+
+
+@dataclass
+class Table:
+    """Una lista del JSON (p. ej. balanceGeneral) de todos los clientes como columnas."""
+    columns: Tuple[str, ...]
+    client: np.ndarray  # índice en Portfolio.ids
+    year: np.ndarray  # llave del año en el JSON
+    month: np.ndarray  # año * 12 + (mes - 1), tomado de "mes"
+    values: np.ndarray  # (renglones, columnas); NaN = el JSON no trae el campo
+
+    def column(self, name: str) -> np.ndarray:
+        """Importes de un campo (ausente = 0)."""
+        return np.nan_to_num(self.values[:, self.columns.index(name)])
+
+    @property
+    def keys(self) -> np.ndarray:
+        return self.client.astype(np.int64) * MONTH_SPAN + self.month
+
+
+@dataclass
+class Portfolio:
+    ids: List[str]
+    names: List[str]
+    tables: Dict[str, Table]  # llave de la lista en el JSON -> tabla
+
+    @property
+    def client_years(self) -> int:
+        er = self.tables["estadoResultadosPeriodo"]
+        return len(np.unique(er.client.astype(np.int64) * 10_000 + er.year))
+
+
+def load_portfolio(paths: Sequence[Path]) -> Portfolio:
+    """Lee los JSON de clientes y arma una tabla por lista (TABLES de warehouse.py)."""
+    ids, names = [], []
+    rows = {key: ([], [], [], []) for key in TABLES}
+    for index, path in enumerate(paths):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        ids.append(data["clienteId"])
+        names.append(data.get("clienteNombre", data["clienteId"]))
+        for year, year_data in data.get("years", {}).items():
+            for key, (_, columns) in TABLES.items():
+                clients, years, months, values = rows[key]
+                for item in year_data.get(key, []):
+                    mes = item["mes"]
+                    clients.append(index)
+                    years.append(int(year))
+                    months.append(int(mes[:4]) * 12 + int(mes[5:7]) - 1)
+                    values.append([item.get(column) for column in columns])
+
+    tables = {}
+    for key, (_, columns) in TABLES.items():
+        clients, years, months, values = rows[key]
+        tables[key] = Table(
+            columns=columns,
+            client=np.array(clients, dtype=np.int32),
+            year=np.array(years, dtype=np.int32),
+            month=np.array(months, dtype=np.int32),
+            values=np.array(values, dtype=np.float64).reshape(len(values), len(columns)),
+        )
+    return Portfolio(ids, names, tables)
+
+
+def _mes(month: int) -> str:
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def _failures(portfolio: Portfolio, table: Table, rows: np.ndarray, **details: np.ndarray) -> List[Dict]:
+    """Renglones del reporte para los índices `rows` de `table`."""
+    return [
+        {"cliente": portfolio.ids[table.client[i]], "mes": _mes(int(table.month[i])),
+         **{name: round(float(values[n]), 2) for name, values in details.items()}}
+        for n, i in enumerate(rows.tolist())
+    ]
+
+
+def check_utilidad(portfolio: Portfolio, key: str = "estadoResultadosPeriodo", suffix: str = "") -> List[Dict]:
+    table = portfolio.tables[key]
+    expected = (table.column("ingresos" + suffix) - table.column("compras" + suffix)
+                - table.column("gastos" + suffix))
+    utilidad = table.column("utilidad" + suffix)
+    rows = np.flatnonzero(np.abs(utilidad - expected) > TOLERANCE)
+    return _failures(portfolio, table, rows, utilidad=utilidad[rows], esperado=expected[rows])
+
+
+def check_ytd(portfolio: Portfolio) -> List[Dict]:
+    """
+    Ordena el periodo por (cliente, mes), acumula por (cliente, año) con un solo
+    cumsum y compara con el renglón YTD del mismo mes.
+    """
+    er, ytd = portfolio.tables["estadoResultadosPeriodo"], portfolio.tables["estadoResultadosYTD"]
+    if not len(er.month) or not len(ytd.month):
+        return []
+    order = np.argsort(er.keys, kind="stable")
+    keys = er.keys[order]
+    group = er.client[order].astype(np.int64) * 10_000 + er.month[order] // 12
+    periodo = np.column_stack([er.column(name)[order] for name, _ in YTD_FIELDS])
+
+    new_group = np.r_[True, group[1:] != group[:-1]]
+    start_of = np.flatnonzero(new_group)[np.cumsum(new_group) - 1]
+    running = np.cumsum(periodo, axis=0)
+    before = np.where((start_of > 0)[:, None], running[np.maximum(start_of - 1, 0)], 0.0)
+    cumulative = running - before
+    # El acumulado solo se puede comparar si el año tiene enero..mes sin huecos ni repetidos
+    complete = (np.arange(len(keys)) - start_of) == (er.month[order] % 12)
+
+    position = np.clip(np.searchsorted(keys, ytd.keys), 0, len(keys) - 1)
+    matched = (keys[position] == ytd.keys) & complete[position]
+    actual = np.column_stack([ytd.column(name) for _, name in YTD_FIELDS])
+    wrong = np.abs(actual - cumulative[position]) > TOLERANCE
+    rows = np.flatnonzero(matched & wrong.any(axis=1))
+
+    failures = []
+    for row in rows.tolist():
+        fields = np.flatnonzero(wrong[row])
+        failures.append({
+            "cliente": portfolio.ids[ytd.client[row]], "mes": _mes(int(ytd.month[row])),
+            "campos": {YTD_FIELDS[j][1]: {"ytd": round(float(actual[row, j]), 2),
+                                          "acumulado": round(float(cumulative[position[row], j]), 2)}
+                       for j in fields.tolist()},
+        })
+    return failures
+
+
+def check_duplicates(portfolio: Portfolio) -> List[Dict]:
+    failures = []
+    for key, table in portfolio.tables.items():
+        unique, counts = np.unique(table.keys, return_counts=True)
+        for value, count in zip(unique[counts > 1].tolist(), counts[counts > 1].tolist()):
+            failures.append({"cliente": portfolio.ids[value // MONTH_SPAN], "mes": _mes(value % MONTH_SPAN),
+                             "lista": key, "veces": count})
+    return failures
+
+
+def check_gaps(portfolio: Portfolio) -> List[Dict]:
+    """Huecos en los meses de cada cliente (estado de resultados o balance)."""
+    keys = np.unique(np.concatenate([portfolio.tables["estadoResultadosPeriodo"].keys,
+                                     portfolio.tables["balanceGeneral"].keys]))
+    same_client = keys[1:] // MONTH_SPAN == keys[:-1] // MONTH_SPAN
+    gaps = np.flatnonzero(same_client & (np.diff(keys) > 1))
+    return [
+        {"cliente": portfolio.ids[keys[i] // MONTH_SPAN], "desde": _mes(keys[i] % MONTH_SPAN + 1),
+         "hasta": _mes(keys[i + 1] % MONTH_SPAN - 1), "meses": int(keys[i + 1] - keys[i] - 1)}
+        for i in gaps.tolist()
+    ]
+
+
+def check_unpaired(portfolio: Portfolio, key: str, other: str) -> List[Dict]:
+    table = portfolio.tables[key]
+    rows = np.flatnonzero(~np.isin(table.keys, portfolio.tables[other].keys))
+    return _failures(portfolio, table, rows)
+
+
+def check_current_assets(portfolio: Portfolio) -> List[Dict]:
+    bg = portfolio.tables["balanceGeneral"]
+    ac = bg.column("ac")
+    parts = bg.column("bancos") + bg.column("clientes") + bg.column("deudores")
+    rows = np.flatnonzero(ac < parts - TOLERANCE)
+    return _failures(portfolio, bg, rows, ac=ac[rows], bancos_clientes_deudores=parts[rows])
+
+
+def check_zeros(portfolio: Portfolio) -> List[Dict]:
+    failures = []
+    for key in ("estadoResultadosPeriodo", "balanceGeneral"):
+        table = portfolio.tables[key]
+        rows = np.flatnonzero(~np.nan_to_num(table.values).any(axis=1))
+        failures += [{**item, "lista": key} for item in _failures(portfolio, table, rows)]
+    return failures
+
+
+def verify(portfolio: Portfolio) -> Dict[str, List[Dict]]:
+    """Corre todas las reglas. Regresa {regla: fallas}."""
+    return {
+        "utilidad": check_utilidad(portfolio),
+        "utilidad_ytd": check_utilidad(portfolio, "estadoResultadosYTD", "YTD"),
+        "ytd_acumulado": check_ytd(portfolio),
+        "meses_duplicados": check_duplicates(portfolio),
+        "meses_faltantes": check_gaps(portfolio),
+        "sin_balance": check_unpaired(portfolio, "estadoResultadosPeriodo", "balanceGeneral"),
+        "sin_estado": check_unpaired(portfolio, "balanceGeneral", "estadoResultadosPeriodo"),
+        "activo_circulante": check_current_assets(portfolio),
+        "en_ceros": check_zeros(portfolio),
+    }
+
+
+def build_report(portfolio: Portfolio, results: Dict[str, List[Dict]], seconds: float) -> Dict:
+    er = portfolio.tables["estadoResultadosPeriodo"]
+    months = np.bincount(er.client, minlength=len(portfolio.ids))
+    client_years = np.unique(er.client.astype(np.int64) * 10_000 + er.year)
+    years = np.bincount(client_years // 10_000, minlength=len(portfolio.ids))
+    issues: Dict[str, int] = {client_id: 0 for client_id in portfolio.ids}
+    for failures in results.values():
+        for failure in failures:
+            issues[failure["cliente"]] += 1
+    return {
+        "format": REPORT_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "seconds": round(seconds, 4),
+        "clientes": {
+            client_id: {"nombre": name, "anios": int(years[i]), "meses": int(months[i]), "fallas": issues[client_id]}
+            for i, (client_id, name) in enumerate(zip(portfolio.ids, portfolio.names))
+        },
+        "totales": {"clientes": len(portfolio.ids), "anios": portfolio.client_years, "meses": int(len(er.month)),
+                    "fallas": sum(len(failures) for failures in results.values())},
+        "reglas": {name: {"descripcion": CHECKS[name], "fallas": len(failures), "detalle": failures}
+                   for name, failures in results.items()},
+    }
+
+
+def print_report(report: Dict, show: int = 3):
+    print("=" * 70)
     print("🔍 VERIFICACIÓN DE DATOS DE TODOS LOS CLIENTES")
-    print("="*70)
-    
-    clients_ok = []
-    clients_empty = []
-    total_months = 0
-    
-    for json_file in sorted(clients_dir.glob("*.json")):
-        has_data, months = verify_client_data(json_file)
-        
-        if has_data:
-            clients_ok.append(json_file.stem)
-            total_months += months
-        else:
-            clients_empty.append(json_file.stem)
-    
-    print("\n" + "="*70)
-    print("📈 RESUMEN GENERAL")
-    print("="*70)
-    print(f"✅ Clientes con datos: {len(clients_ok)}")
-    print(f"   {', '.join(clients_ok)}")
-    print(f"\n❌ Clientes sin datos: {len(clients_empty)}")
-    print(f"   {', '.join(clients_empty)}")
-    print(f"\n📊 Total meses procesados: {total_months}")
-    print("="*70)
+    print("=" * 70)
+    for client_id, info in report["clientes"].items():
+        status = "❌" if not info["meses"] else ("⚠️ " if info["fallas"] else "✅")
+        print(f"{status} {info['nombre']} ({client_id}): {info['meses']} meses en {info['anios']} año(s), "
+              f"{info['fallas']} falla(s)")
+
+    print("\n" + "=" * 70)
+    print("📈 REGLAS")
+    print("=" * 70)
+    for name, rule in report["reglas"].items():
+        print(f"{'✅' if not rule['fallas'] else '⚠️ '} {name:<18} {rule['fallas']:>5}  {rule['descripcion']}")
+        for failure in rule["detalle"][:show]:
+            where = failure.get("mes") or f"{failure['desde']}..{failure['hasta']}"
+            extra = {k: v for k, v in failure.items() if k not in ("cliente", "mes", "desde", "hasta")}
+            print(f"     ├─ {failure['cliente']} {where} {json.dumps(extra, ensure_ascii=False) if extra else ''}")
+        if rule["fallas"] > show:
+            print(f"     └─ ... y {rule['fallas'] - show} más")
+    totals = report["totales"]
+    print(f"\n📊 {totals['clientes']} clientes, {totals['anios']} cliente-años, {totals['meses']} meses, "
+          f"{totals['fallas']} falla(s) en {report['seconds'] * 1000:.0f} ms")
+
+
+def run_verification(clients_dir: Path = DEFAULT_OUTPUT_DIR, clients: Optional[Sequence[str]] = None,
+                     report_path: Optional[Path] = DEFAULT_REPORT_PATH) -> Dict:
+    """Carga, verifica y (con `report_path`) escribe el reporte JSON. Regresa el reporte."""
+    paths = client_json_paths(clients_dir)
+    if clients:
+        paths = [path for path in paths if path.stem in clients]
+    start = time.perf_counter()
+    portfolio = load_portfolio(paths)
+    results = verify(portfolio)
+    report = build_report(portfolio, results, time.perf_counter() - start)
+    if report_path:
+        write_json_atomic(report_path, report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica la consistencia de los datos de todos los clientes")
+    parser.add_argument("--client", action="append", default=[], metavar="ID",
+                        help="Solo este cliente (id del JSON, se puede repetir)")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="Carpeta con los <id>.json (default: public/data/clients)")
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT_PATH,
+                        help="Reporte JSON (default: exports/verificacion.json)")
+    parser.add_argument("--show", type=int, default=3, help="Fallas a mostrar por regla (default: 3)")
+    parser.add_argument("--strict", action="store_true", help="Salir con código 1 si hay alguna falla")
+    args = parser.parse_args()
+
+    report = run_verification(args.dir, args.client, args.report)
+    print_report(report, args.show)
+    print(f"💾 Reporte: {args.report}")
+    if args.strict and report["totales"]["fallas"]:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Almacén SQLite de los datos financieros extraídos (data/financials.sqlite).
+
+Es la fuente de verdad de los extractores: cada corrida escribe aquí, en
+transacciones y con inserciones en lote, y los JSON del dashboard
+(public/data/clients/<id>.json) se generan a partir de estas tablas:
+
+    clientes                     id, nombre, razon_social
+    estado_resultados_periodo    cliente, mes, ingresos, compras, ...
+    estado_resultados_ytd        cliente, mes, ingresosYTD, ...
+    balance_general              cliente, mes, ac, pc, bancos, ...
+    anexos                       cliente, mes, cuenta, nombre, saldo_inicial, cargos, abonos, saldo_final
+    texto_origen                 cliente, mes, estado, backend, archivo (backend de texto que leyó cada PDF)
+
+Todas tienen llave primaria (cliente, mes[, cuenta]) y un índice por mes para
+consultas entre clientes. Las columnas de importes tienen los mismos nombres que
+los campos del JSON.
+
+    python3 warehouse.py import                 # cargar los JSON (y anexos) existentes
+    python3 warehouse.py export [--client mrm]  # regenerar los JSON desde el almacén
+    python3 warehouse.py query "SELECT cliente, mes, utilidad FROM estado_resultados_periodo
+                                WHERE utilidad < 0 AND mes BETWEEN '2024-07' AND '2024-09'"
+"""
+
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_WAREHOUSE_PATH = BASE_DIR / "data" / "financials.sqlite"
+DEFAULT_OUTPUT_DIR = BASE_DIR / "public" / "data" / "clients"
+
+SCHEMA_VERSION = 1
+
+# Lista del JSON -> (tabla, columnas en el orden del JSON)
+TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "estadoResultadosPeriodo": ("estado_resultados_periodo", (
+        "ingresos", "compras", "gastos", "prodFin", "gastFin", "utilidad",
+    )),
+    "estadoResultadosYTD": ("estado_resultados_ytd", (
+        "ingresosYTD", "comprasYTD", "gastosYTD", "prodFinYTD", "gastFinYTD", "utilidadYTD",
+    )),
+    "balanceGeneral": ("balance_general", (
+        "ac", "pc", "bancos", "inversiones", "clientes", "deudores", "inventario",
+        "anticipoProv", "pagosAnt", "anticipoCli", "capital", "utilidadEj",
+        "anc", "plc", "proveedores", "acreedores", "capitalSocial", "resultadosAcum",
+    )),
+}
+
+ANEXOS_COLUMNS = ("saldo_inicial", "cargos", "abonos", "saldo_final")
+
+
+def _schema() -> str:
+    statements = [
+        "CREATE TABLE IF NOT EXISTS clientes (id TEXT PRIMARY KEY, nombre TEXT, razon_social TEXT)",
+    ]
+    for table, columns in TABLES.values():
+        fields = ", ".join(f'"{column}" REAL' for column in columns)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} (cliente TEXT NOT NULL, mes TEXT NOT NULL, {fields}, "
+            f"PRIMARY KEY (cliente, mes)) WITHOUT ROWID"
+        )
+        statements.append(f"CREATE INDEX IF NOT EXISTS {table}_mes ON {table} (mes, cliente)")
+    statements.append(
+        "CREATE TABLE IF NOT EXISTS anexos (cliente TEXT NOT NULL, mes TEXT NOT NULL, cuenta TEXT NOT NULL, "
+        "nombre TEXT, saldo_inicial REAL, cargos REAL, abonos REAL, saldo_final REAL, "
+        "PRIMARY KEY (cliente, mes, cuenta)) WITHOUT ROWID"
+    )
+    statements.append("CREATE INDEX IF NOT EXISTS anexos_cuenta ON anexos (cuenta, mes)")
+    statements.append(
+        "CREATE TABLE IF NOT EXISTS texto_origen (cliente TEXT NOT NULL, mes TEXT NOT NULL, estado TEXT NOT NULL, "
+        "backend TEXT NOT NULL, archivo TEXT, PRIMARY KEY (cliente, mes, estado)) WITHOUT ROWID"
+    )
+    return ";\n".join(statements) + ";"
+
+
+def _number(value: Optional[float]):
+    """REAL de SQLite -> número del JSON (los enteros sin ".0")."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class Warehouse:
+    """Conexión al almacén; con enabled=False todas las operaciones se omiten."""
+
+    def __init__(self, path: Path = DEFAULT_WAREHOUSE_PATH, enabled: bool = True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Sin check_same_thread: en el pipeline (--pipeline) la conexión la usa el hilo
+            # del escritor y se cierra desde el principal; nunca hay dos hilos a la vez
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                raise RuntimeError(f"{self.path}: versión de esquema {version}, se esperaba {SCHEMA_VERSION}")
+            with self._conn:
+                self._conn.executescript(_schema())
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def has_client(self, client_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM clientes WHERE id = ?", (client_id,)).fetchone() is not None
+
+    def client_ids(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT id FROM clientes ORDER BY id")]
+
+    def _upsert_client(self, data: Dict):
+        self.conn.execute(
+            "INSERT INTO clientes (id, nombre, razon_social) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET nombre = excluded.nombre, razon_social = excluded.razon_social",
+            (data["clienteId"], data.get("clienteNombre"), data.get("razonSocial")),
+        )
+
+    def _upsert_items(self, client_id: str, list_key: str, items: Iterable[Dict]):
+        table, columns = TABLES[list_key]
+        items = list(items)
+        for item in items:
+            unknown = set(item) - set(columns) - {"mes"}
+            if unknown:
+                raise ValueError(f"{list_key} {item['mes']}: campos sin columna en {table}: {sorted(unknown)}")
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        updates = ", ".join(f'"{column}" = excluded."{column}"' for column in columns)
+        self.conn.executemany(
+            f"INSERT INTO {table} (cliente, mes, {quoted}) VALUES (?, ?{', ?' * len(columns)}) "
+            f"ON CONFLICT (cliente, mes) DO UPDATE SET {updates}",
+            [(client_id, item["mes"], *(item.get(column) for column in columns)) for item in items],
+        )
+
+    def upsert_months(self, data: Dict, items: Dict[str, List[Dict]]):
+        """Inserta o reemplaza meses de un cliente ({lista: [datos con "mes"]}) en una transacción."""
+        if not self.enabled:
+            return
+        with self.conn:
+            self._upsert_client(data)
+            for list_key, list_items in items.items():
+                if list_key in TABLES:
+                    self._upsert_items(data["clienteId"], list_key, list_items)
+
+    def replace_clients(self, clients: List[Dict]):
+        """
+        Reemplaza todos los meses de cada cliente por los de `clients` (datos de
+        <id>.json), en una sola transacción: los meses que ya no existen se borran.
+        """
+        if not self.enabled:
+            return
+        with self.conn:
+            for data in clients:
+                self._upsert_client(data)
+                for list_key, (table, _) in TABLES.items():
+                    self.conn.execute(f"DELETE FROM {table} WHERE cliente = ?", (data["clienteId"],))
+                    items = [item for year_data in data.get("years", {}).values()
+                             for item in year_data.get(list_key, [])]
+                    self._upsert_items(data["clienteId"], list_key, items)
+
+    def client_data(self, client_id: str) -> Optional[Dict]:
+        """Datos del cliente con la estructura de <id>.json (años y meses ordenados)."""
+        row = self.conn.execute("SELECT nombre, razon_social FROM clientes WHERE id = ?", (client_id,)).fetchone()
+        if row is None:
+            return None
+
+        years: Dict[str, Dict[str, List[Dict]]] = {}
+        for list_key, (table, columns) in TABLES.items():
+            quoted = ", ".join(f'"{column}"' for column in columns)
+            for mes, *values in self.conn.execute(
+                    f"SELECT mes, {quoted} FROM {table} WHERE cliente = ? ORDER BY mes", (client_id,)):
+                year_data = years.setdefault(mes[:4], {key: [] for key in TABLES})
+                item = {"mes": mes}
+                item.update((column, _number(value)) for column, value in zip(columns, values) if value is not None)
+                year_data[list_key].append(item)
+
+        return {
+            "clienteId": client_id,
+            "clienteNombre": row[0],
+            "razonSocial": row[1],
+            # Igual que extract_all_clients: solo años con estado de resultados
+            "years": {year: years[year] for year in sorted(years) if years[year]["estadoResultadosPeriodo"]},
+        }
+
+    def replace_anexos(self, store) -> int:
+        """Reemplaza la tabla anexos con el contenido de un anexos.AccountStore."""
+        if not self.enabled:
+            return 0
+        from anexos import month_label
+
+        c = store.columns
+        rows = [
+            (store.clients[c["client"][i]], month_label(c["month"][i]), store.accounts[c["account"][i]],
+             store.names[c["name"][i]], c["opening"][i], c["debits"][i], c["credits"][i], c["closing"][i])
+            for i in range(len(store))
+        ]
+        with self.conn:
+            self.conn.execute("DELETE FROM anexos")
+            self.conn.executemany(
+                f"INSERT INTO anexos (cliente, mes, cuenta, nombre, {', '.join(ANEXOS_COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def record_text_sources(self, rows: Iterable[Tuple[str, str, str, str, str]]) -> int:
+        """
+        Guarda qué backend de texto (pdf_text.TEXT_BACKENDS) leyó cada PDF:
+        renglones (cliente, mes, estado, backend, archivo), estado "er" o "bg".
+        Solo se actualizan los PDFs leídos en la corrida (no los del caché).
+        """
+        if not self.enabled:
+            return 0
+        rows = list(rows)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO texto_origen (cliente, mes, estado, backend, archivo) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (cliente, mes, estado) DO UPDATE SET backend = excluded.backend, "
+                "archivo = excluded.archivo", rows)
+        return len(rows)
+
+    def query(self, sql: str, params: Tuple = ()) -> Tuple[List[str], List[tuple]]:
+        """Ejecuta una consulta. Regresa (columnas, renglones)."""
+        cursor = self.conn.execute(sql, params)
+        return [d[0] for d in cursor.description or []], cursor.fetchall()
+
+
+def add_warehouse_arguments(parser):
+    """Agrega --warehouse y --no-warehouse a un argparse.ArgumentParser."""
+    parser.add_argument("--warehouse", type=Path, default=DEFAULT_WAREHOUSE_PATH, metavar="DB",
+                        help="Base SQLite donde se guardan los datos extraídos (default: data/financials.sqlite)")
+    parser.add_argument("--no-warehouse", action="store_true",
+                        help="No escribir en la base SQLite (solo los JSON)")
+
+
+def warehouse_from_args(args) -> Warehouse:
+    return Warehouse(args.warehouse, enabled=not args.no_warehouse)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén SQLite de los datos financieros extraídos")
+    parser.add_argument("--warehouse", type=Path, default=DEFAULT_WAREHOUSE_PATH, metavar="DB")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("import", help="Cargar los JSON de clientes (y los anexos extraídos) al almacén")
+    load.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    export = sub.add_parser("export", help="Regenerar los JSON de clientes desde el almacén")
+    export.add_argument("--client")
+    export.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    query = sub.add_parser("query", help="Ejecutar una consulta SQL")
+    query.add_argument("sql")
+    args = parser.parse_args()
+
+    # Importado aquí: json_store usa este módulo al guardar
+    from json_store import client_json_paths, write_client_json
+    from kpis import add_kpis
+
+    warehouse = Warehouse(args.warehouse)
+    if args.command == "import":
+        clients = []
+        for path in client_json_paths(args.output_dir):
+            with open(path, "r", encoding="utf-8") as f:
+                clients.append(json.load(f))
+        warehouse.replace_clients(clients)
+        print(f"✅ {len(clients)} clientes cargados en {warehouse.path}")
+
+        from anexos import DEFAULT_STORE_PATH, AccountStore
+        if DEFAULT_STORE_PATH.exists():
+            print(f"✅ {warehouse.replace_anexos(AccountStore.load()):,} renglones de anexos")
+
+    elif args.command == "export":
+        client_ids = [args.client] if args.client else warehouse.client_ids()
+        clients = [data for data in map(warehouse.client_data, client_ids) if data is not None]
+        add_kpis(clients)
+        for data in clients:
+            write_client_json(args.output_dir / f"{data['clienteId']}.json", data)
+            print(f"✅ {data['clienteId']}.json")
+
+    else:
+        columns, rows = warehouse.query(args.sql)
+        print("\t".join(columns))
+        for row in rows:
+            print("\t".join("" if value is None else str(value) for value in row))
+        print(f"({len(rows)} renglones)")
+    warehouse.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -49,8 +49,44 @@ export interface ClienteFinancialData {
       estadoResultadosPeriodo: EstadoResultadosPeriodo[]
       estadoResultadosYTD: EstadoResultadosYTD[]
       balanceGeneral: BalanceGeneral[]
+      // Precalculados por el extractor (scripts/kpis.py); puede faltar en JSON antiguos
+      kpis?: KPIMensual[]
     }
   }
+  // Presente cuando los datos se cargaron por año (ver ClientDataManifest)
+  manifest?: ClientDataManifest
+}
+
+// public/data/clients/<slug>/manifest.json, generado por scripts/json_store.py
+export interface ClientDataManifest {
+  format: number
+  clienteId: string
+  clienteNombre: string
+  razonSocial: string
+  years: {
+    [year: string]: {
+      months: string[]
+      file: string
+      bytes: number
+      sha256: string
+    }
+  }
+}
+
+// public/data/clients/<slug>.columnar.json (scripts/columnar.py): un arreglo por
+// campo, alineado a `meses` (continuo y ordenado; null = sin datos ese mes)
+export interface ClienteColumnarData {
+  format: "columnar"
+  version: number
+  clienteId: string
+  clienteNombre: string
+  razonSocial: string
+  inicio: string | null
+  meses: string[]
+  estadoResultadosPeriodo: Record<string, (number | null)[]>
+  estadoResultadosYTD: Record<string, (number | null)[]>
+  balanceGeneral: Record<string, (number | null)[]>
+  kpis: Record<string, (number | null)[]>
 }
 
 export interface KPIFinanciero {
@@ -71,6 +107,10 @@ export interface KPIFinanciero {
   capitalTrabajo: number
 }
 
+export interface KPIMensual extends KPIFinanciero {
+  mes: string
+}
+
 export interface AnalisisComparativo {
   periodo: string
   periodoAnterior: string